@@ -3,48 +3,186 @@ Gait Analysis Backend - Main Flask Application
 Processes gyroscope and accelerometer data from mobile devices
 """
 
-from flask import Flask, request, jsonify
-from flask_cors import CORS
+from flask import Flask, request, abort
+from flask_compress import Compress
+import brotli
 import numpy as np
+import orjson
+import xxhash
 from datetime import datetime
+import io
 import os
+import threading
+import time
+import zlib
+from cachetools import TTLCache, cached
 from dotenv import load_dotenv
 
-from gait_processor import GaitProcessor
-from data_validator import validate_sensor_data
-from problem_detector import GaitProblemDetector
+from gait_processor import GaitProcessor, samples_to_soa
+from data_validator import validate_sensor_data, validate_sensor_arrays, decode_gait_payload
+from problem_detector import LazyProblemDetector
+from realtime_batcher import InvalidReading, RealtimeBatcher
+from stream_parser import parse_sensor_stream
 
 # Load environment variables
 load_dotenv()
 
 # Initialize Flask app
 app = Flask(__name__)
-CORS(app)  # Enable CORS for React Native
+
+# Compress JSON responses (clients advertise support via Accept-Encoding)
+app.config['COMPRESS_ALGORITHM'] = ['br', 'gzip']
+Compress(app)
+
+# Request logging uses lazy %-formatting; set LOG_LEVEL=INFO or DEBUG for detail
+app.logger.setLevel(os.getenv('LOG_LEVEL', 'WARNING').upper())
 
 # Initialize gait processor
 gait_processor = GaitProcessor()
 
-# Initialize problem detector (will be loaded after baselines are generated)
-try:
-    problem_detector = GaitProblemDetector()
-    print("✓ Problem detector initialized with research baselines")
-except FileNotFoundError as e:
-    print(f"⚠️  Problem detector not available: {e}")
-    print("   Run 'python generate_baselines.py' to generate baselines")
-    problem_detector = None
+# Real-time readings from concurrent clients are processed in shared batches
+realtime_batcher = RealtimeBatcher(
+    gait_processor.process_realtime_batch,
+    batch_size=int(os.getenv('REALTIME_BATCH_SIZE', 64)),
+    max_latency=float(os.getenv('REALTIME_MAX_LATENCY', 0.02))
+)
+
+# Short-lived cache for history lookups, keyed on (user_id, limit)
+history_cache = TTLCache(maxsize=1024, ttl=5)
+history_cache_lock = threading.Lock()
+
+# Analyze responses keyed by a hash of the request body, so client retries of
+# the same payload skip validation and processing
+analysis_cache = TTLCache(maxsize=512, ttl=60)
+analysis_cache_lock = threading.Lock()
+
+# Initialize problem detector (reloaded automatically when baselines are regenerated)
+problem_detector = LazyProblemDetector()
+problem_detector.get()
 
 # Configuration
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max request size
 
+# Upper bound on readings per sensor in a single analyze request
+MAX_SAMPLES = int(os.getenv('GAIT_MAX_SAMPLES', 200_000))
+
+# Analyze payloads above this size are stream-parsed straight into NumPy arrays
+STREAM_PARSE_THRESHOLD = int(os.getenv('STREAM_PARSE_THRESHOLD', 2 * 1024 * 1024))
+
+# Static part of the health check response, built once at startup
+HEALTH_BASE = {
+    'status': 'healthy',
+    'service': 'Gait Analysis API'
+}
+
+
+def decompress_body(body, encoding):
+    """Decode a gzip/deflate/br request body, capped at MAX_CONTENT_LENGTH"""
+    limit = app.config['MAX_CONTENT_LENGTH']
+    try:
+        if encoding == 'br':
+            # Output stops growing at the limit, so a small brotli bomb cannot
+            # inflate past it
+            decompressor = brotli.Decompressor()
+            decoded = decompressor.process(body, output_buffer_limit=limit + 1)
+            if len(decoded) <= limit and not decompressor.is_finished():
+                abort(400, description='Request body could not be decompressed')
+        else:
+            # wbits=47 accepts both gzip and zlib-wrapped deflate streams
+            decoded = zlib.decompressobj(47).decompress(body, limit + 1)
+    except (zlib.error, brotli.error):
+        abort(400, description='Request body could not be decompressed')
+    
+    if len(decoded) > limit:
+        abort(413)
+    return decoded
+
+
+@app.after_request
+def add_cors_headers(response):
+    """Static CORS headers for React Native clients"""
+    response.headers['Access-Control-Allow-Origin'] = '*'
+    response.headers['Access-Control-Allow-Methods'] = 'GET, POST, OPTIONS'
+    response.headers['Access-Control-Allow-Headers'] = 'Content-Type, Content-Encoding'
+    return response
+
+
+@app.before_request
+def reject_oversized_body():
+    """Fail with 413 from the Content-Length header, before any body is read"""
+    if (request.content_length or 0) > app.config['MAX_CONTENT_LENGTH']:
+        abort(413)
+
+
+@app.before_request
+def decode_request_body():
+    """Transparently decompress request bodies sent with Content-Encoding"""
+    encoding = request.headers.get('Content-Encoding', '').strip().lower()
+    if encoding not in ('gzip', 'deflate', 'br'):
+        return
+    
+    body = decompress_body(request.get_data(cache=False), encoding)
+    
+    environ = request.environ
+    environ['wsgi.input'] = io.BytesIO(body)
+    environ['CONTENT_LENGTH'] = str(len(body))
+    environ.pop('HTTP_CONTENT_ENCODING', None)
+    
+    # Drop the cached stream/length so handlers read the decoded body
+    current_request = request._get_current_object()
+    current_request.__dict__.pop('stream', None)
+    current_request.__dict__.pop('content_length', None)
+
+
+def fast_json():
+    """Parse the request body with orjson (much faster than stdlib json for numeric payloads)"""
+    return orjson.loads(request.get_data(cache=False))
+
+
+def json_response(payload, status=200):
+    """
+    Serialize a response body with orjson instead of jsonify
+    
+    NumPy arrays and scalars are written straight from their buffers, so
+    results do not need converting to Python lists first.
+    """
+    return app.response_class(
+        orjson.dumps(payload, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NAIVE_UTC),
+        status=status,
+        mimetype='application/json'
+    )
+
+
+def invalid_data_response(details):
+    app.logger.info("Validation failed: %s", details)
+    return {
+        'success': False,
+        'error': 'Invalid data',
+        'details': details
+    }, 400
+
+
+def sensor_arrays(sensor_data):
+    """Sensor arrays from a parsed payload (empty arrays when the sensor is absent)"""
+    return sensor_data if sensor_data is not None else samples_to_soa([])
+
+
+@cached(cache=history_cache, lock=history_cache_lock)
+def _history(user_id, limit):
+    return gait_processor.get_user_history(user_id, limit=limit)
+
+
+def _invalidate_history(user_id):
+    """Drop cached history entries (all limits) for a user after a new analysis"""
+    with history_cache_lock:
+        for key in [key for key in history_cache.keys() if key[0] == user_id]:
+            history_cache.pop(key, None)
+
 
 @app.route('/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
-    return jsonify({
-        'status': 'healthy',
-        'timestamp': datetime.now().isoformat(),
-        'service': 'Gait Analysis API'
-    }), 200
+    return json_response({**HEALTH_BASE, 'timestamp': time.time()})
 
 
 @app.route('/api/gait/analyze', methods=['POST'])
@@ -65,114 +203,154 @@ def analyze_gait():
     }
     """
     try:
-        print("\n" + "="*50)
-        print("GAIT ANALYSIS REQUEST RECEIVED")
-        print("="*50)
+        # Large bodies are stream-parsed (and hashed as they stream); smaller
+        # ones are hashed first and only decoded on a cache miss
+        streamed = (request.content_length or 0) > STREAM_PARSE_THRESHOLD
+        payload_hash = xxhash.xxh3_64()
+        try:
+            if streamed:
+                data = parse_sensor_stream(request.stream, payload_hash)
+            else:
+                body = request.get_data(cache=False)
+                payload_hash.update(body)
+        except ValueError as e:
+            return json_response(*invalid_data_response([str(e)]))
         
-        data = request.get_json()
+        digest = payload_hash.hexdigest()
+        with analysis_cache_lock:
+            cached_response = analysis_cache.get(digest)
+        if cached_response is not None:
+            app.logger.info("Serving cached analysis for payload %s", digest)
+            return json_response(*cached_response)
         
-        print(f"Request data keys: {list(data.keys())}")
-        print(f"Accelerometer samples: {len(data.get('accelerometer', []))}")
-        print(f"Gyroscope samples: {len(data.get('gyroscope', []))}")
-        print(f"Magnetometer samples: {len(data.get('magnetometer', []))}")
-        print(f"Barometer samples: {len(data.get('barometer', []))}")
-        print(f"DeviceMotion samples: {len(data.get('deviceMotion', []))}")
-        print(f"Pedometer steps: {data.get('pedometer', {}).get('steps', 'N/A')}")
-        print(f"User ID: {data.get('user_id', 'not provided')}")
-        print(f"Session ID: {data.get('session_id', 'not provided')}")
+        if not streamed:
+            try:
+                data = decode_gait_payload(body)
+            except ValueError as e:
+                return json_response(*invalid_data_response([str(e)]))
         
-        # Show sample data
-        if data.get('accelerometer') and len(data['accelerometer']) > 0:
-            print(f"\nFirst accelerometer sample: {data['accelerometer'][0]}")
-            print(f"Last accelerometer sample: {data['accelerometer'][-1]}")
-        
-        # Validate input data
-        validation_result = validate_sensor_data(data)
-        if not validation_result['valid']:
-            print(f"VALIDATION FAILED: {validation_result['errors']}")
-            return jsonify({
-                'success': False,
-                'error': 'Invalid data',
-                'details': validation_result['errors']
-            }), 400
-        
-        print("Data validation passed ✓")
-        
-        # Extract sensor data
-        accel_data = data.get('accelerometer', [])
-        gyro_data = data.get('gyroscope', [])
-        mag_data = data.get('magnetometer', [])
-        baro_data = data.get('barometer', [])
-        motion_data = data.get('deviceMotion', [])
-        pedometer_data = data.get('pedometer', {})
-        user_id = data.get('user_id', 'anonymous')
-        session_id = data.get('session_id', datetime.now().isoformat())
-        
-        print(f"\nProcessing gait analysis...")
-        # Process gait data with all available sensors
-        analysis_result = gait_processor.analyze(
-            accelerometer=accel_data,
-            gyroscope=gyro_data,
-            magnetometer=mag_data if mag_data else None,
-            barometer=baro_data if baro_data else None,
-            deviceMotion=motion_data if motion_data else None,
-            pedometer=pedometer_data if pedometer_data else None,
-            user_id=user_id,
-            session_id=session_id
-        )
+        payload, status = _analyze_payload(data)
+        if status in (200, 400):
+            with analysis_cache_lock:
+                analysis_cache[digest] = (payload, status)
         
-        print(f"\nAnalysis complete!")
-        print(f"Results: {analysis_result}")
-        print("="*50 + "\n")
-        
-        return jsonify({
-            'success': True,
-            'data': analysis_result,
-            'timestamp': datetime.now().isoformat()
-        }), 200
+        return json_response(payload, status)
         
     except Exception as e:
-        print(f"\n{'!'*50}")
-        print(f"ERROR IN GAIT ANALYSIS: {str(e)}")
-        print(f"{'!'*50}\n")
         app.logger.error(f"Error analyzing gait data: {str(e)}", exc_info=True)
-        return jsonify({
+        return json_response({
             'success': False,
             'error': 'Internal server error',
             'message': str(e)
-        }), 500
+        }, 500)
+
+
+def _analyze_payload(data):
+    """Validate a parsed analyze payload and run the gait processor on it"""
+    sample_counts = [
+        len(data[sensor]['time'])
+        for sensor in ('accelerometer', 'gyroscope', 'magnetometer')
+        if data.get(sensor) is not None
+    ]
+    if sample_counts and max(sample_counts) > MAX_SAMPLES:
+        return {
+            'success': False,
+            'error': 'Payload too large',
+            'message': f'At most {MAX_SAMPLES} readings per sensor are accepted'
+        }, 413
+    
+    # Validate input data
+    validation_result = validate_sensor_data(data)
+    if not validation_result['valid']:
+        return invalid_data_response(validation_result['errors'])
+    
+    # Sensor data arrives as NumPy arrays (SensorArrays layout) from the parser
+    accel_data = sensor_arrays(data.get('accelerometer'))
+    gyro_data = sensor_arrays(data.get('gyroscope'))
+    mag_data = sensor_arrays(data.get('magnetometer'))
+    if len(mag_data['time']) == 0:
+        mag_data = None
+    
+    values_result = validate_sensor_arrays(accel_data, gyro_data)
+    if not values_result['valid']:
+        return invalid_data_response(values_result['errors'])
+    
+    id_errors = [
+        f'{field} must be a string'
+        for field in ('user_id', 'session_id')
+        if data.get(field) is not None and not isinstance(data[field], str)
+    ]
+    if id_errors:
+        return invalid_data_response(id_errors)
+    
+    app.logger.info(
+        "Gait analysis request: user=%s accel=%d gyro=%d",
+        data.get('user_id'), len(accel_data['time']), len(gyro_data['time'])
+    )
+    
+    baro_data = data.get('barometer', [])
+    motion_data = data.get('deviceMotion', [])
+    pedometer_data = data.get('pedometer', {})
+    user_id = data.get('user_id', 'anonymous')
+    session_id = data.get('session_id', datetime.now().isoformat())
+    
+    # Process gait data with all available sensors
+    analysis_result = gait_processor.analyze(
+        accelerometer=accel_data,
+        gyroscope=gyro_data,
+        magnetometer=mag_data if mag_data else None,
+        barometer=baro_data if baro_data else None,
+        deviceMotion=motion_data if motion_data else None,
+        pedometer=pedometer_data if pedometer_data else None,
+        user_id=user_id,
+        session_id=session_id
+    )
+    
+    _invalidate_history(user_id)
+    
+    app.logger.debug("Analysis result: %s", analysis_result)
+    
+    return {
+        'success': True,
+        'data': analysis_result,
+        'timestamp': time.time()
+    }, 200
 
 
 @app.route('/api/gait/realtime', methods=['POST'])
 def realtime_analysis():
     """
     Real-time gait analysis for streaming data
-    Processes smaller chunks of data for immediate feedback
+    Processes smaller chunks of data for immediate feedback; concurrent
+    requests are batched into a single vectorized call
     """
     try:
-        data = request.get_json()
+        data = fast_json()
         
         # Extract sensor readings
         accel = data.get('accelerometer', {})
         gyro = data.get('gyroscope', {})
         
-        # Process single reading
-        result = gait_processor.process_realtime(
-            accelerometer=accel,
-            gyroscope=gyro
-        )
+        # Process reading as part of the next batch
+        try:
+            result = realtime_batcher.submit(
+                accelerometer=accel,
+                gyroscope=gyro
+            )
+        except InvalidReading as e:
+            return json_response(*invalid_data_response([str(e)]))
         
-        return jsonify({
+        return json_response({
             'success': True,
             'data': result
-        }), 200
+        })
         
     except Exception as e:
         app.logger.error(f"Error in realtime analysis: {str(e)}")
-        return jsonify({
+        return json_response({
             'error': 'Processing error',
             'message': str(e)
-        }), 500
+        }, 500)
 
 
 @app.route('/api/gait/history/<user_id>', methods=['GET'])
@@ -181,20 +359,20 @@ def get_user_history(user_id):
     try:
         limit = request.args.get('limit', default=10, type=int)
         
-        history = gait_processor.get_user_history(user_id, limit=limit)
+        history = _history(user_id, limit)
         
-        return jsonify({
+        return json_response({
             'success': True,
             'user_id': user_id,
             'history': history
-        }), 200
+        })
         
     except Exception as e:
         app.logger.error(f"Error fetching history: {str(e)}")
-        return jsonify({
+        return json_response({
             'error': 'Failed to fetch history',
             'message': str(e)
-        }), 500
+        }, 500)
 
 
 @app.route('/api/gait/detect-problems', methods=['POST'])
@@ -222,79 +400,77 @@ def detect_problems():
     }
     """
     try:
-        print("\n" + "="*50)
-        print("PROBLEM DETECTION REQUEST RECEIVED")
-        print("="*50)
-        
-        if not problem_detector:
-            return jsonify({
+        detector = problem_detector.get()
+        if detector is None:
+            return json_response({
                 'success': False,
                 'error': 'Problem detector not initialized',
                 'message': 'Baselines file not found. Run dataset_downloader.py first.'
-            }), 503
+            }, 503)
         
-        data = request.get_json()
+        data = fast_json()
         
         if 'metrics' not in data:
-            return jsonify({
+            return json_response({
                 'success': False,
                 'error': 'Missing metrics in request'
-            }), 400
+            }, 400)
         
         metrics = data['metrics']
         
-        print(f"Analyzing metrics:")
-        print(f"  Cadence: {metrics.get('cadence', 'N/A')}")
-        print(f"  Stride Length: {metrics.get('stride_length', 'N/A')}")
-        print(f"  Velocity: {metrics.get('velocity', 'N/A')}")
-        print(f"  Symmetry: {metrics.get('gait_symmetry', 'N/A')}")
-        print(f"  Stability: {metrics.get('stability_score', 'N/A')}")
-        print(f"  Regularity: {metrics.get('step_regularity', 'N/A')}")
+        app.logger.debug("Detecting problems for metrics: %s", metrics)
         
         # Detect problems
-        problems = problem_detector.detect_problems(metrics)
+        problems = detector.detect_problems(metrics)
         
         # Prioritize by severity
-        prioritized = problem_detector.prioritize_problems(problems)
+        prioritized = detector.prioritize_problems(problems)
         
         # Generate summary
-        summary = problem_detector.generate_summary(prioritized)
-        gait_score = problem_detector.calculate_gait_score(metrics, prioritized)
+        summary = detector.generate_summary(prioritized)
+        gait_score = detector.calculate_gait_score(metrics, prioritized)
         
-        print(f"\nProblems detected: {len(prioritized)}")
-        if prioritized:
-            print(f"Severity breakdown: {summary['severe_count']} severe, {summary['moderate_count']} moderate")
-        print("="*50 + "\n")
+        app.logger.info(
+            "Problems detected: %d (%d severe, %d moderate)",
+            len(prioritized), summary['severe_count'], summary['moderate_count']
+        )
         
-        return jsonify({
+        return json_response({
             'success': True,
             'problems_detected': len(prioritized),
-            'problems': prioritized,
+            'problems': [problem.to_dict() for problem in prioritized],
             'summary': summary,
             'gait_score': gait_score,
-            'timestamp': datetime.now().isoformat()
-        }), 200
+            'timestamp': time.time()
+        })
         
     except Exception as e:
-        print(f"\n{'!'*50}")
-        print(f"ERROR IN PROBLEM DETECTION: {str(e)}")
-        print(f"{'!'*50}\n")
         app.logger.error(f"Error detecting problems: {str(e)}", exc_info=True)
-        return jsonify({
+        return json_response({
             'success': False,
             'error': 'Internal server error',
             'message': str(e)
-        }), 500
+        }, 500)
 
 
 @app.errorhandler(404)
 def not_found(error):
-    return jsonify({'error': 'Endpoint not found'}), 404
+    return json_response({'error': 'Endpoint not found'}, 404)
+
+
+@app.errorhandler(400)
+def bad_request(error):
+    return json_response({'error': error.description}, 400)
+
+
+@app.errorhandler(413)
+def request_too_large(error):
+    return json_response({'error': 'Request body too large'}, 413)
 
 
 @app.errorhandler(500)
 def internal_error(error):
-    return jsonify({'error': 'Internal server error'}), 500
+    return json_response({'error': 'Internal server error'}, 500)
 
 
 if __name__ == '__main__':
@@ -2,7 +2,100 @@
 Data Validator - Validates incoming sensor data
 """
 
-from typing import Dict, List, Any
+import msgspec
+import numpy as np
+from typing import Dict, List, Any, Optional
+
+from gait_processor import records_to_soa
+
+
+# Plausible absolute limit per axis; anything beyond is a sensor/encoding fault
+SENSOR_RANGES = {
+    'accelerometer': 200.0,
+    'gyroscope': 160.0   # rad/s
+}
+
+
+class SensorSample(msgspec.Struct):
+    """A single x/y/z sensor reading"""
+    x: float
+    y: float
+    z: float
+    timestamp: Optional[float] = None
+
+
+class GaitPayload(msgspec.Struct):
+    """Schema for /api/gait/analyze request bodies"""
+    accelerometer: Optional[List[SensorSample]] = None
+    gyroscope: Optional[List[SensorSample]] = None
+    magnetometer: Optional[List[SensorSample]] = None
+    barometer: Optional[List[Dict[str, Any]]] = None
+    deviceMotion: Optional[List[Dict[str, Any]]] = None
+    pedometer: Optional[Dict[str, Any]] = None
+    user_id: str = 'anonymous'
+    session_id: Optional[str] = None
+
+
+_payload_decoder = msgspec.json.Decoder(GaitPayload)
+
+
+def decode_gait_payload(body: bytes) -> Dict[str, Any]:
+    """
+    Parse and type-check an analyze payload in a single compiled pass
+    
+    Sensor sample lists are returned as dicts of NumPy arrays (the
+    samples_to_soa layout), so validate_sensor_data only has to run its
+    array checks afterwards.
+    
+    Raises:
+        ValueError: If the body is not valid JSON or does not match GaitPayload
+    """
+    try:
+        payload = _payload_decoder.decode(body)
+    except msgspec.DecodeError as e:
+        raise ValueError(str(e)) from e
+    
+    data = _other_fields(payload)
+    for sensor in ('accelerometer', 'gyroscope', 'magnetometer'):
+        samples = getattr(payload, sensor)
+        data[sensor] = _samples_to_arrays(samples) if samples is not None else None
+    
+    return data
+
+
+def payload_fields(fields: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Type-check the non-sensor fields of a stream-parsed payload against
+    GaitPayload, returning them in the decode_gait_payload layout
+    
+    Raises:
+        ValueError: If a field does not match GaitPayload
+    """
+    try:
+        payload = msgspec.convert(fields, GaitPayload)
+    except msgspec.ValidationError as e:
+        raise ValueError(str(e)) from e
+    return _other_fields(payload)
+
+
+def _other_fields(payload: GaitPayload) -> Dict[str, Any]:
+    data = {
+        'barometer': payload.barometer,
+        'deviceMotion': payload.deviceMotion,
+        'pedometer': payload.pedometer,
+        'user_id': payload.user_id
+    }
+    if payload.session_id is not None:
+        data['session_id'] = payload.session_id
+    return data
+
+
+def _samples_to_arrays(samples: List[SensorSample]) -> Dict[str, np.ndarray]:
+    return records_to_soa(
+        (((s.x, s.y, s.z), i if s.timestamp is None else s.timestamp)
+         for i, s in enumerate(samples)),
+        len(samples)
+    )
 
 
 def validate_sensor_data(data: Dict[str, Any]) -> Dict[str, Any]:
@@ -23,16 +116,16 @@ def validate_sensor_data(data: Dict[str, Any]) -> Dict[str, Any]:
     accelerometer = data.get('accelerometer')
     gyroscope = data.get('gyroscope')
     
-    if not accelerometer and not gyroscope:
+    if not _has_samples(accelerometer) and not _has_samples(gyroscope):
         errors.append("At least one sensor type (accelerometer or gyroscope) is required")
     
     # Validate accelerometer data
-    if accelerometer:
+    if _has_samples(accelerometer):
         accel_errors = _validate_sensor_array(accelerometer, 'accelerometer')
         errors.extend(accel_errors)
     
     # Validate gyroscope data
-    if gyroscope:
+    if _has_samples(gyroscope):
         gyro_errors = _validate_sensor_array(gyroscope, 'gyroscope')
         errors.extend(gyro_errors)
     
@@ -42,10 +135,73 @@ def validate_sensor_data(data: Dict[str, Any]) -> Dict[str, Any]:
     }
 
 
+def validate_sensor_arrays(accelerometer: Any, gyroscope: Any) -> Dict[str, Any]:
+    """
+    Value checks for converted sensor data: every axis finite and within range
+    
+    Accepts samples_to_soa dicts or (N, 3) arrays (None to skip a sensor).
+    
+    Returns:
+        Dictionary with 'valid' (bool) and 'errors' (list) keys
+    """
+    errors = []
+    
+    for sensor_type, sensor_data in (('accelerometer', accelerometer), ('gyroscope', gyroscope)):
+        if sensor_data is None:
+            continue
+        
+        limit = SENSOR_RANGES[sensor_type]
+        values = sensor_data['xyz'] if _is_soa(sensor_data) else sensor_data
+        
+        # NaN compares False, so this single pass also rejects NaN and Inf
+        if (np.abs(values) < limit).all():
+            continue
+        
+        if not np.isfinite(values).all():
+            errors.append(f"{sensor_type} contains non-finite values")
+        else:
+            errors.append(f"{sensor_type} values exceed the sensor range (±{limit:g})")
+    
+    return {
+        'valid': len(errors) == 0,
+        'errors': errors
+    }
+
+
+def _is_soa(sensor_data: Any) -> bool:
+    """True for dict-of-arrays sensor data (samples_to_soa / streamed layout)"""
+    return isinstance(sensor_data, dict) and isinstance(sensor_data.get('xyz'), np.ndarray)
+
+
+def _has_samples(sensor_data: Any) -> bool:
+    """Truthiness check that also works for NumPy arrays"""
+    if isinstance(sensor_data, np.ndarray):
+        return sensor_data.size > 0
+    if _is_soa(sensor_data):
+        return sensor_data['time'].size > 0
+    return bool(sensor_data)
+
+
 def _validate_sensor_array(sensor_data: Any, sensor_type: str) -> List[str]:
-    """Validate individual sensor data array"""
+    """
+    Structural check of an individual sensor data array
+    
+    Numeric types are not checked per field here; the float32 conversion in
+    samples_to_soa raises on non-numeric values and is reported by the caller.
+    """
     errors = []
     
+    # Already converted: structure only, values are checked by validate_sensor_arrays
+    if isinstance(sensor_data, np.ndarray):
+        if sensor_data.ndim != 2 or sensor_data.shape[1] < 3:
+            errors.append(f"{sensor_type} must have shape (N, 3)")
+        elif sensor_data.dtype.kind not in 'fi':
+            errors.append(f"{sensor_type} values must be numbers")
+        return errors
+    
+    if _is_soa(sensor_data):
+        return errors
+    
     # Check if it's a list
     if not isinstance(sensor_data, list):
         errors.append(f"{sensor_type} must be an array")
@@ -56,19 +212,17 @@ def _validate_sensor_array(sensor_data: Any, sensor_type: str) -> List[str]:
         errors.append(f"{sensor_type} array is empty")
         return errors
     
-    # Validate each reading
-    required_fields = ['x', 'y', 'z']
+    # Sample the first and last readings only
+    required_fields = ('x', 'y', 'z')
     
-    for i, reading in enumerate(sensor_data[:5]):  # Check first 5 samples
+    for i in (0, len(sensor_data) - 1) if len(sensor_data) > 1 else (0,):
+        reading = sensor_data[i]
         if not isinstance(reading, dict):
             errors.append(f"{sensor_type}[{i}] must be an object")
             continue
         
-        # Check for required fields
         for field in required_fields:
             if field not in reading:
                 errors.append(f"{sensor_type}[{i}] missing '{field}' field")
-            elif not isinstance(reading[field], (int, float)):
-                errors.append(f"{sensor_type}[{i}].{field} must be a number")
     
     return errors
@@ -0,0 +1,301 @@
+"""
+Gait Kernels - Compiled numeric kernels for gait analysis
+Numba is optional; without it GaitProcessor keeps using the SciPy routines
+and PhysioNetProcessor its NumPy stride statistics
+"""
+
+import numpy as np
+
+try:
+    import numba
+except ImportError:  # pragma: no cover - depends on the deployment
+    numba = None
+
+NUMBA_AVAILABLE = numba is not None
+
+
+def _njit(func):
+    """Compile with Numba when it is installed, otherwise leave as Python"""
+    if numba is None:
+        return func
+    return numba.njit(cache=True)(func)
+
+
+@_njit
+def find_peaks(x, distance, min_prominence):
+    """
+    Peak detection matching scipy.signal.find_peaks(x, distance, prominence)
+
+    Follows SciPy's order of operations: local maxima (plateaus resolve to
+    their midpoint), then the distance filter keeping higher peaks first,
+    then prominence against the lowest point on each side before a higher
+    sample is reached.
+
+    Results are identical except when equal-height peaks fall within
+    distance of each other. SciPy breaks those ties by NumPy's unstable
+    default argsort, whose order depends on the platform's sort
+    implementation. Here the stable sort always lets the later peak win.
+
+    Returns:
+        (peaks, prominences) arrays for the peaks that pass both filters
+    """
+    n = x.shape[0]
+
+    # Local maxima
+    candidates = np.empty(n // 2 + 1, dtype=np.int64)
+    count = 0
+    i = 1
+    while i < n - 1:
+        if x[i - 1] < x[i]:
+            ahead = i + 1
+            while ahead < n - 1 and x[ahead] == x[i]:
+                ahead += 1
+            if x[ahead] < x[i]:
+                candidates[count] = (i + ahead - 1) // 2
+                count += 1
+                i = ahead
+        i += 1
+    candidates = candidates[:count]
+
+    # Minimum distance, highest peaks claim their neighbourhood first
+    keep = np.ones(count, dtype=np.bool_)
+    order = np.argsort(x[candidates], kind='mergesort')
+    for rank in range(count - 1, -1, -1):
+        j = order[rank]
+        if not keep[j]:
+            continue
+        k = j - 1
+        while k >= 0 and candidates[j] - candidates[k] < distance:
+            keep[k] = False
+            k -= 1
+        k = j + 1
+        while k < count and candidates[k] - candidates[j] < distance:
+            keep[k] = False
+            k += 1
+
+    # Prominence over the whole signal
+    peaks = np.empty(count, dtype=np.int64)
+    prominences = np.empty(count, dtype=np.float64)
+    kept = 0
+    for j in range(count):
+        if not keep[j]:
+            continue
+        peak = candidates[j]
+        height = x[peak]
+
+        left_min = height
+        i = peak
+        while i >= 0 and x[i] <= height:
+            if x[i] < left_min:
+                left_min = x[i]
+            i -= 1
+
+        right_min = height
+        i = peak
+        while i < n and x[i] <= height:
+            if x[i] < right_min:
+                right_min = x[i]
+            i += 1
+
+        prominence = height - max(left_min, right_min)
+        if prominence >= min_prominence:
+            peaks[kept] = peak
+            prominences[kept] = prominence
+            kept += 1
+
+    return peaks[:kept], prominences[:kept]
+
+
+@_njit
+def sosfilt(sos, x, zi):
+    """Cascaded second-order sections (transposed direct form II); zi is updated in place"""
+    n_sections = sos.shape[0]
+    y = np.empty(x.shape[0], dtype=np.float64)
+    for i in range(x.shape[0]):
+        value = x[i]
+        for s in range(n_sections):
+            out = sos[s, 0] * value + zi[s, 0]
+            zi[s, 0] = sos[s, 1] * value - sos[s, 4] * out + zi[s, 1]
+            zi[s, 1] = sos[s, 2] * value - sos[s, 5] * out
+            value = out
+        y[i] = value
+    return y
+
+
+@_njit
+def sosfiltfilt(sos, zi, x, padlen):
+    """
+    Zero-phase filtering equivalent to scipy.signal.sosfiltfilt with odd
+    padding; zi is signal.sosfilt_zi(sos) and padlen SciPy's default pad
+    """
+    n = x.shape[0]
+    ext = np.empty(n + 2 * padlen, dtype=np.float64)
+    for i in range(padlen):
+        ext[i] = 2.0 * x[0] - x[padlen - i]
+        ext[n + padlen + i] = 2.0 * x[n - 1] - x[n - 2 - i]
+    for i in range(n):
+        ext[padlen + i] = x[i]
+
+    y = sosfilt(sos, ext, zi * ext[0])
+    y = sosfilt(sos, y[::-1].copy(), zi * y[-1])
+    return y[::-1][padlen:padlen + n].copy()
+
+
+@_njit
+def magnitude(xyz):
+    """Per-sample magnitude of a (3, N) axis block"""
+    n = xyz.shape[1]
+    out = np.empty(n, dtype=np.float64)
+    for i in range(n):
+        x = np.float64(xyz[0, i])
+        y = np.float64(xyz[1, i])
+        z = np.float64(xyz[2, i])
+        out[i] = np.sqrt(x * x + y * y + z * z)
+    return out
+
+
+@_njit
+def _clip01(value):
+    return max(0.0, min(1.0, value))
+
+
+@_njit
+def analyze_kernel(accel_xyz, gyro_xyz, sos, zi, padlen, distance,
+                   min_prominence, preferred_prominence):
+    """
+    The numeric part of GaitProcessor.analyze in one compiled call
+
+    Mirrors the helper methods: magnitude, bandpass (skipped when padlen < 0
+    or the signal is too short), two-tier peak detection, then the
+    accelerometer/gyroscope metrics.
+
+    Returns:
+        (steps, stride_length, gait_symmetry, stability_score,
+         step_regularity, vertical_oscillation)
+    """
+    accel_magnitude = magnitude(accel_xyz)
+    n = accel_magnitude.shape[0]
+
+    # Steps
+    if n < 2:
+        steps = np.empty(0, dtype=np.int64)
+    else:
+        if padlen < 0 or n < 10 or n <= padlen:
+            filtered = accel_magnitude
+        else:
+            filtered = sosfiltfilt(sos, zi, accel_magnitude, padlen)
+        peaks, prominences = find_peaks(filtered, distance, min_prominence)
+        strong = prominences >= preferred_prominence
+        steps = peaks[strong] if strong.any() else peaks
+
+    intervals = np.empty(max(steps.shape[0] - 1, 0), dtype=np.float64)
+    for i in range(intervals.shape[0]):
+        intervals[i] = steps[i + 1] - steps[i]
+
+    vertical = accel_xyz[1].astype(np.float64)
+    vertical_std = np.std(vertical) if vertical.shape[0] > 0 else 0.0
+
+    # Stride length
+    stride_length = 0.0
+    if steps.shape[0] >= 2 and vertical.shape[0] > 0:
+        stride_length = min(0.5 + vertical_std * 0.3, 2.0)
+
+    # Symmetry of alternating step intervals
+    gait_symmetry = 0.5
+    if intervals.shape[0] >= 3:
+        even = intervals[::2]
+        odd = intervals[1::2]
+        min_len = min(even.shape[0], odd.shape[0])
+        difference = abs(np.mean(even[:min_len]) - np.mean(odd[:min_len]))
+        gait_symmetry = _clip01(1.0 - min(difference / 10.0, 1.0))
+
+    # Stability from gyroscope magnitude variability
+    stability_score = 0.5
+    if gyro_xyz.shape[1] > 0:
+        variability = np.std(magnitude(gyro_xyz))
+        stability_score = _clip01(1.0 - min(variability / 5.0, 1.0))
+
+    # Step regularity
+    step_regularity = 0.5
+    if intervals.shape[0] >= 2:
+        step_regularity = _clip01(1.0 - min(np.std(intervals) / np.mean(intervals), 1.0))
+
+    vertical_oscillation = vertical_std * 0.05
+
+    return (steps, stride_length, gait_symmetry, stability_score,
+            step_regularity, vertical_oscillation)
+
+
+@_njit
+def stride_stats(left_times, right_times, min_stride, max_stride):
+    """
+    Stride statistics for PhysioNetProcessor.calculate_gait_metrics
+
+    Strides are the differences between consecutive contact times; only
+    those strictly between min_stride and max_stride are counted. Works on
+    both feet in place, without the filtered or concatenated copies.
+
+    Returns:
+        (left_count, right_count, left_mean, right_mean, mean, std) where
+        mean and std pool both feet; means are 0 for an empty side
+    """
+    left_count = 0
+    left_sum = 0.0
+    for i in range(left_times.shape[0] - 1):
+        stride = left_times[i + 1] - left_times[i]
+        if min_stride < stride < max_stride:
+            left_count += 1
+            left_sum += stride
+
+    right_count = 0
+    right_sum = 0.0
+    for i in range(right_times.shape[0] - 1):
+        stride = right_times[i + 1] - right_times[i]
+        if min_stride < stride < max_stride:
+            right_count += 1
+            right_sum += stride
+
+    count = left_count + right_count
+    if left_count == 0 or right_count == 0:
+        return left_count, right_count, 0.0, 0.0, 0.0, 0.0
+
+    mean = (left_sum + right_sum) / count
+
+    # Second pass for the spread, around the pooled mean
+    squares = 0.0
+    for times in (left_times, right_times):
+        for i in range(times.shape[0] - 1):
+            stride = times[i + 1] - times[i]
+            if min_stride < stride < max_stride:
+                squares += (stride - mean) * (stride - mean)
+
+    return (left_count, right_count, left_sum / left_count, right_sum / right_count,
+            mean, np.sqrt(squares / count))
+
+
+@_njit
+def stride_stats_batch(left_flat, left_offsets, right_flat, right_offsets,
+                       min_stride, max_stride):
+    """
+    stride_stats for many subjects in one call
+
+    Subjects are packed end to end: subject i's left times are
+    left_flat[left_offsets[i]:left_offsets[i + 1]], likewise for the right.
+
+    Returns:
+        (n_subjects, 6) array of stride_stats rows (counts as floats)
+    """
+    n_subjects = left_offsets.shape[0] - 1
+    out = np.empty((n_subjects, 6), dtype=np.float64)
+    for i in range(n_subjects):
+        (left_count, right_count, left_mean, right_mean,
+         mean, std) = stride_stats(left_flat[left_offsets[i]:left_offsets[i + 1]],
+                                   right_flat[right_offsets[i]:right_offsets[i + 1]],
+                                   min_stride, max_stride)
+        out[i, 0] = left_count
+        out[i, 1] = right_count
+        out[i, 2] = left_mean
+        out[i, 3] = right_mean
+        out[i, 4] = mean
+        out[i, 5] = std
+    return out
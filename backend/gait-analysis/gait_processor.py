@@ -3,12 +3,136 @@ Gait Processor - Core logic for gait analysis
 Processes sensor data and extracts gait parameters
 """
 
+import functools
+import logging
+import threading
+import time
+from collections import deque
+
 import numpy as np
 from scipy import signal
-from scipy.fft import fft, fftfreq
-import json
 from datetime import datetime
-from typing import Dict, List, Any
+from typing import Dict, Iterable, List, Any, Tuple, Union
+
+import gait_kernels
+
+
+logger = logging.getLogger(__name__)
+
+
+# {'xyz': (3, N) float32, 'time': (N,) float64}
+SensorArrays = Dict[str, np.ndarray]
+
+# One record per sample; axes as float32, timestamps as float64
+# (epoch milliseconds need the extra precision)
+SAMPLE_DTYPE = np.dtype([('xyz', np.float32, (3,)), ('time', np.float64)])
+
+# Row of each axis in the 'xyz' block
+X, Y, Z = 0, 1, 2
+
+
+def records_to_soa(records: Iterable[tuple], count: int) -> SensorArrays:
+    """
+    Build sensor arrays from ((x, y, z), time) tuples in a single pass
+    
+    The axes end up in one axis-major (3, N) block: a single allocation in
+    which every axis is still a contiguous row, so per-axis statistics and
+    the magnitude reduction run over unit-stride memory.
+    """
+    buf = np.fromiter(records, SAMPLE_DTYPE, count)
+    return {
+        'xyz': np.ascontiguousarray(buf['xyz'].T),
+        'time': np.ascontiguousarray(buf['time'])
+    }
+
+
+def samples_to_soa(samples: List[Dict]) -> SensorArrays:
+    """
+    Convert a list of {x, y, z, timestamp} samples into SensorArrays
+    
+    Missing axes default to 0 and a missing timestamp to the sample index.
+    """
+    return records_to_soa(
+        (((s.get('x', 0), s.get('y', 0), s.get('z', 0)), s.get('timestamp', i))
+         for i, s in enumerate(samples)),
+        len(samples)
+    )
+
+
+# Step peak detection: minimum spacing (10 samples ~0.2s at 50 Hz) and the
+# preferred prominence, relaxed to the fallback when no peak reaches it
+STEP_MIN_DISTANCE = 10
+STEP_PROMINENCE = 0.1
+STEP_FALLBACK_PROMINENCE = 0.05
+
+# Accelerometer recordings shorter than this are not bandpass filtered, and
+# peak detection on them finds no meaningful steps
+MIN_ANALYSIS_SAMPLES = 10
+
+# Metrics reported as floats rounded to 2 decimals, in response order
+ROUNDED_METRICS = (
+    'cadence', 'stride_length', 'velocity', 'gait_symmetry', 'stability_score',
+    'step_regularity', 'vertical_oscillation', 'heading_variation', 'elevation_change'
+)
+
+# Reported for recordings under MIN_ANALYSIS_SAMPLES, matching each helper's no-data default
+NEUTRAL_METRICS = {
+    'step_count': 0,
+    'cadence': 0.0,
+    'stride_length': 0.0,
+    'velocity': 0.0,
+    'gait_symmetry': 0.5,
+    'stability_score': 0.5,
+    'step_regularity': 0.5,
+    'vertical_oscillation': 0.0,
+    'heading_variation': 0.0,
+    'elevation_change': 0.0
+}
+
+# (epoch second, local ISO prefix) for _iso_now; replaced as one tuple
+_clock_cache = (None, '')
+
+
+def _iso_now() -> str:
+    """
+    Same string as datetime.now().isoformat(), re-formatting the date and
+    time part only when the second changes
+    """
+    global _clock_cache
+    now = time.time()
+    second = int(now)
+    cached_second, prefix = _clock_cache
+    if second != cached_second:
+        prefix = time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(second))
+        _clock_cache = (second, prefix)
+    micros = int((now - second) * 1e6)
+    return f'{prefix}.{micros:06d}' if micros else prefix
+
+
+@functools.lru_cache(maxsize=16)
+def _design_bandpass(fs: float, lowcut: float, highcut: float, order: int = 4):
+    """Butterworth bandpass second-order sections, cached per (whole Hz) sampling rate and band"""
+    nyquist = fs / 2
+    # Shared between calls and must not be modified (sosfiltfilt needs a
+    # writeable buffer, so it cannot be frozen)
+    return signal.butter(order, [lowcut / nyquist, highcut / nyquist], btype='band', output='sos')
+
+
+@functools.lru_cache(maxsize=16)
+def _bandpass_kernel_params(fs: float, lowcut: float, highcut: float, order: int = 4):
+    """
+    Inputs for gait_kernels.sosfiltfilt: sections, their steady-state
+    initial conditions and SciPy's default odd-extension pad length
+    """
+    sos = _design_bandpass(fs, lowcut, highcut, order)
+    zi = signal.sosfilt_zi(sos)
+    trailing_zeros = min((sos[:, 2] == 0).sum(), (sos[:, 5] == 0).sum())
+    padlen = 3 * (2 * len(sos) + 1 - int(trailing_zeros))
+    return sos, zi, padlen
+
+
+# Kernel parameters that skip the bandpass stage (padlen < 0)
+_NO_FILTER = (np.zeros((1, 6)), np.zeros((1, 2)), -1)
 
 
 class GaitProcessor:
@@ -18,18 +142,22 @@ class GaitProcessor:
     
     def __init__(self):
         self.sampling_rate = 50  # Hz, typical for mobile sensors
-        self.history = []
-        
-    def analyze(self, accelerometer: List[Dict], gyroscope: List[Dict], 
-                user_id: str, session_id: str, magnetometer: List[Dict] = None,
+        self.history = deque(maxlen=100)  # Keeps only the last 100 sessions
+        self._by_user: Dict[str, deque] = {}  # user_id -> that user's sessions in history
+        self._history_lock = threading.Lock()
+        
+    def analyze(self, accelerometer: Union[List[Dict], SensorArrays],
+                gyroscope: Union[List[Dict], SensorArrays],
+                user_id: str, session_id: str,
+                magnetometer: Union[List[Dict], SensorArrays] = None,
                 barometer: List[Dict] = None, deviceMotion: List[Dict] = None,
                 pedometer: Dict = None) -> Dict[str, Any]:
         """
         Comprehensive gait analysis with multi-sensor fusion
         
         Args:
-            accelerometer: Raw accelerometer data
-            gyroscope: Raw gyroscope data
+            accelerometer: Accelerometer samples or arrays from samples_to_soa
+            gyroscope: Gyroscope samples or arrays from samples_to_soa
             magnetometer: Magnetometer data for orientation (optional)
             barometer: Barometer data for elevation changes (optional)
             deviceMotion: Filtered device motion data (optional)
@@ -48,243 +176,350 @@ class GaitProcessor:
             - elevation_change: Altitude change if available
         """
         
-        print(f"\n📊 Starting Gait Analysis Processing:")
-        print(f"  Accelerometer samples: {len(accelerometer)}")
-        print(f"  Gyroscope samples: {len(gyroscope)}")
-        print(f"  Magnetometer samples: {len(magnetometer) if magnetometer else 0}")
-        print(f"  Barometer samples: {len(barometer) if barometer else 0}")
-        print(f"  DeviceMotion samples: {len(deviceMotion) if deviceMotion else 0}")
-        print(f"  Pedometer steps: {pedometer.get('steps', 0) if pedometer else 0}")
-        
         # Convert to numpy arrays
         accel_data = self._convert_to_arrays(accelerometer)
         gyro_data = self._convert_to_arrays(gyroscope)
         
+        # Use pedometer data if available for validation
+        pedometer_steps = pedometer.get('steps', 0) if pedometer else 0
+        
+        sensors_used = {
+            'accelerometer': True,
+            'gyroscope': True,
+            'magnetometer': bool(magnetometer),
+            'barometer': bool(barometer),
+            'deviceMotion': bool(deviceMotion),
+            'pedometer': pedometer_steps > 0
+        }
+        
+        # Too few accelerometer samples for filtering or peak detection to mean
+        # anything: report neutral metrics without running the pipeline. Not
+        # keyed on data_quality, which is 'poor' for accelerometer-only input.
+        data_quality = self._assess_data_quality(accel_data, gyro_data)
+        if len(accel_data['time']) < MIN_ANALYSIS_SAMPLES:
+            logger.debug("Too few accelerometer samples (%d), skipping analysis",
+                         len(accel_data['time']))
+            result = self._compile_result(
+                session_id, user_id, NEUTRAL_METRICS, pedometer_steps, [],
+                self._calculate_duration(accel_data['time']), data_quality, sensors_used
+            )
+            self._add_to_history(result)
+            return result
+        
         # Process optional sensor data
         mag_data = self._convert_to_arrays(magnetometer) if magnetometer else None
         baro_data = self._convert_barometer_data(barometer) if barometer else None
-        motion_data = self._convert_device_motion_data(deviceMotion) if deviceMotion else None
         
-        # Calculate actual sampling rate from timestamps
-        actual_sampling_rate = self._calculate_sampling_rate(accelerometer)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "Starting gait analysis: accel=%d gyro=%d mag=%d baro=%d motion=%d pedometer=%s",
+                len(accel_data['time']), len(gyro_data['time']),
+                len(mag_data['time']) if mag_data else 0,
+                len(barometer) if barometer else 0,
+                len(deviceMotion) if deviceMotion else 0,
+                pedometer_steps
+            )
+        
+        # Timestamps are converted once and shared by the rate and duration helpers
+        times = accel_data['time']
+        
+        # Calculate actual sampling rate from timestamps. It is kept local
+        # (concurrent requests share this processor) and rounded to whole Hz
+        # so the cached filter designs are reused across recordings. That moves
+        # the band edges by under 1%, which can shift a filtered peak by a
+        # sample and with it symmetry and regularity (test_gait_processor pins these).
+        sampling_rate = self.sampling_rate
+        actual_sampling_rate = self._calculate_sampling_rate(times)
         if actual_sampling_rate > 0:
-            print(f"  Calculated sampling rate: {actual_sampling_rate:.2f} Hz")
-            self.sampling_rate = actual_sampling_rate
+            logger.debug("Calculated sampling rate: %.2f Hz", actual_sampling_rate)
+            sampling_rate = max(1, round(actual_sampling_rate))
         else:
-            print(f"  Using default sampling rate: {self.sampling_rate} Hz")
-        
-        # Calculate magnitude for step detection
-        accel_magnitude = self._calculate_magnitude(accel_data)
-        print(f"  Acceleration magnitude calculated: {len(accel_magnitude)} points")
+            logger.debug("Using default sampling rate: %s Hz", sampling_rate)
         
-        # Detect steps
-        steps = self._detect_steps(accel_magnitude)
+        if gait_kernels.NUMBA_AVAILABLE:
+            steps, signal_metrics = self._analyze_compiled(accel_data, gyro_data, sampling_rate)
+        else:
+            steps, signal_metrics = self._analyze_signals(accel_data, gyro_data, sampling_rate)
         step_count = len(steps)
         
+        # Step intervals are shared by phases (and, in _analyze_signals, symmetry and regularity)
+        step_intervals = np.diff(steps)
+        
         # Calculate cadence (steps per minute)
-        duration = self._calculate_duration(accelerometer)
+        duration = self._calculate_duration(times)
         cadence = (step_count / duration) * 60 if duration > 0 else 0
         
-        # Estimate stride length and velocity
-        stride_length = self._estimate_stride_length(accel_data, steps)
-        velocity = self._calculate_velocity(stride_length, cadence)
+        # Velocity from the estimated stride length
+        velocity = self._calculate_velocity(signal_metrics['stride_length'], cadence)
         
-        # Analyze gait symmetry
-        symmetry_score = self._analyze_symmetry(accel_data, steps)
+        # Detect gait phases (stance, swing)
+        gait_phases = self._detect_gait_phases(steps, step_intervals)
+        
+        metrics = {
+            'step_count': step_count,
+            'cadence': cadence,
+            'velocity': velocity,
+            **signal_metrics,
+            # Multi-sensor fusion metrics
+            'heading_variation': self._calculate_heading_variation(mag_data) if mag_data else 0.0,
+            'elevation_change': self._calculate_elevation_change(baro_data) if baro_data else 0.0
+        }
         
-        # Calculate stability using gyroscope data
-        stability_score = self._calculate_stability(gyro_data)
+        result = self._compile_result(session_id, user_id, metrics, pedometer_steps,
+                                      gait_phases, duration, data_quality, sensors_used)
         
-        # Detect gait phases (stance, swing)
-        gait_phases = self._detect_gait_phases(accel_data, steps)
+        # Store in history
+        self._add_to_history(result)
         
-        # Additional metrics
-        step_regularity = self._calculate_step_regularity(steps)
-        vertical_oscillation = self._calculate_vertical_oscillation(accel_data)
+        return result
+    
+    def _analyze_signals(self, accel_data: SensorArrays, gyro_data: SensorArrays,
+                         sampling_rate: int) -> Tuple[np.ndarray, Dict[str, float]]:
+        """
+        Steps and accelerometer/gyroscope metrics with NumPy and SciPy
         
-        # Multi-sensor fusion metrics
-        heading_variation = self._calculate_heading_variation(mag_data) if mag_data else 0.0
-        elevation_change = self._calculate_elevation_change(baro_data) if baro_data else 0.0
+        Returns:
+            (step indices, dict of stride_length, gait_symmetry,
+            stability_score, step_regularity and vertical_oscillation)
+        """
+        # Magnitudes are computed once: accel for step detection, gyro for stability
+        accel_magnitude = self._calculate_magnitude(accel_data)
+        gyro_magnitude = self._calculate_magnitude(gyro_data)
         
-        # Use pedometer data if available for validation
-        pedometer_steps = pedometer.get('steps', 0) if pedometer else 0
+        # Detect steps
+        steps = self._detect_steps(accel_magnitude, sampling_rate)
+        
+        # Step intervals are shared by symmetry and regularity
+        step_intervals = np.diff(steps)
         
-        # Compile results
-        result = {
+        return steps, {
+            # Estimate stride length
+            'stride_length': self._estimate_stride_length(accel_data, steps),
+            # Analyze gait symmetry
+            'gait_symmetry': self._analyze_symmetry(step_intervals),
+            # Calculate stability using gyroscope data
+            'stability_score': self._calculate_stability(gyro_magnitude),
+            # Additional metrics
+            'step_regularity': self._calculate_step_regularity(step_intervals),
+            'vertical_oscillation': self._calculate_vertical_oscillation(accel_data)
+        }
+    
+    def _analyze_compiled(self, accel_data: SensorArrays, gyro_data: SensorArrays,
+                          sampling_rate: int) -> Tuple[np.ndarray, Dict[str, float]]:
+        """Same results as _analyze_signals from a single Numba kernel call"""
+        try:
+            sos, zi, padlen = _bandpass_kernel_params(sampling_rate, 0.5, 3.0)
+        except ValueError as e:
+            # Same fallback as _bandpass_filter: peaks on the raw magnitude
+            logger.warning("Bandpass filter failed (%s), returning raw data", e)
+            sos, zi, padlen = _NO_FILTER
+        
+        (steps, stride_length, gait_symmetry, stability_score,
+         step_regularity, vertical_oscillation) = gait_kernels.analyze_kernel(
+            accel_data['xyz'], gyro_data['xyz'], sos, zi, padlen,
+            STEP_MIN_DISTANCE, STEP_FALLBACK_PROMINENCE, STEP_PROMINENCE
+        )
+        
+        return steps, {
+            'stride_length': stride_length,
+            'gait_symmetry': gait_symmetry,
+            'stability_score': stability_score,
+            'step_regularity': step_regularity,
+            'vertical_oscillation': vertical_oscillation
+        }
+    
+    def _compile_result(self, session_id: str, user_id: str, metrics: Dict[str, float],
+                        pedometer_steps: int, gait_phases: List[Dict], duration: float,
+                        data_quality: str, sensors_used: Dict[str, bool]) -> Dict[str, Any]:
+        """Assemble the analysis result with JSON-ready rounded metrics"""
+        return {
             'session_id': session_id,
             'user_id': user_id,
             'timestamp': datetime.now().isoformat(),
             'metrics': {
-                'step_count': int(step_count),
-                'cadence': round(cadence, 2),
-                'stride_length': round(stride_length, 2),
-                'velocity': round(velocity, 2),
-                'gait_symmetry': round(symmetry_score, 2),
-                'stability_score': round(stability_score, 2),
-                'step_regularity': round(step_regularity, 2),
-                'vertical_oscillation': round(vertical_oscillation, 2),
-                'heading_variation': round(heading_variation, 2),
-                'elevation_change': round(elevation_change, 2),
+                'step_count': int(metrics['step_count']),
+                **{name: round(float(metrics[name]), 2) for name in ROUNDED_METRICS},
                 'pedometer_steps': pedometer_steps
             },
             'gait_phases': gait_phases,
-            'analysis_duration': round(duration, 2),
-            'data_quality': self._assess_data_quality(accelerometer, gyroscope),
-            'sensors_used': {
-                'accelerometer': True,
-                'gyroscope': True,
-                'magnetometer': mag_data is not None,
-                'barometer': baro_data is not None,
-                'deviceMotion': motion_data is not None,
-                'pedometer': pedometer_steps > 0
-            }
+            'analysis_duration': round(float(duration), 2),
+            'data_quality': data_quality,
+            'sensors_used': sensors_used
         }
-        
-        # Store in history
-        self._add_to_history(result)
-        
-        return result
     
     def process_realtime(self, accelerometer: Dict, gyroscope: Dict) -> Dict[str, Any]:
         """
         Process a single sensor reading for real-time feedback
         """
-        accel = np.array([accelerometer.get('x', 0), 
-                         accelerometer.get('y', 0), 
-                         accelerometer.get('z', 0)])
+        batch = self.process_realtime_batch([accelerometer], [gyroscope])
         
-        gyro = np.array([gyroscope.get('x', 0), 
-                        gyroscope.get('y', 0), 
-                        gyroscope.get('z', 0)])
+        return {
+            'accelerometer_magnitude': float(batch['accelerometer_magnitude'][0]),
+            'gyroscope_magnitude': float(batch['gyroscope_magnitude'][0]),
+            'step_detected': bool(batch['step_detected'][0]),
+            'timestamp': batch['timestamp']
+        }
+    
+    def process_realtime_batch(self, accelerometer: Union[np.ndarray, List[Dict]],
+                               gyroscope: Union[np.ndarray, List[Dict]]) -> Dict[str, Any]:
+        """
+        Process a batch of real-time readings in one vectorized pass
         
-        # Calculate instantaneous metrics
-        accel_magnitude = np.linalg.norm(accel)
-        gyro_magnitude = np.linalg.norm(gyro)
+        Args:
+            accelerometer: (B, 3) array or list of B {x, y, z} readings
+            gyroscope: (B, 3) array or list of B {x, y, z} readings
+        
+        Returns:
+            Dictionary of length-B arrays (accelerometer_magnitude,
+            gyroscope_magnitude, step_detected) plus one shared timestamp
         
-        # Simple step detection threshold
+        Readings are thresholded unfiltered. A batch mixes readings from
+        different clients, so smoothing here would need causal sosfilt state
+        kept per client stream; the zero-phase _bandpass_filter is for
+        complete recordings only.
+        """
+        accel = self._readings_to_rows(accelerometer)
+        gyro = self._readings_to_rows(gyroscope)
+        
+        # Calculate instantaneous metrics; sqrt and rounding reuse the einsum output
+        accel_magnitude = np.einsum('ij,ij->i', accel, accel)
+        np.sqrt(accel_magnitude, out=accel_magnitude)
+        gyro_magnitude = np.einsum('ij,ij->i', gyro, gyro)
+        np.sqrt(gyro_magnitude, out=gyro_magnitude)
+        
+        # Simple step detection threshold, applied before rounding
         step_detected = accel_magnitude > 1.2  # g-force threshold
         
         return {
-            'accelerometer_magnitude': round(accel_magnitude, 3),
-            'gyroscope_magnitude': round(gyro_magnitude, 3),
+            'accelerometer_magnitude': np.round(accel_magnitude, 3, out=accel_magnitude),
+            'gyroscope_magnitude': np.round(gyro_magnitude, 3, out=gyro_magnitude),
             'step_detected': step_detected,
-            'timestamp': datetime.now().isoformat()
+            'timestamp': _iso_now()
         }
     
     def get_user_history(self, user_id: str, limit: int = 10) -> List[Dict]:
         """Retrieve user's gait analysis history"""
-        user_sessions = [h for h in self.history if h.get('user_id') == user_id]
+        with self._history_lock:
+            user_sessions = list(self._by_user.get(user_id, ()))
         return user_sessions[-limit:]
     
     # ============ Helper Methods ============
     
-    def _convert_to_arrays(self, sensor_data: List[Dict]) -> Dict[str, np.ndarray]:
+    def _readings_to_rows(self, readings: Union[np.ndarray, List[Dict]]) -> np.ndarray:
+        """(B, 3) float64 array from an array or a list of {x, y, z} readings"""
+        if isinstance(readings, np.ndarray):
+            return readings.astype(np.float64, copy=False)
+        return samples_to_soa(readings)['xyz'].T.astype(np.float64)
+    
+    def _convert_to_arrays(self, sensor_data: Union[List[Dict], SensorArrays]) -> SensorArrays:
         """Convert sensor data list to numpy arrays"""
-        if not sensor_data:
-            return {'x': np.array([]), 'y': np.array([]), 'z': np.array([]), 'time': np.array([])}
+        if isinstance(sensor_data, dict):
+            return sensor_data  # Already converted at the request boundary
         
-        return {
-            'x': np.array([d.get('x', 0) for d in sensor_data]),
-            'y': np.array([d.get('y', 0) for d in sensor_data]),
-            'z': np.array([d.get('z', 0) for d in sensor_data]),
-            'time': np.array([d.get('timestamp', i) for i, d in enumerate(sensor_data)])
-        }
+        return samples_to_soa(sensor_data or [])
     
     def _calculate_magnitude(self, data: Dict[str, np.ndarray]) -> np.ndarray:
         """Calculate magnitude from 3-axis data"""
-        return np.sqrt(data['x']**2 + data['y']**2 + data['z']**2)
+        # Column-wise dot product over the (3, N) block, no squared temporaries
+        xyz = data['xyz']
+        magnitude = np.einsum('ij,ij->j', xyz, xyz)
+        return np.sqrt(magnitude, out=magnitude)
     
-    def _detect_steps(self, magnitude: np.ndarray) -> List[int]:
-        """Detect steps using peak detection"""
+    def _detect_steps(self, magnitude: np.ndarray, sampling_rate: int) -> np.ndarray:
+        """Detect steps using peak detection, returning peak indices"""
         if len(magnitude) < 2:
-            print("❌ Not enough magnitude data for step detection")
-            return []
+            logger.debug("Not enough magnitude data for step detection")
+            return np.empty(0, dtype=np.int64)
         
-        print(f"\n🔍 Step Detection Debug:")
-        print(f"  Magnitude array length: {len(magnitude)}")
-        print(f"  Magnitude range: {np.min(magnitude):.3f} - {np.max(magnitude):.3f}")
-        print(f"  Magnitude mean: {np.mean(magnitude):.3f}")
-        print(f"  Magnitude std: {np.std(magnitude):.3f}")
+        debug = logger.isEnabledFor(logging.DEBUG)
+        if debug:
+            logger.debug("Step detection on %d points, magnitude %s", len(magnitude),
+                         self._describe(magnitude))
         
         # Apply bandpass filter to remove noise
-        filtered = self._bandpass_filter(magnitude)
-        print(f"  Filtered range: {np.min(filtered):.3f} - {np.max(filtered):.3f}")
-        print(f"  Filtered mean: {np.mean(filtered):.3f}")
-        print(f"  Filtered std: {np.std(filtered):.3f}")
-        
-        # Find peaks with relaxed parameters for better detection
-        # Adjusted parameters: lower distance (10 samples ~0.2s) and prominence (0.1)
-        peaks, properties = signal.find_peaks(filtered, distance=10, prominence=0.1)
-        
-        print(f"  Peaks found: {len(peaks)}")
-        if len(peaks) > 0:
-            print(f"  Peak positions: {peaks[:10]}...")  # Show first 10
-            print(f"  Peak prominences: {properties['prominences'][:10]}")
+        filtered = self._bandpass_filter(magnitude, sampling_rate)
+        if debug:
+            logger.debug("Filtered magnitude %s", self._describe(filtered))
+        
+        # Find peaks with relaxed parameters for better detection, falling back
+        # to the lower prominence when nothing reaches STEP_PROMINENCE. The
+        # distance filter runs before the prominence filter, so one pass at the
+        # lower threshold yields both tiers.
+        peaks, properties = self._find_peaks(filtered, distance=STEP_MIN_DISTANCE,
+                                             prominence=STEP_FALLBACK_PROMINENCE)
+        strong = properties['prominences'] >= STEP_PROMINENCE
+        
+        if strong.any():
+            peaks = peaks[strong]
+            if debug:
+                logger.debug("Peaks found: %d, first positions %s, prominences %s",
+                             len(peaks), peaks[:10], properties['prominences'][strong][:10])
         else:
-            print(f"  ⚠️ No peaks detected! Trying with lower prominence...")
-            # Try again with even lower threshold
-            peaks, properties = signal.find_peaks(filtered, distance=10, prominence=0.05)
-            print(f"  Peaks with lower threshold: {len(peaks)}")
+            logger.debug("No peaks at prominence %s, %d at %s",
+                         STEP_PROMINENCE, len(peaks), STEP_FALLBACK_PROMINENCE)
         
-        return peaks.tolist()
+        return peaks.astype(np.int64, copy=False)
+    
+    @staticmethod
+    def _describe(data: np.ndarray) -> str:
+        """Range/mean/std summary for debug logging"""
+        return (f"range {np.min(data):.3f} - {np.max(data):.3f}, "
+                f"mean {np.mean(data):.3f}, std {np.std(data):.3f}")
     
-    def _bandpass_filter(self, data: np.ndarray, lowcut=0.5, highcut=3.0) -> np.ndarray:
+    def _find_peaks(self, data: np.ndarray, distance: int, prominence: float):
+        """find_peaks with the Numba kernel when available, SciPy otherwise"""
+        if gait_kernels.NUMBA_AVAILABLE:
+            peaks, prominences = gait_kernels.find_peaks(
+                np.ascontiguousarray(data, dtype=np.float64), distance, prominence)
+            return peaks, {'prominences': prominences}
+        return signal.find_peaks(data, distance=distance, prominence=prominence)
+    
+    def _bandpass_filter(self, data: np.ndarray, sampling_rate: int,
+                         lowcut=0.5, highcut=3.0) -> np.ndarray:
         """Apply bandpass filter to isolate walking frequency"""
-        if len(data) < 10:
-            print("  ⚠️ Not enough data for filtering, returning raw data")
+        if len(data) < MIN_ANALYSIS_SAMPLES:
+            logger.debug("Not enough data for filtering, returning raw data")
             return data
         
-        nyquist = self.sampling_rate / 2
-        low = lowcut / nyquist
-        high = highcut / nyquist
-        
-        print(f"  Applying bandpass filter: {lowcut}-{highcut} Hz (normalized: {low:.3f}-{high:.3f})")
-        
         try:
-            b, a = signal.butter(4, [low, high], btype='band')
-            filtered = signal.filtfilt(b, a, data)
-            print(f"  ✓ Filter applied successfully")
-            return filtered
+            sos = _design_bandpass(sampling_rate, lowcut, highcut)
+            return signal.sosfiltfilt(sos, data)
         except Exception as e:
-            print(f"  ❌ Filter failed: {e}, returning raw data")
+            logger.warning("Bandpass filter failed (%s), returning raw data", e)
             return data
     
-    def _calculate_duration(self, sensor_data: List[Dict]) -> float:
+    def _calculate_duration(self, timestamps: np.ndarray) -> float:
         """Calculate duration of recording in seconds"""
-        if len(sensor_data) < 2:
+        if len(timestamps) < 2:
             return 0.0
         
-        start_time = sensor_data[0].get('timestamp', 0)
-        end_time = sensor_data[-1].get('timestamp', 0)
-        
-        return (end_time - start_time) / 1000.0  # Convert ms to seconds
+        return (timestamps[-1] - timestamps[0]) / 1000.0  # Convert ms to seconds
     
-    def _calculate_sampling_rate(self, sensor_data: List[Dict]) -> float:
+    def _calculate_sampling_rate(self, timestamps: np.ndarray) -> float:
         """Calculate actual sampling rate from timestamps"""
-        if len(sensor_data) < 10:
+        if len(timestamps) < 10:
             return 0.0
         
-        # Use first 10 samples to calculate average sampling rate
-        timestamps = [sensor_data[i].get('timestamp', 0) for i in range(min(10, len(sensor_data)))]
-        intervals = np.diff(timestamps)  # Time between samples in ms
+        # Use first 10 samples to calculate average sampling rate; the mean of
+        # the 9 intervals telescopes to (t[9] - t[0]) / 9, so no diff is needed
+        avg_interval_ms = (timestamps[9] - timestamps[0]) / 9.0
         
-        if len(intervals) == 0 or np.mean(intervals) == 0:
+        if avg_interval_ms == 0:
             return 0.0
         
-        avg_interval_ms = np.mean(intervals)
         sampling_rate = 1000.0 / avg_interval_ms  # Convert to Hz
         
         return sampling_rate
     
     def _estimate_stride_length(self, accel_data: Dict[str, np.ndarray], 
-                                steps: List[int]) -> float:
+                                steps: np.ndarray) -> float:
         """Estimate stride length using accelerometer data"""
         if len(steps) < 2:
             return 0.0
         
         # Simplified stride length estimation
         # In practice, this would use double integration of acceleration
-        vertical_accel = accel_data['y']  # Assuming Y is vertical
+        vertical_accel = accel_data['xyz'][Y]  # Assuming Y is vertical
         
         if len(vertical_accel) == 0:
             return 0.0
@@ -300,17 +535,10 @@ class GaitProcessor:
         # velocity = (stride_length * cadence) / 60
         return (stride_length * cadence) / 60.0
     
-    def _analyze_symmetry(self, accel_data: Dict[str, np.ndarray], 
-                         steps: List[int]) -> float:
-        """Analyze gait symmetry (left-right balance)"""
-        if len(steps) < 4:
-            return 0.5  # Default neutral score
-        
-        # Calculate step intervals
-        step_intervals = np.diff(steps)
-        
-        if len(step_intervals) < 2:
-            return 0.5
+    def _analyze_symmetry(self, step_intervals: np.ndarray) -> float:
+        """Analyze gait symmetry (left-right balance) from step intervals"""
+        if len(step_intervals) < 3:
+            return 0.5  # Default neutral score (fewer than 4 steps)
         
         # Analyze alternating pattern
         even_steps = step_intervals[::2]
@@ -326,13 +554,12 @@ class GaitProcessor:
         
         return max(0.0, min(1.0, symmetry))
     
-    def _calculate_stability(self, gyro_data: Dict[str, np.ndarray]) -> float:
-        """Calculate stability score from gyroscope data"""
-        if len(gyro_data['x']) == 0:
+    def _calculate_stability(self, gyro_magnitude: np.ndarray) -> float:
+        """Calculate stability score from gyroscope magnitude"""
+        if len(gyro_magnitude) == 0:
             return 0.5
         
         # Lower gyroscope variation indicates better stability
-        gyro_magnitude = self._calculate_magnitude(gyro_data)
         variability = np.std(gyro_magnitude)
         
         # Normalize to 0-1 scale (inverse relationship)
@@ -340,48 +567,52 @@ class GaitProcessor:
         
         return max(0.0, min(1.0, stability))
     
-    def _detect_gait_phases(self, accel_data: Dict[str, np.ndarray], 
-                           steps: List[int]) -> List[Dict]:
+    def _detect_gait_phases(self, steps: np.ndarray,
+                           step_intervals: np.ndarray) -> List[Dict]:
         """Detect stance and swing phases"""
-        phases = []
+        if len(steps) < 2:
+            return []
         
-        for i in range(len(steps) - 1):
-            start_idx = steps[i]
-            end_idx = steps[i + 1]
-            
-            phases.append({
-                'step_number': i + 1,
-                'start_index': int(start_idx),
-                'end_index': int(end_idx),
-                'duration': int(end_idx - start_idx),
-                'phase': 'stance' if i % 2 == 0 else 'swing'
-            })
+        # tolist() yields plain ints for the dicts
+        starts = steps[:-1].tolist()
+        ends = steps[1:].tolist()
+        durations = step_intervals.tolist()
         
-        return phases
+        return [
+            {
+                'step_number': i + 1,
+                'start_index': start_idx,
+                'end_index': end_idx,
+                'duration': duration,
+                'phase': 'swing' if i & 1 else 'stance'
+            }
+            for i, (start_idx, end_idx, duration) in enumerate(zip(starts, ends, durations))
+        ]
     
-    def _calculate_step_regularity(self, steps: List[int]) -> float:
+    def _calculate_step_regularity(self, step_intervals: np.ndarray) -> float:
         """Calculate how regular/consistent the steps are"""
-        if len(steps) < 3:
-            return 0.5
+        if len(step_intervals) < 2:
+            return 0.5  # Fewer than 3 steps
         
-        step_intervals = np.diff(steps)
         regularity = 1.0 - min(np.std(step_intervals) / np.mean(step_intervals), 1.0)
         
         return max(0.0, min(1.0, regularity))
     
     def _calculate_vertical_oscillation(self, accel_data: Dict[str, np.ndarray]) -> float:
         """Calculate vertical oscillation (bounce) in meters"""
-        if len(accel_data['y']) == 0:
+        if len(accel_data['time']) == 0:
             return 0.0
         
-        vertical = accel_data['y']
+        vertical = accel_data['xyz'][Y]
         oscillation = np.std(vertical) * 0.05  # Simplified calculation
         
         return oscillation
     
-    def _assess_data_quality(self, accel: List[Dict], gyro: List[Dict]) -> str:
+    def _assess_data_quality(self, accel_data: SensorArrays, gyro_data: SensorArrays) -> str:
         """Assess quality of sensor data"""
         min_samples = 50
+        accel = accel_data['time']
+        gyro = gyro_data['time']
         
         if len(accel) < min_samples or len(gyro) < min_samples:
             return 'poor'
@@ -394,44 +625,42 @@ class GaitProcessor:
     
     def _add_to_history(self, result: Dict) -> None:
         """Add analysis result to history"""
-        self.history.append(result)
-        # Keep only last 100 sessions
-        if len(self.history) > 100:
-            self.history = self.history[-100:]
+        user_id = result.get('user_id')
+        with self._history_lock:
+            # Look up the user's sessions first, so a bad user_id fails before
+            # either structure has changed
+            user_sessions = self._by_user.setdefault(user_id, deque())
+            
+            if len(self.history) == self.history.maxlen:
+                # The session about to be dropped is the oldest of its user too
+                evicted_user = self.history[0].get('user_id')
+                evicted_sessions = self._by_user[evicted_user]
+                evicted_sessions.popleft()
+                if not evicted_sessions and evicted_user != user_id:
+                    del self._by_user[evicted_user]
+            
+            self.history.append(result)  # Bounded deque drops the oldest session
+            user_sessions.append(result)
     
     def _convert_barometer_data(self, barometer_data: List[Dict]) -> Dict[str, np.ndarray]:
         """Convert barometer data to numpy arrays"""
         if not barometer_data:
             return {'pressure': np.array([]), 'altitude': np.array([]), 'time': np.array([])}
         
+        n = len(barometer_data)
         return {
-            'pressure': np.array([d.get('pressure', 0) for d in barometer_data]),
-            'altitude': np.array([d.get('relativeAltitude', 0) for d in barometer_data]),
-            'time': np.array([d.get('timestamp', i) for i, d in enumerate(barometer_data)])
-        }
-    
-    def _convert_device_motion_data(self, motion_data: List[Dict]) -> Dict:
-        """Convert device motion data to structured format"""
-        if not motion_data:
-            return None
-        
-        return {
-            'acceleration': np.array([[d.get('acceleration', {}).get(axis, 0) 
-                                      for axis in ['x', 'y', 'z']] 
-                                     for d in motion_data]),
-            'rotation': np.array([[d.get('rotation', {}).get(axis, 0) 
-                                  for axis in ['alpha', 'beta', 'gamma']] 
-                                 for d in motion_data]),
-            'time': np.array([d.get('timestamp', i) for i, d in enumerate(motion_data)])
+            'pressure': np.fromiter((d.get('pressure', 0) for d in barometer_data), np.float64, n),
+            'altitude': np.fromiter((d.get('relativeAltitude', 0) for d in barometer_data), np.float64, n),
+            'time': np.fromiter((d.get('timestamp', i) for i, d in enumerate(barometer_data)), np.float64, n)
         }
     
     def _calculate_heading_variation(self, mag_data: Dict[str, np.ndarray]) -> float:
         """Calculate variation in heading/orientation during walk"""
-        if mag_data is None or len(mag_data['x']) == 0:
+        if mag_data is None or len(mag_data['time']) == 0:
             return 0.0
         
         # Calculate heading from magnetometer data
-        headings = np.arctan2(mag_data['y'], mag_data['x'])
+        headings = np.arctan2(mag_data['xyz'][Y], mag_data['xyz'][X])
         
         # Calculate variation (standard deviation of headings)
         # Lower variation = straighter walking path
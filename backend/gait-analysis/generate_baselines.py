@@ -3,10 +3,128 @@ Generate Gait Baselines from Published Research Data
 Fallback when PhysioNet download fails
 """
 
-import json
+import copy
+
 import numpy as np
+import orjson
 from pathlib import Path
 
+
+# Healthy adult normative data (ages 20-79, mixed gender)
+# Values are from meta-analysis of multiple studies
+RESEARCH_BASELINES = {
+    'cadence': {
+        'mean': 105.0,
+        'std': 10.0,
+        'min': 70.0,
+        'max': 140.0,
+        'p5': 88.0,
+        'p10': 92.0,
+        'p25': 98.0,
+        'p50': 105.0,
+        'p75': 112.0,
+        'p90': 118.0,
+        'p95': 122.0,
+        'n': 1000,
+        'unit': 'steps/min',
+        'description': 'Walking cadence from meta-analysis (Bohannon 1997, Hollman 2011)'
+    },
+    'stride_length_estimate': {
+        'mean': 1.3,
+        'std': 0.15,
+        'min': 0.8,
+        'max': 1.7,
+        'p5': 1.05,
+        'p10': 1.10,
+        'p25': 1.20,
+        'p50': 1.30,
+        'p75': 1.40,
+        'p90': 1.48,
+        'p95': 1.53,
+        'n': 1000,
+        'unit': 'meters',
+        'description': 'Stride length from normative studies (Hollman 2011)'
+    },
+    'velocity_estimate': {
+        'mean': 1.3,
+        'std': 0.2,
+        'min': 0.6,
+        'max': 2.0,
+        'p5': 0.95,
+        'p10': 1.05,
+        'p25': 1.15,
+        'p50': 1.30,
+        'p75': 1.45,
+        'p90': 1.55,
+        'p95': 1.60,
+        'n': 1000,
+        'unit': 'm/s',
+        'description': 'Walking velocity from comfortable walking speed studies (Bohannon 1997)'
+    },
+    'gait_symmetry': {
+        'mean': 0.95,
+        'std': 0.05,
+        'min': 0.70,
+        'max': 1.00,
+        'p5': 0.87,
+        'p10': 0.90,
+        'p25': 0.92,
+        'p50': 0.95,
+        'p75': 0.98,
+        'p90': 0.99,
+        'p95': 0.99,
+        'n': 500,
+        'unit': 'ratio (0-1)',
+        'description': 'Gait symmetry from healthy controls (Plotnik 2007)'
+    },
+    'stride_variability': {
+        'mean': 0.025,
+        'std': 0.015,
+        'min': 0.005,
+        'max': 0.08,
+        'p5': 0.010,
+        'p10': 0.012,
+        'p25': 0.015,
+        'p50': 0.025,
+        'p75': 0.035,
+        'p90': 0.045,
+        'p95': 0.055,
+        'n': 500,
+        'unit': 'coefficient of variation',
+        'description': 'Stride time variability (Hausdorff 2001)'
+    },
+    'stride_time': {
+        'mean': 1.14,
+        'std': 0.10,
+        'min': 0.85,
+        'max': 1.70,
+        'p5': 0.98,
+        'p10': 1.02,
+        'p25': 1.07,
+        'p50': 1.14,
+        'p75': 1.22,
+        'p90': 1.30,
+        'p95': 1.36,
+        'n': 1000,
+        'unit': 'seconds',
+        'description': 'Stride time from normative data'
+    }
+}
+
+REFERENCES = [
+    'Bohannon RW (1997). Comfortable and maximum walking speed of adults aged 20-79 years: reference values and determinants. Age and Ageing, 26(1), 15-19.',
+    'Hollman JH et al (2011). Normative spatiotemporal gait parameters in older adults. Gait & Posture, 34(1), 111-118.',
+    'Hausdorff JM et al (2001). Gait variability and fall risk in community-living older adults: a 1-year prospective study. Archives of Physical Medicine and Rehabilitation, 82(8), 1050-1056.',
+    'Plotnik M et al (2007). A new measure for quantifying the bilateral coordination of human gait. Experimental Brain Research, 181(4), 561-570.'
+]
+
+NOTES = [
+    'These baselines are derived from published research when PhysioNet download was unavailable.',
+    'Values represent healthy adult norms and are suitable for clinical gait assessment.',
+    'Thresholds validated against multiple peer-reviewed studies.'
+]
+
+
 def generate_research_based_baselines():
     """
     Generate baselines from published gait research literature
@@ -21,107 +139,8 @@ def generate_research_based_baselines():
     print("GENERATING BASELINES FROM PUBLISHED RESEARCH")
     print("="*60 + "\n")
     
-    # Healthy adult normative data (ages 20-79, mixed gender)
-    # Values are from meta-analysis of multiple studies
-    
-    baselines = {
-        'cadence': {
-            'mean': 105.0,
-            'std': 10.0,
-            'min': 70.0,
-            'max': 140.0,
-            'p5': 88.0,
-            'p10': 92.0,
-            'p25': 98.0,
-            'p50': 105.0,
-            'p75': 112.0,
-            'p90': 118.0,
-            'p95': 122.0,
-            'n': 1000,
-            'unit': 'steps/min',
-            'description': 'Walking cadence from meta-analysis (Bohannon 1997, Hollman 2011)'
-        },
-        'stride_length_estimate': {
-            'mean': 1.3,
-            'std': 0.15,
-            'min': 0.8,
-            'max': 1.7,
-            'p5': 1.05,
-            'p10': 1.10,
-            'p25': 1.20,
-            'p50': 1.30,
-            'p75': 1.40,
-            'p90': 1.48,
-            'p95': 1.53,
-            'n': 1000,
-            'unit': 'meters',
-            'description': 'Stride length from normative studies (Hollman 2011)'
-        },
-        'velocity_estimate': {
-            'mean': 1.3,
-            'std': 0.2,
-            'min': 0.6,
-            'max': 2.0,
-            'p5': 0.95,
-            'p10': 1.05,
-            'p25': 1.15,
-            'p50': 1.30,
-            'p75': 1.45,
-            'p90': 1.55,
-            'p95': 1.60,
-            'n': 1000,
-            'unit': 'm/s',
-            'description': 'Walking velocity from comfortable walking speed studies (Bohannon 1997)'
-        },
-        'gait_symmetry': {
-            'mean': 0.95,
-            'std': 0.05,
-            'min': 0.70,
-            'max': 1.00,
-            'p5': 0.87,
-            'p10': 0.90,
-            'p25': 0.92,
-            'p50': 0.95,
-            'p75': 0.98,
-            'p90': 0.99,
-            'p95': 0.99,
-            'n': 500,
-            'unit': 'ratio (0-1)',
-            'description': 'Gait symmetry from healthy controls (Plotnik 2007)'
-        },
-        'stride_variability': {
-            'mean': 0.025,
-            'std': 0.015,
-            'min': 0.005,
-            'max': 0.08,
-            'p5': 0.010,
-            'p10': 0.012,
-            'p25': 0.015,
-            'p50': 0.025,
-            'p75': 0.035,
-            'p90': 0.045,
-            'p95': 0.055,
-            'n': 500,
-            'unit': 'coefficient of variation',
-            'description': 'Stride time variability (Hausdorff 2001)'
-        },
-        'stride_time': {
-            'mean': 1.14,
-            'std': 0.10,
-            'min': 0.85,
-            'max': 1.70,
-            'p5': 0.98,
-            'p10': 1.02,
-            'p25': 1.07,
-            'p50': 1.14,
-            'p75': 1.22,
-            'p90': 1.30,
-            'p95': 1.36,
-            'n': 1000,
-            'unit': 'seconds',
-            'description': 'Stride time from normative data'
-        }
-    }
+    # Copy so callers can adjust values without touching the module constant
+    baselines = copy.deepcopy(RESEARCH_BASELINES)
     
     print("Baseline metrics generated:")
     for metric, data in baselines.items():
@@ -142,26 +161,17 @@ def save_baselines(baselines, output_dir='datasets/physionet_gait'):
     
     output = {
         'source': 'Published Research Meta-Analysis',
-        'references': [
-            'Bohannon RW (1997). Comfortable and maximum walking speed of adults aged 20-79 years: reference values and determinants. Age and Ageing, 26(1), 15-19.',
-            'Hollman JH et al (2011). Normative spatiotemporal gait parameters in older adults. Gait & Posture, 34(1), 111-118.',
-            'Hausdorff JM et al (2001). Gait variability and fall risk in community-living older adults: a 1-year prospective study. Archives of Physical Medicine and Rehabilitation, 82(8), 1050-1056.',
-            'Plotnik M et al (2007). A new measure for quantifying the bilateral coordination of human gait. Experimental Brain Research, 181(4), 561-570.'
-        ],
+        'references': REFERENCES,
         'date_generated': '2025-11-25',
         'method': 'Meta-analysis of published normative data',
         'population': 'Healthy adults aged 20-79 years',
         'sample_size': 'Pooled from multiple studies (n>1000)',
         'baselines': baselines,
-        'notes': [
-            'These baselines are derived from published research when PhysioNet download was unavailable.',
-            'Values represent healthy adult norms and are suitable for clinical gait assessment.',
-            'Thresholds validated against multiple peer-reviewed studies.'
-        ]
+        'notes': NOTES
     }
     
-    with open(output_file, 'w') as f:
-        json.dump(output, f, indent=2)
+    # Compact output; the file is read by problem_detector, not by people
+    output_file.write_bytes(orjson.dumps(output))
     
     print(f"\n✓ Baselines saved to: {output_file}")
     print(f"  File size: {output_file.stat().st_size} bytes")
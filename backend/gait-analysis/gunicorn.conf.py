@@ -0,0 +1,21 @@
+"""
+Gunicorn configuration for the Gait Analysis service
+Usage: gunicorn -c gunicorn.conf.py app:app
+"""
+
+import multiprocessing
+import os
+
+bind = f"0.0.0.0:{os.getenv('GAIT_ANALYSIS_PORT', '5001')}"
+
+# One process per core so NumPy/SciPy-heavy analyses run in parallel,
+# plus a few threads each for I/O-bound and batched realtime requests
+workers = int(os.getenv('GAIT_WORKERS', multiprocessing.cpu_count()))
+worker_class = 'gthread'
+threads = int(os.getenv('GAIT_THREADS', 4))
+
+# Load the app (processor + baselines) once in the master and fork workers
+# from it, so the loaded data is shared copy-on-write
+preload_app = True
+
+timeout = 60
@@ -3,14 +3,225 @@ Gait Problem Detector
 Uses PhysioNet baselines and extracted CVAPed Web exercise logic.
 """
 
-import json
+import functools
+import math
+import os
+import threading
+import time
+from bisect import bisect_right
+from operator import attrgetter
 from pathlib import Path
-from scipy import stats
+from types import MappingProxyType
+
+import orjson
+
+
+BASELINES_FILE = 'datasets/physionet_gait/gait_baselines.json'
+EXERCISES_FILE = 'datasets/physionet_gait/gait_exercises.json'
+
+INV_SQRT2 = 1.0 / math.sqrt(2.0)
+
+# Checked metrics in report order: (user metric, baseline key or None, fixed (severe, moderate)
+# cut-offs, problem, exercise database key, decimals reported)
+# Baseline metrics use the baseline's p5/p25; the others use the fixed cut-offs
+CHECKED_METRICS = (
+    ('cadence', 'cadence', None, 'slow_cadence', 'slow_cadence', 1),
+    ('gait_symmetry', 'gait_symmetry', None, 'asymmetric_gait', 'asymmetric_gait', 2),
+    ('stride_length', 'stride_length', None, 'short_stride', 'short_stride', 2),
+    ('velocity', 'velocity', None, 'slow_velocity', 'slow_velocity', 2),
+    ('stability_score', None, (0.5, 0.65), 'poor_stability', 'poor_stability', 2),
+    ('step_regularity', None, (0.5, 0.7), 'irregular_steps', 'reduced_step_regularity', 2)
+)
+
+# Normal range reported for the metrics with fixed cut-offs
+FIXED_NORMAL_RANGE = '>0.75'
+
+# Static report text per (problem, severity); descriptions are str.format
+# templates filled with the measured value and its percentile
+PROBLEM_TEMPLATES = {
+    ('slow_cadence', 'severe'): {
+        'category': 'Speed & Rhythm',
+        'description': "Your walking pace ({value:.1f} steps/min) is significantly slower than normal (below {percentile}th percentile).",
+        'impact': 'Severely reduced walking speed affects daily activities, community mobility, and crossing streets safely.'
+    },
+    ('slow_cadence', 'moderate'): {
+        'category': 'Speed & Rhythm',
+        'description': "Your walking pace ({value:.1f} steps/min) is below average ({percentile}th percentile).",
+        'impact': 'Reduced walking pace may cause fatigue and limit daily mobility.'
+    },
+    ('asymmetric_gait', 'severe'): {
+        'category': 'Balance & Symmetry',
+        'description': "Your gait shows significant asymmetry (symmetry score: {value:.2f}, below {percentile}th percentile).",
+        'impact': 'Severe asymmetry increases fall risk, causes uneven joint loading, and reduces walking efficiency.'
+    },
+    ('asymmetric_gait', 'moderate'): {
+        'category': 'Balance & Symmetry',
+        'description': "Your gait shows mild asymmetry ({value:.2f}, {percentile}th percentile).",
+        'impact': 'Asymmetry may lead to compensatory patterns and joint stress over time.'
+    },
+    ('short_stride', 'severe'): {
+        'category': 'Gait Pattern',
+        'description': "Your stride length ({value:.2f}m) is significantly shorter than normal (below {percentile}th percentile).",
+        'impact': 'Very short strides severely reduce walking efficiency and speed.'
+    },
+    ('short_stride', 'moderate'): {
+        'category': 'Gait Pattern',
+        'description': "Your stride length ({value:.2f}m) is below average ({percentile}th percentile).",
+        'impact': 'Shorter strides reduce walking efficiency.'
+    },
+    ('slow_velocity', 'severe'): {
+        'category': 'Speed & Rhythm',
+        'description': "Your walking speed ({value:.2f} m/s) is significantly slower than normal (below {percentile}th percentile).",
+        'impact': 'Very slow walking speed severely limits community mobility, crossing streets, and daily activities.'
+    },
+    ('slow_velocity', 'moderate'): {
+        'category': 'Speed & Rhythm',
+        'description': "Your walking speed ({value:.2f} m/s) is below average ({percentile}th percentile).",
+        'impact': 'Reduced speed may affect community mobility.'
+    },
+    ('poor_stability', 'severe'): {
+        'category': 'Balance & Symmetry',
+        'description': "Your walking stability is significantly compromised (score: {value:.2f}).",
+        'impact': 'Poor stability greatly increases fall risk and limits confidence in walking.'
+    },
+    ('poor_stability', 'moderate'): {
+        'category': 'Balance & Symmetry',
+        'description': "Your walking stability shows room for improvement (score: {value:.2f}).",
+        'impact': 'Reduced stability may affect confidence and increase caution during walking.'
+    },
+    ('irregular_steps', 'severe'): {
+        'category': 'Gait Pattern',
+        'description': "Your steps show significant irregularity (regularity score: {value:.2f}).",
+        'impact': 'Highly irregular steps indicate poor motor control and increase fall risk.'
+    },
+    ('irregular_steps', 'moderate'): {
+        'category': 'Gait Pattern',
+        'description': "Your steps show some irregularity (regularity score: {value:.2f}).",
+        'impact': 'Irregular steps may affect walking efficiency and smoothness.'
+    }
+}
+
+# Report order: severity first, then category; anything unknown sorts last
+SEVERITY_ORDER = {'severe': 0, 'moderate': 1, 'mild': 2}
+CATEGORY_ORDER = {'Speed & Rhythm': 0, 'Balance & Symmetry': 1, 'Gait Pattern': 2}
+UNRANKED = (99, 99)
+
+# Sort key per (problem, severity), so prioritising never looks ranks up
+PROBLEM_RANKS = {
+    (problem_key, severity): (SEVERITY_ORDER.get(severity, 99), CATEGORY_ORDER.get(template['category'], 99))
+    for (problem_key, severity), template in PROBLEM_TEMPLATES.items()
+}
+
+# Severity per code: a value below each of a metric's cut-offs adds one
+SEVERITY_NAMES = (None, 'moderate', 'severe')
+
+
+def _raw_percentile(value, mean, std):
+    """Normal CDF of value as a percentage, before truncation"""
+    z_score = (value - mean) / std
+    return 0.5 * (1.0 + math.erf(z_score * INV_SQRT2)) * 100
+
+
+def _percentile_cutoffs(mean, std):
+    """
+    Smallest values reaching each whole percentile 1..99 of a normal baseline
+
+    Each boundary is bisected down to adjacent floats on the same
+    expression the percentile used to be computed with, so
+    bisect_right(cutoffs, value) gives exactly int(percentile) without an
+    erf call per value.
+    """
+    if not std > 0:
+        # Degenerate baseline: every value sits at the 50th percentile
+        return (-math.inf,) * 50 + (math.inf,) * 49
+
+    cutoffs = []
+    for percentile in range(1, 100):
+        low, high = mean - 40 * std, mean + 40 * std
+        while True:
+            middle = (low + high) / 2
+            if middle <= low or middle >= high:
+                break
+            if _raw_percentile(middle, mean, std) >= percentile:
+                high = middle
+            else:
+                low = middle
+        cutoffs.append(high)
+    return tuple(cutoffs)
+
+
+@functools.lru_cache(maxsize=4)
+def _load_json(path, mtime_ns):
+    """
+    Parse a data file once per (path, mtime) and share it between detectors
+
+    The modification time is part of the key so regenerated baselines are
+    picked up. The top level is returned as a read-only proxy because every
+    detector shares it; nested entries must be treated as read-only too.
+    """
+    with open(path, 'rb') as data_file:
+        return MappingProxyType(orjson.loads(data_file.read()))
+
+
+class Problem:
+    """
+    One detected gait problem
+
+    Kept as a slotted object while problems are sorted and summarised;
+    to_dict() produces the response payload and rounds current_value to the
+    metric's reported precision. Item access is supported for callers that
+    still read problems as dicts.
+    """
+
+    __slots__ = (
+        'problem', 'severity', 'category', 'current_value', 'normal_range',
+        'percentile', 'description', 'impact', 'recommendations', 'exercises', 'rank',
+        'decimals'
+    )
+
+    def __init__(self, problem, severity, category, current_value, normal_range,
+                 percentile, description, impact, recommendations, exercises, rank=UNRANKED,
+                 decimals=2):
+        self.problem = problem
+        self.severity = severity
+        self.category = category
+        self.current_value = current_value
+        self.normal_range = normal_range
+        self.percentile = percentile
+        self.description = description
+        self.impact = impact
+        self.recommendations = recommendations
+        self.exercises = exercises
+        self.rank = rank
+        self.decimals = decimals
+
+    def __getitem__(self, key):
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def to_dict(self):
+        return {
+            'problem': self.problem,
+            'severity': self.severity,
+            'category': self.category,
+            'current_value': round(self.current_value, self.decimals),
+            'normal_range': self.normal_range,
+            'percentile': self.percentile,
+            'description': self.description,
+            'impact': self.impact,
+            'recommendations': self.recommendations,
+            'exercises': self.exercises
+        }
 
 
 class GaitProblemDetector:
-    def __init__(self, baselines_file='datasets/physionet_gait/gait_baselines.json',
-                 exercises_file='datasets/physionet_gait/gait_exercises.json'):
+    __slots__ = (
+        'baselines', 'exercises_db', '_recommendations', '_thresholds', '_percentiles'
+    )
+
+    def __init__(self, baselines_file=BASELINES_FILE, exercises_file=EXERCISES_FILE):
         baselines_path = Path(__file__).parent / baselines_file
         exercises_path = Path(__file__).parent / exercises_file
 
@@ -20,39 +231,70 @@ class GaitProblemDetector:
                 "Please run 'python process_physionet_data.py' first to generate baselines."
             )
 
-        with open(baselines_path, 'r', encoding='utf-8') as baseline_file:
-            self.baselines = json.load(baseline_file)
+        self.baselines = _load_json(str(baselines_path), os.stat(baselines_path).st_mtime_ns)
 
         if exercises_path.exists():
-            with open(exercises_path, 'r', encoding='utf-8') as exercise_file:
-                self.exercises_db = json.load(exercise_file)
+            self.exercises_db = _load_json(str(exercises_path), os.stat(exercises_path).st_mtime_ns)
             print("Loaded gait baselines and extracted exercise database")
         else:
-            self.exercises_db = {}
+            self.exercises_db = MappingProxyType({})
             print("Loaded gait baselines (exercise database unavailable)")
 
         print(f"  Metrics available: {list(self.baselines.keys())}")
 
+        self._build_recommendations()
+        self._build_thresholds()
+
+    def _build_thresholds(self):
+        """Pack cut-offs, normal range text and report details for every checkable metric once"""
+        self._thresholds = []
+        self._percentiles = {}
+        for metric, baseline_key, cutoffs, problem_key, exercise_key, decimals in CHECKED_METRICS:
+            percentiles = None
+            normal_range = FIXED_NORMAL_RANGE
+            if baseline_key is not None:
+                if baseline_key not in self.baselines:
+                    continue
+                baseline = self.baselines[baseline_key]
+                cutoffs = (baseline['p5'], baseline['p25'])
+                percentiles = _percentile_cutoffs(baseline['mean'], baseline['std'])
+                self._percentiles[baseline_key] = percentiles
+                normal_range = f"{baseline['p25']:.{decimals}f} - {baseline['p75']:.{decimals}f}"
+            # Everything a report needs at each severity, indexed by severity code
+            reports = (None,) + tuple(
+                (
+                    severity,
+                    PROBLEM_TEMPLATES[problem_key, severity],
+                    self._recommendations[exercise_key, severity],
+                    PROBLEM_RANKS[problem_key, severity]
+                )
+                for severity in SEVERITY_NAMES[1:]
+            )
+            check = (problem_key, percentiles, decimals, normal_range, reports)
+            self._thresholds.append((metric, cutoffs[0], cutoffs[1], check))
+
+    def _build_recommendations(self):
+        """Resolve the exercise list for every (exercise key, severity) once"""
+        self._recommendations = {}
+        for spec in CHECKED_METRICS:
+            exercise_key = spec[4]
+            for severity in ('severe', 'moderate'):
+                exercises = self._get_exercise_recommendations(exercise_key, severity)
+                names = [exercise['name'] for exercise in exercises]
+                self._recommendations[exercise_key, severity] = (names, exercises)
+
     def detect_problems(self, user_metrics):
         problems = []
 
-        if 'cadence' in user_metrics and 'cadence' in self.baselines:
-            problems.extend(self._check_cadence(user_metrics['cadence']))
-
-        if 'gait_symmetry' in user_metrics and 'gait_symmetry' in self.baselines:
-            problems.extend(self._check_symmetry(user_metrics['gait_symmetry']))
-
-        if 'stride_length' in user_metrics and 'stride_length' in self.baselines:
-            problems.extend(self._check_stride_length(user_metrics['stride_length']))
-
-        if 'velocity' in user_metrics and 'velocity' in self.baselines:
-            problems.extend(self._check_velocity(user_metrics['velocity']))
-
-        if 'stability_score' in user_metrics:
-            problems.extend(self._check_stability(user_metrics['stability_score']))
-
-        if 'step_regularity' in user_metrics:
-            problems.extend(self._check_step_regularity(user_metrics['step_regularity']))
+        # One pass over the packed cut-offs; only flagged metrics build a report
+        for metric, severe_cutoff, moderate_cutoff, check in self._thresholds:
+            value = user_metrics.get(metric)
+            if value is None:
+                continue
+            # Severity code: below each cut-off adds one
+            code = (value < severe_cutoff) + (value < moderate_cutoff)
+            if code:
+                problems.append(self._report(check, value, code))
 
         return problems
 
@@ -134,244 +376,32 @@ class GaitProblemDetector:
             for index, name in enumerate(names)
         ]
 
-    def _build_problem(self, problem_key, severity, category, current_value, normal_range,
-                       percentile=None, description='', impact='', exercises=None):
-        exercise_list = exercises or []
-        return {
-            'problem': problem_key,
-            'severity': severity,
-            'category': category,
-            'current_value': current_value,
-            'normal_range': normal_range,
-            'percentile': percentile,
-            'description': description,
-            'impact': impact,
-            'recommendations': [exercise['name'] for exercise in exercise_list],
-            'exercises': exercise_list
-        }
-
-    def _check_cadence(self, cadence):
-        baseline = self.baselines['cadence']
-        problems = []
-
-        if cadence < baseline['p5']:
-            percentile = self._calculate_percentile(cadence, baseline)
-            exercises = self._get_exercise_recommendations('slow_cadence', 'severe')
-            problems.append(self._build_problem(
-                'slow_cadence',
-                'severe',
-                'Speed & Rhythm',
-                round(cadence, 1),
-                f"{baseline['p25']:.1f} - {baseline['p75']:.1f}",
-                percentile,
-                f"Your walking pace ({cadence:.1f} steps/min) is significantly slower than normal (below {percentile}th percentile).",
-                'Severely reduced walking speed affects daily activities, community mobility, and crossing streets safely.',
-                exercises
-            ))
-        elif cadence < baseline['p25']:
-            percentile = self._calculate_percentile(cadence, baseline)
-            exercises = self._get_exercise_recommendations('slow_cadence', 'moderate')
-            problems.append(self._build_problem(
-                'slow_cadence',
-                'moderate',
-                'Speed & Rhythm',
-                round(cadence, 1),
-                f"{baseline['p25']:.1f} - {baseline['p75']:.1f}",
-                percentile,
-                f"Your walking pace ({cadence:.1f} steps/min) is below average ({percentile}th percentile).",
-                'Reduced walking pace may cause fatigue and limit daily mobility.',
-                exercises
-            ))
-
-        return problems
-
-    def _check_symmetry(self, symmetry):
-        baseline = self.baselines['gait_symmetry']
-        problems = []
-
-        if symmetry < baseline['p5']:
-            percentile = self._calculate_percentile(symmetry, baseline)
-            exercises = self._get_exercise_recommendations('asymmetric_gait', 'severe')
-            problems.append(self._build_problem(
-                'asymmetric_gait',
-                'severe',
-                'Balance & Symmetry',
-                round(symmetry, 2),
-                f"{baseline['p25']:.2f} - {baseline['p75']:.2f}",
-                percentile,
-                f"Your gait shows significant asymmetry (symmetry score: {symmetry:.2f}, below {percentile}th percentile).",
-                'Severe asymmetry increases fall risk, causes uneven joint loading, and reduces walking efficiency.',
-                exercises
-            ))
-        elif symmetry < baseline['p25']:
-            percentile = self._calculate_percentile(symmetry, baseline)
-            exercises = self._get_exercise_recommendations('asymmetric_gait', 'moderate')
-            problems.append(self._build_problem(
-                'asymmetric_gait',
-                'moderate',
-                'Balance & Symmetry',
-                round(symmetry, 2),
-                f"{baseline['p25']:.2f} - {baseline['p75']:.2f}",
-                percentile,
-                f"Your gait shows mild asymmetry ({symmetry:.2f}, {percentile}th percentile).",
-                'Asymmetry may lead to compensatory patterns and joint stress over time.',
-                exercises
-            ))
-
-        return problems
-
-    def _check_stride_length(self, stride_length):
-        baseline = self.baselines['stride_length']
-        problems = []
-
-        if stride_length < baseline['p5']:
-            percentile = self._calculate_percentile(stride_length, baseline)
-            exercises = self._get_exercise_recommendations('short_stride', 'severe')
-            problems.append(self._build_problem(
-                'short_stride',
-                'severe',
-                'Gait Pattern',
-                round(stride_length, 2),
-                f"{baseline['p25']:.2f} - {baseline['p75']:.2f}",
-                percentile,
-                f"Your stride length ({stride_length:.2f}m) is significantly shorter than normal (below {percentile}th percentile).",
-                'Very short strides severely reduce walking efficiency and speed.',
-                exercises
-            ))
-        elif stride_length < baseline['p25']:
-            percentile = self._calculate_percentile(stride_length, baseline)
-            exercises = self._get_exercise_recommendations('short_stride', 'moderate')
-            problems.append(self._build_problem(
-                'short_stride',
-                'moderate',
-                'Gait Pattern',
-                round(stride_length, 2),
-                f"{baseline['p25']:.2f} - {baseline['p75']:.2f}",
-                percentile,
-                f"Your stride length ({stride_length:.2f}m) is below average ({percentile}th percentile).",
-                'Shorter strides reduce walking efficiency.',
-                exercises
-            ))
-
-        return problems
-
-    def _check_velocity(self, velocity):
-        baseline = self.baselines['velocity']
-        problems = []
-
-        if velocity < baseline['p5']:
-            percentile = self._calculate_percentile(velocity, baseline)
-            exercises = self._get_exercise_recommendations('slow_velocity', 'severe')
-            problems.append(self._build_problem(
-                'slow_velocity',
-                'severe',
-                'Speed & Rhythm',
-                round(velocity, 2),
-                f"{baseline['p25']:.2f} - {baseline['p75']:.2f}",
-                percentile,
-                f"Your walking speed ({velocity:.2f} m/s) is significantly slower than normal (below {percentile}th percentile).",
-                'Very slow walking speed severely limits community mobility, crossing streets, and daily activities.',
-                exercises
-            ))
-        elif velocity < baseline['p25']:
-            percentile = self._calculate_percentile(velocity, baseline)
-            exercises = self._get_exercise_recommendations('slow_velocity', 'moderate')
-            problems.append(self._build_problem(
-                'slow_velocity',
-                'moderate',
-                'Speed & Rhythm',
-                round(velocity, 2),
-                f"{baseline['p25']:.2f} - {baseline['p75']:.2f}",
-                percentile,
-                f"Your walking speed ({velocity:.2f} m/s) is below average ({percentile}th percentile).",
-                'Reduced speed may affect community mobility.',
-                exercises
-            ))
-
-        return problems
-
-    def _check_stability(self, stability_score):
-        problems = []
-
-        if stability_score < 0.5:
-            exercises = self._get_exercise_recommendations('poor_stability', 'severe')
-            problems.append(self._build_problem(
-                'poor_stability',
-                'severe',
-                'Balance & Symmetry',
-                round(stability_score, 2),
-                '>0.75',
-                None,
-                f"Your walking stability is significantly compromised (score: {stability_score:.2f}).",
-                'Poor stability greatly increases fall risk and limits confidence in walking.',
-                exercises
-            ))
-        elif stability_score < 0.65:
-            exercises = self._get_exercise_recommendations('poor_stability', 'moderate')
-            problems.append(self._build_problem(
-                'poor_stability',
-                'moderate',
-                'Balance & Symmetry',
-                round(stability_score, 2),
-                '>0.75',
-                None,
-                f"Your walking stability shows room for improvement (score: {stability_score:.2f}).",
-                'Reduced stability may affect confidence and increase caution during walking.',
-                exercises
-            ))
-
-        return problems
-
-    def _check_step_regularity(self, step_regularity):
-        problems = []
-
-        if step_regularity < 0.5:
-            exercises = self._get_exercise_recommendations('reduced_step_regularity', 'severe')
-            problems.append(self._build_problem(
-                'irregular_steps',
-                'severe',
-                'Gait Pattern',
-                round(step_regularity, 2),
-                '>0.75',
-                None,
-                f"Your steps show significant irregularity (regularity score: {step_regularity:.2f}).",
-                'Highly irregular steps indicate poor motor control and increase fall risk.',
-                exercises
-            ))
-        elif step_regularity < 0.7:
-            exercises = self._get_exercise_recommendations('reduced_step_regularity', 'moderate')
-            problems.append(self._build_problem(
-                'irregular_steps',
-                'moderate',
-                'Gait Pattern',
-                round(step_regularity, 2),
-                '>0.75',
-                None,
-                f"Your steps show some irregularity (regularity score: {step_regularity:.2f}).",
-                'Irregular steps may affect walking efficiency and smoothness.',
-                exercises
-            ))
-
-        return problems
+    def _report(self, check, value, code):
+        """Fill in the problem template for a metric that crossed a cut-off"""
+        problem_key, percentiles, decimals, normal_range, reports = check
+        severity, template, (names, exercises), rank = reports[code]
+        percentile = None if percentiles is None else self._calculate_percentile(value, percentiles)
+
+        return Problem(
+            problem_key,
+            severity,
+            template['category'],
+            value,
+            normal_range,
+            percentile,
+            template['description'].format(value=value, percentile=percentile),
+            template['impact'],
+            names,
+            exercises,
+            rank,
+            decimals
+        )
 
-    def _calculate_percentile(self, value, baseline):
-        mean = baseline['mean']
-        std = baseline['std']
-        z_score = (value - mean) / std if std > 0 else 0
-        percentile = stats.norm.cdf(z_score) * 100
-        return max(1, min(99, int(percentile)))
+    def _calculate_percentile(self, value, percentiles):
+        return max(1, min(99, bisect_right(percentiles, value)))
 
     def prioritize_problems(self, problems):
-        severity_order = {'severe': 0, 'moderate': 1, 'mild': 2}
-        category_order = {'Speed & Rhythm': 0, 'Balance & Symmetry': 1, 'Gait Pattern': 2}
-
-        return sorted(
-            problems,
-            key=lambda item: (
-                severity_order.get(item['severity'], 99),
-                category_order.get(item['category'], 99)
-            )
-        )
+        return sorted(problems, key=attrgetter('rank'))
 
     def generate_summary(self, problems):
         if not problems:
@@ -384,8 +414,11 @@ class GaitProblemDetector:
                 'moderate_count': 0
             }
 
-        severe_count = sum(1 for problem in problems if problem['severity'] == 'severe')
-        moderate_count = sum(1 for problem in problems if problem['severity'] == 'moderate')
+        severe_count = moderate_count = 0
+        for problem in problems:
+            severity = problem.severity
+            severe_count += severity == 'severe'
+            moderate_count += severity == 'moderate'
 
         if severe_count >= 2:
             risk_level = 'high'
@@ -400,7 +433,7 @@ class GaitProblemDetector:
         summary_text = (
             f"Detected {len(problems)} gait abnormality(ies): "
             f"{severe_count} severe, {moderate_count} moderate. "
-            f"Physical therapy focusing on {problems[0]['category'].lower()} is recommended."
+            f"Physical therapy focusing on {problems[0].category.lower()} is recommended."
         )
 
         return {
@@ -416,23 +449,23 @@ class GaitProblemDetector:
         metric_scores = []
         metric_weights = []
 
-        if 'cadence' in user_metrics and 'cadence' in self.baselines:
-            percentile = self._calculate_percentile(user_metrics['cadence'], self.baselines['cadence'])
+        if 'cadence' in user_metrics and 'cadence' in self._percentiles:
+            percentile = self._calculate_percentile(user_metrics['cadence'], self._percentiles['cadence'])
             metric_scores.append(self._percentile_to_score(percentile))
             metric_weights.append(20)
 
-        if 'velocity' in user_metrics and 'velocity' in self.baselines:
-            percentile = self._calculate_percentile(user_metrics['velocity'], self.baselines['velocity'])
+        if 'velocity' in user_metrics and 'velocity' in self._percentiles:
+            percentile = self._calculate_percentile(user_metrics['velocity'], self._percentiles['velocity'])
             metric_scores.append(self._percentile_to_score(percentile))
             metric_weights.append(20)
 
-        if 'stride_length' in user_metrics and 'stride_length' in self.baselines:
-            percentile = self._calculate_percentile(user_metrics['stride_length'], self.baselines['stride_length'])
+        if 'stride_length' in user_metrics and 'stride_length' in self._percentiles:
+            percentile = self._calculate_percentile(user_metrics['stride_length'], self._percentiles['stride_length'])
             metric_scores.append(self._percentile_to_score(percentile))
             metric_weights.append(15)
 
-        if 'gait_symmetry' in user_metrics and 'gait_symmetry' in self.baselines:
-            percentile = self._calculate_percentile(user_metrics['gait_symmetry'], self.baselines['gait_symmetry'])
+        if 'gait_symmetry' in user_metrics and 'gait_symmetry' in self._percentiles:
+            percentile = self._calculate_percentile(user_metrics['gait_symmetry'], self._percentiles['gait_symmetry'])
             metric_scores.append(self._percentile_to_score(percentile))
             metric_weights.append(20)
 
@@ -450,8 +483,11 @@ class GaitProblemDetector:
         else:
             final_score = 50
 
-        severe_count = sum(1 for problem in detected_problems if problem.get('severity') == 'severe')
-        moderate_count = sum(1 for problem in detected_problems if problem.get('severity') == 'moderate')
+        severe_count = moderate_count = 0
+        for problem in detected_problems:
+            severity = problem.severity
+            severe_count += severity == 'severe'
+            moderate_count += severity == 'moderate'
         penalty = min(10, severe_count * 3 + moderate_count * 1.5)
         final_score = max(0, min(100, final_score - penalty))
 
@@ -504,3 +540,53 @@ class GaitProblemDetector:
         if percentile >= 5:
             return 30 + (percentile - 5) / 5 * 20
         return max(0, percentile / 5 * 30)
+
+
+class LazyProblemDetector:
+    """
+    Thread-safe holder that loads GaitProblemDetector on first use and
+    reloads it when the baselines file is regenerated.
+
+    The baselines mtime is checked at most once per check_interval seconds,
+    so the usual path is an attribute read plus a clock comparison.
+    """
+
+    def __init__(self, baselines_file=BASELINES_FILE, check_interval=5.0):
+        self.baselines_file = baselines_file
+        self.baselines_path = Path(__file__).parent / baselines_file
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._detector = None
+        self._loaded = False
+        self._mtime = None
+        self._next_check = 0.0
+
+    def get(self):
+        """Return the current detector, or None if no baselines are available"""
+        if time.monotonic() < self._next_check:
+            return self._detector
+
+        with self._lock:
+            if time.monotonic() >= self._next_check:
+                mtime = self._baselines_mtime()
+                if not self._loaded or mtime != self._mtime:
+                    self._load(mtime)
+                self._next_check = time.monotonic() + self.check_interval
+            return self._detector
+
+    def _load(self, mtime):
+        try:
+            self._detector = GaitProblemDetector(baselines_file=self.baselines_file)
+            print("Problem detector initialized with research baselines")
+        except FileNotFoundError as error:
+            self._detector = None
+            print(f"Problem detector not available: {error}")
+            print("   Run 'python generate_baselines.py' to generate baselines")
+        self._loaded = True
+        self._mtime = mtime
+
+    def _baselines_mtime(self):
+        try:
+            return os.stat(self.baselines_path).st_mtime_ns
+        except FileNotFoundError:
+            return None
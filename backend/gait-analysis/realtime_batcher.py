@@ -0,0 +1,118 @@
+"""
+Realtime Batcher - Groups concurrent real-time readings into NumPy batches
+Amortizes per-call overhead when many clients stream sensor ticks at once
+"""
+
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List
+
+import numpy as np
+
+
+class InvalidReading(ValueError):
+    """A submitted reading that is not an object of numeric x/y/z values"""
+
+
+class RealtimeBatcher:
+    """
+    Collects readings submitted from request threads and processes them
+    together on a single background worker thread
+    """
+    
+    def __init__(self, process_batch: Callable[[np.ndarray, np.ndarray], Dict[str, Any]],
+                 batch_size: int = 64, max_latency: float = 0.02):
+        """
+        Args:
+            process_batch: Function taking (B, 3) accelerometer and gyroscope
+                arrays and returning a dict of length-B result columns
+                (non-array values are shared by every reading)
+            batch_size: Maximum readings processed per batch
+            max_latency: Seconds to wait for more readings after the first arrives
+        """
+        self.process_batch = process_batch
+        self.batch_size = batch_size
+        self.max_latency = max_latency
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._worker = None
+    
+    def submit(self, accelerometer: Dict, gyroscope: Dict, timeout: float = 5.0) -> Dict[str, Any]:
+        """
+        Queue a single reading and block until its batch has been processed
+        
+        Raises:
+            InvalidReading: If a reading is not an object of numeric x/y/z values;
+                checked here so one bad reading cannot fail the whole batch
+        """
+        accel = self._axes('accelerometer', accelerometer)
+        gyro = self._axes('gyroscope', gyroscope)
+        
+        future = Future()
+        self._ensure_worker()
+        self._queue.put((accel, gyro, future))
+        
+        return future.result(timeout=timeout)
+    
+    @staticmethod
+    def _axes(sensor: str, reading: Dict) -> tuple:
+        """(x, y, z) floats of a reading, missing axes counting as 0"""
+        if not isinstance(reading, dict):
+            raise InvalidReading(f'{sensor} must be an object with x, y and z values')
+        try:
+            return (float(reading.get('x', 0)), float(reading.get('y', 0)), float(reading.get('z', 0)))
+        except (TypeError, ValueError):
+            raise InvalidReading(f'{sensor} x, y and z must be numbers') from None
+    
+    def _ensure_worker(self) -> None:
+        """Start the worker on first use (so it is created after any process fork)"""
+        if self._worker is not None and self._worker.is_alive():
+            return
+        
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name='realtime-batcher', daemon=True)
+                self._worker.start()
+    
+    def _run(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.max_latency
+            
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            
+            self._process(batch)
+    
+    def _process(self, batch: List) -> None:
+        futures = [item[2] for item in batch]
+        
+        try:
+            accel = np.array([item[0] for item in batch], dtype=np.float64)
+            gyro = np.array([item[1] for item in batch], dtype=np.float64)
+            results = self._split(self.process_batch(accel, gyro), len(batch))
+        except Exception as e:
+            for future in futures:
+                future.set_exception(e)
+            return
+        
+        for future, result in zip(futures, results):
+            future.set_result(result)
+    
+    @staticmethod
+    def _split(columns: Dict[str, Any], size: int) -> List[Dict[str, Any]]:
+        """Per-reading result dicts from result columns"""
+        # tolist() converts each column to Python scalars in one call
+        values = {
+            key: value.tolist() if isinstance(value, np.ndarray) else [value] * size
+            for key, value in columns.items()
+        }
+        return [dict(zip(values, row)) for row in zip(*values.values())]
@@ -0,0 +1,163 @@
+"""
+Streaming Payload Parser - Parses large gait payloads without building per-sample dicts
+Sensor readings are written straight into NumPy buffers as JSON events arrive
+"""
+
+from typing import Any, BinaryIO, Dict
+
+import ijson
+import numpy as np
+from ijson.common import ObjectBuilder
+
+from data_validator import payload_fields
+
+
+# Sensor arrays that are streamed into NumPy buffers instead of Python objects
+STREAMED_SENSORS = ('accelerometer', 'gyroscope', 'magnetometer')
+
+# Row in the (3, N) axis block for each axis field
+AXIS_ROWS = {'x': 0, 'y': 1, 'z': 2}
+
+SAMPLE_FIELDS = ('x', 'y', 'z', 'timestamp')
+
+
+class _SensorBuffer:
+    """Growable (3, N) float32 axis block and float64 timestamps, doubled on overflow"""
+    
+    def __init__(self, capacity: int = 1024):
+        self.size = 0
+        self.xyz = np.empty((3, capacity), np.float32)
+        self.time = np.empty(capacity, np.float64)
+    
+    def start_sample(self) -> None:
+        i = self.size
+        if i == len(self.time):
+            self._grow()
+        
+        # As in SensorSample, a missing timestamp is the sample index
+        self.time[i] = i
+        self.axes_set = set()
+    
+    def set(self, field: str, value: Any) -> None:
+        if field == 'timestamp':
+            self.time[self.size] = value
+        else:
+            self.xyz[AXIS_ROWS[field], self.size] = value
+            self.axes_set.add(field)
+    
+    def end_sample(self) -> None:
+        """Finish the sample; raises ValueError if an axis was never set"""
+        for axis in AXIS_ROWS:
+            if axis not in self.axes_set:
+                raise ValueError(f"Object missing required field `{axis}`")
+        self.size += 1
+    
+    def to_arrays(self) -> Dict[str, np.ndarray]:
+        """Trimmed copies in the same layout as samples_to_soa"""
+        return {
+            'xyz': self.xyz[:, :self.size].copy(),
+            'time': self.time[:self.size].copy()
+        }
+    
+    def _grow(self) -> None:
+        xyz = np.empty((3, self.xyz.shape[1] * 2), np.float32)
+        xyz[:, :self.size] = self.xyz[:, :self.size]
+        self.xyz = xyz
+        
+        time = np.empty(len(self.time) * 2, np.float64)
+        time[:self.size] = self.time[:self.size]
+        self.time = time
+
+
+class _StreamReader:
+    """
+    File-like wrapper for WSGI input streams; ijson probes the stream with
+    read(0), which Werkzeug's LimitedStream treats as a client disconnect.
+    Optionally feeds every chunk read to a hasher.
+    """
+    
+    def __init__(self, stream: BinaryIO, hasher: Any = None):
+        self.stream = stream
+        self.hasher = hasher
+    
+    def read(self, size: int = -1) -> bytes:
+        if not size:
+            return b''
+        chunk = self.stream.read(size)
+        if self.hasher is not None:
+            self.hasher.update(chunk)
+        return chunk
+
+
+def parse_sensor_stream(stream: BinaryIO, hasher: Any = None) -> Dict[str, Any]:
+    """
+    Parse a gait analysis JSON body from a file-like stream
+    
+    Sensors listed in STREAMED_SENSORS come back as dicts of NumPy arrays
+    (the samples_to_soa layout) and every sample needs x, y and z; all
+    other top-level keys are built as regular Python objects and checked
+    against GaitPayload by payload_fields. If given, hasher (e.g. xxhash.xxh3_64()) is
+    updated with the raw bytes as they are read.
+    
+    Raises:
+        ValueError: If the body is not valid JSON or does not match GaitPayload
+    """
+    data = {}
+    key = None
+    sensor = None
+    builder = None
+    
+    try:
+        for prefix, event, value in ijson.parse(_StreamReader(stream, hasher), use_float=True):
+            if prefix == '':
+                if event == 'map_key':
+                    key = value
+                elif event not in ('start_map', 'end_map'):
+                    raise ValueError("Request body must be a JSON object")
+                continue
+            
+            if key not in STREAMED_SENSORS:
+                if builder is None:
+                    builder = ObjectBuilder()
+                builder.event(event, value)
+                if not builder.containers:
+                    data[key] = builder.value
+                    builder = None
+                continue
+            
+            path = prefix[len(key):]
+            
+            if path == '':
+                if event == 'start_array':
+                    sensor = _SensorBuffer()
+                elif event == 'end_array':
+                    data[key] = sensor.to_arrays()
+                    sensor = None
+                elif event == 'null':
+                    data[key] = None
+                else:
+                    raise ValueError(f"{key} must be an array")
+            elif path == '.item':
+                if event == 'start_map':
+                    sensor.start_sample()
+                elif event == 'end_map':
+                    try:
+                        sensor.end_sample()
+                    except ValueError as e:
+                        raise ValueError(f"{e} - at `$.{key}[{sensor.size}]`") from None
+                elif event != 'map_key':
+                    raise ValueError(f"{key}[{sensor.size}] must be an object")
+            elif path[6:] in SAMPLE_FIELDS and path[:6] == '.item.':
+                if event == 'null' and path[6:] == 'timestamp':
+                    continue
+                if event != 'number':
+                    raise ValueError(f"{key}[{sensor.size}].{path[6:]} must be a number")
+                sensor.set(path[6:], value)
+    except ijson.JSONError as e:
+        raise ValueError(f"Malformed JSON: {e}") from e
+    
+    # The remaining fields get the same type checks as the msgspec path
+    sensors = {sensor: data.pop(sensor) for sensor in STREAMED_SENSORS if sensor in data}
+    data = payload_fields(data)
+    data.update(sensors)
+    return data
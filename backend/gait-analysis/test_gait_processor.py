@@ -0,0 +1,89 @@
+"""
+Test script for GaitProcessor.analyze on short and single-sensor recordings
+"""
+
+import numpy as np
+
+from gait_processor import GaitProcessor
+
+
+def make_walk(samples=100, rate=50.0, step_hz=2.0):
+    """Accelerometer samples of a steady walk: vertical bounce at step_hz"""
+    t = np.arange(samples) / rate
+    bounce = 1.0 + 0.4 * np.sin(2 * np.pi * step_hz * t)
+    return [
+        {'x': 0.05, 'y': float(y), 'z': 0.1, 'timestamp': float(ms)}
+        for y, ms in zip(bounce, t * 1000)
+    ]
+
+
+def make_limp(rate, seed, seconds=12):
+    """Accelerometer samples of an uneven walk: alternating long and short steps with noise"""
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(rate * seconds)) / rate
+    phase = 2 * np.pi * 1.8 * t + 0.6 * np.sin(np.pi * 1.8 * t)
+    bounce = 1.0 + 0.35 * np.sin(phase) + 0.05 * rng.standard_normal(t.size)
+    return [
+        {'x': 0.05, 'y': float(y), 'z': 0.1, 'timestamp': float(ms)}
+        for y, ms in zip(bounce, t * 1000)
+    ]
+
+
+def test_accelerometer_only_walk():
+    """A 100-sample walk without gyroscope data still reports steps"""
+    result = GaitProcessor().analyze(make_walk(), [], user_id='u1', session_id='s1')
+    metrics = result['metrics']
+
+    print(f"Steps: {metrics['step_count']}, cadence: {metrics['cadence']}, "
+          f"stride length: {metrics['stride_length']}")
+    assert metrics['step_count'] > 0
+    assert metrics['cadence'] > 0
+    assert metrics['stride_length'] > 0
+    assert result['gait_phases']
+
+
+def test_too_short_recording():
+    """Fewer samples than the filter needs get the neutral metrics"""
+    result = GaitProcessor().analyze(make_walk(samples=5), [], user_id='u1', session_id='s2')
+
+    assert result['metrics']['step_count'] == 0
+    assert result['metrics']['gait_symmetry'] == 0.5
+    assert result['gait_phases'] == []
+
+
+def test_non_integer_sampling_rates():
+    """
+    Metrics for rates between whole Hz
+
+    The bandpass is designed for the rate rounded to whole Hz, so these pin
+    the values that rounding produces (symmetry and regularity differ from
+    a design at the exact rate for some of these recordings).
+    """
+    # (rate, seed, gait_symmetry, step_regularity)
+    expected = [
+        (33.3, 0, 0.6, 0.89),
+        (33.3, 1, 0.64, 0.9),
+        (33.3, 2, 0.62, 0.9),
+        (50.3, 0, 0.35, 0.88),
+        (50.3, 1, 0.41, 0.89),
+        (50.3, 2, 0.33, 0.88),
+    ]
+    for rate, seed, symmetry, regularity in expected:
+        metrics = GaitProcessor().analyze(make_limp(rate, seed), [],
+                                          user_id='u1', session_id='s3')['metrics']
+        print(f"{rate} Hz, seed {seed}: symmetry {metrics['gait_symmetry']}, "
+              f"regularity {metrics['step_regularity']}")
+        assert metrics['step_count'] == 22
+        assert metrics['gait_symmetry'] == symmetry
+        assert metrics['step_regularity'] == regularity
+
+
+def main():
+    test_accelerometer_only_walk()
+    test_too_short_recording()
+    test_non_integer_sampling_rates()
+    print("✓ ALL TESTS PASSED")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,8 +2,17 @@
 Test script to verify PhysioNet baselines are loaded correctly
 """
 
+import functools
+
 from problem_detector import GaitProblemDetector
 
+
+@functools.lru_cache(maxsize=None)
+def get_detector():
+    """One detector shared by every test, so the baselines are only set up once"""
+    return GaitProblemDetector()
+
+
 def test_baselines_loading():
     """Test that baselines load correctly"""
     print("="*60)
@@ -11,7 +20,7 @@ def test_baselines_loading():
     print("="*60)
     
     try:
-        detector = GaitProblemDetector()
+        detector = get_detector()
         print("\n✓ Problem detector initialized successfully")
         
         print("\n" + "="*60)
@@ -42,7 +51,7 @@ def test_problem_detection():
     print("="*60)
     
     try:
-        detector = GaitProblemDetector()
+        detector = get_detector()
         
         # Test case 1: Normal gait (values near control subject means)
         print("\nTest Case 1: Normal Gait Pattern")
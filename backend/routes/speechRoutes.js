@@ -139,6 +139,54 @@ router.get('/overall-model-status', protect, async (req, res) => {
   }
 });
 
+/**
+ * GET /api/speech/train-status/:jobId
+ * Poll a background training job started by a train-model endpoint
+ * (the status_url those endpoints return)
+ */
+router.get('/train-status/:jobId', protect, async (req, res) => {
+  try {
+    // Same access as starting the training
+    if (!['admin', 'therapist'].includes(req.user.role)) {
+      return res.status(403).json({
+        success: false,
+        error: 'Unauthorized. Admin or therapist access required.'
+      });
+    }
+
+    const therapyUrl = `${THERAPY_SERVICE_URL}/api/speech/train-status/${encodeURIComponent(req.params.jobId)}`;
+
+    const response = await axios.get(therapyUrl, {
+      headers: {
+        'Authorization': req.headers.authorization
+      }
+    });
+
+    res.json(response.data);
+
+  } catch (error) {
+    console.error('❌ Error checking training job status:', error.message);
+
+    if (error.code === 'ECONNREFUSED') {
+      return res.status(503).json({
+        success: false,
+        message: 'Prediction service is not available.',
+        error: 'PREDICTION_SERVICE_UNAVAILABLE'
+      });
+    }
+
+    if (error.response) {
+      res.status(error.response.status).json(error.response.data);
+    } else {
+      res.status(500).json({
+        success: false,
+        message: 'Failed to get training job status',
+        error: error.message
+      });
+    }
+  }
+});
+
 /**
  * GET /api/speech/prescriptive/:userId
  * Get intelligent therapy prioritization and sequencing recommendations
@@ -3,15 +3,29 @@ Therapy Exercises API Server
 Flask-based REST API for managing speech therapy exercises
 Handles Fluency, Language (Receptive & Expressive), Articulation exercises
 AND Stroke Rehabilitation Exercise Recommendations
+
+Development: python app.py
+Production:  gunicorn -c gunicorn.conf.py app:app
 """
 
 from flask import Flask, jsonify, request
+from flask_compress import Compress
 from flask_cors import CORS
 from pymongo import MongoClient
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+import brotli
+import copy
+import functools
+import gzip
+import hashlib
+import orjson
 import os
+import threading
+import uuid
 from dotenv import load_dotenv
-import traceback
-from datetime import datetime
+
+import model_store
 
 # Import CRUD blueprints (Speech Therapy)
 from fluency_crud import fluency_bp, init_fluency_crud
@@ -43,12 +57,31 @@ load_dotenv()
 app = Flask(__name__)
 CORS(app)
 
+# Compress JSON responses (clients advertise support via Accept-Encoding)
+app.config['COMPRESS_ALGORITHM'] = ['br', 'gzip']
+app.config['COMPRESS_MIN_SIZE'] = 1024
+Compress(app)
+
+# Request logging uses lazy %-formatting; set LOG_LEVEL=INFO or DEBUG for detail
+app.logger.setLevel(os.getenv('LOG_LEVEL', 'WARNING').upper())
+
+# Remaining jsonify responses stay compact even with debug enabled
+app.json.compact = True
+
 # MongoDB connection
 MONGO_URI = os.getenv('MONGODB_URI', 'mongodb://localhost:27017/')
 DB_NAME = os.getenv('DB_NAME', 'CVACare')
 
 try:
-    client = MongoClient(MONGO_URI)
+    # One pool per worker process, shared by the CRUD blueprints and the
+    # articulation predictor; requests wait at most 2.5s for a free connection
+    client = MongoClient(
+        MONGO_URI,
+        maxPoolSize=50,
+        minPoolSize=5,
+        waitQueueTimeoutMS=2500,
+        retryWrites=True
+    )
     db = client[DB_NAME]
     print(f"✅ Connected to MongoDB: {DB_NAME}")
 except Exception as e:
@@ -67,27 +100,148 @@ exercise_library = StrokeExerciseLibrary()
 exercise_recommender = ExerciseRecommender()
 print("✅ Stroke Exercise Recommender initialized")
 
-# Initialize Articulation Mastery Predictor (XGBoost ML)
-mastery_predictor = None
-if db is not None:
+# ML predictors (XGBoost) are created on first use in each worker process,
+# so a worker only loads the models and Mongo clients its requests need
+def _create_mastery_predictor():
+    if db is None:
+        return None
+    predictor = ArticulationMasteryPredictor(db)
+    predictor.load_model()  # Try to load existing model
+    return predictor
+
+def _create_fluency_predictor():
+    if db is None:
+        return None
+    predictor = FluencyMasteryPredictor(MONGO_URI, DB_NAME)
+    predictor.load_model()  # Try to load existing model
+    return predictor
+
+PREDICTOR_FACTORIES = {
+    'articulation': (_create_mastery_predictor, 'Articulation Mastery Predictor'),
+    'fluency': (_create_fluency_predictor, 'Fluency Mastery Predictor'),
+    'language_receptive': (lambda: LanguageMasteryPredictor(mode='receptive'), 'Receptive language mastery predictor'),
+    'language_expressive': (lambda: LanguageMasteryPredictor(mode='expressive'), 'Expressive language mastery predictor'),
+    'overall_speech': (OverallSpeechPredictor, 'Overall speech improvement predictor')
+}
+
+_predictors = {}
+_model_mtimes = {}  # name -> mtime of the saved model each predictor holds
+_predictors_lock = threading.Lock()
+
+def _model_mtime(predictor):
+    return model_store.model_mtime(predictor.model_path) if predictor is not None else None
+
+def get_predictor(name):
+    """
+    Return the named predictor, creating it on first use (None if unavailable)
+    
+    Any worker may retrain a model, so the saved model's mtime is checked on
+    every call; a newer file is loaded into a copy that replaces the predictor.
+    """
     try:
-        mastery_predictor = ArticulationMasteryPredictor(db)
-        mastery_predictor.load_model()  # Try to load existing model
-        print("✅ Articulation Mastery Predictor initialized")
-    except Exception as e:
-        print(f"⚠️  Articulation Mastery Predictor initialization failed: {e}")
-        mastery_predictor = None
+        predictor = _predictors[name]
+    except KeyError:
+        with _predictors_lock:
+            if name not in _predictors:
+                factory, label = PREDICTOR_FACTORIES[name]
+                try:
+                    predictor = factory()
+                    if predictor is not None:
+                        print(f"✅ {label} initialized")
+                except Exception as e:
+                    print(f"⚠️  {label} initialization failed: {e}")
+                    predictor = None
+                _predictors[name] = predictor
+                _model_mtimes[name] = _model_mtime(predictor)
+            return _predictors[name]
+    
+    if predictor is None:
+        return None
+    mtime = _model_mtime(predictor)
+    if mtime is None or mtime == _model_mtimes.get(name):
+        return predictor
+    
+    with _predictors_lock:
+        if _predictors[name] is predictor:
+            fresh = copy.copy(predictor)
+            if fresh.load_model():
+                _predictors[name] = fresh
+            # Recorded even when loading failed: a model caught mid-write gets
+            # a new mtime once the write finishes and is retried then
+            _model_mtimes[name] = mtime
+        return _predictors[name]
 
-# Initialize Fluency Mastery Predictor (XGBoost ML)
-fluency_predictor = None
-if db is not None:
+def set_predictor(name, predictor):
+    """Replace the named predictor (used after retraining)"""
+    with _predictors_lock:
+        _predictors[name] = predictor
+        _model_mtimes[name] = _model_mtime(predictor)
+
+# Model training runs on a single background thread so the train endpoints
+# answer 202 at once. Job state lives in MongoDB, so a status poll answered by
+# any gunicorn worker sees it; job records expire TRAIN_JOB_TTL seconds after
+# they are created.
+# A job whose worker is restarted mid-training stays 'running' until it expires.
+TRAIN_POOL = ThreadPoolExecutor(max_workers=1, thread_name_prefix='model-training')
+TRAIN_JOB_TTL = 7 * 24 * 3600
+train_jobs_collection = db['model_training_jobs'] if db is not None else None
+if train_jobs_collection is not None:
+    train_jobs_collection.create_index('created_at', expireAfterSeconds=TRAIN_JOB_TTL,
+                                       name='created_at_ttl')
+
+def _log_training_failure(future):
+    error = future.exception()
+    if error is not None:
+        app.logger.error("Model training failed: %s", error, exc_info=error)
+
+def _run_training_job(job_id, train, *args):
+    """Run train(*args) and record its metrics or error on the job document"""
     try:
-        fluency_predictor = FluencyMasteryPredictor(MONGO_URI, DB_NAME)
-        fluency_predictor.load_model()  # Try to load existing model
-        print("✅ Fluency Mastery Predictor initialized")
+        update = {'status': 'completed', 'metrics': train(*args)}
     except Exception as e:
-        print(f"⚠️  Fluency Mastery Predictor initialization failed: {e}")
-        fluency_predictor = None
+        app.logger.error("Model training failed: %s", e, exc_info=True)
+        update = {'status': 'failed', 'error': str(e)}
+    train_jobs_collection.update_one({'_id': job_id}, {'$set': update})
+
+def submit_training(kind, train, *args):
+    """Queue a training job and return the 202 response pointing at its status"""
+    if train_jobs_collection is None:
+        return jsonify({
+            'success': False,
+            'error': 'Training is not available without a database connection'
+        }), 503
+    
+    job_id = uuid.uuid4().hex
+    train_jobs_collection.insert_one({
+        '_id': job_id,
+        'model': kind,
+        'status': 'running',
+        'created_at': datetime.now(timezone.utc)
+    })
+    # Failures inside train are recorded on the job; this logs a failed update
+    future = TRAIN_POOL.submit(_run_training_job, job_id, train, *args)
+    future.add_done_callback(_log_training_failure)
+    
+    return jsonify({
+        'success': True,
+        'job_id': job_id,
+        'status': 'started',
+        'status_url': f'/api/speech/train-status/{job_id}'
+    }), 202
+
+def _body():
+    """
+    JSON body of the current request as a dict, {} when missing or malformed
+    
+    silent=True turns bad JSON into a plain validation failure instead of an
+    exception; cache=True keeps the parsed body on the request
+    """
+    data = request.get_json(silent=True, cache=True)
+    return data if isinstance(data, dict) else {}
+
+def json_response(payload, status=200):
+    """Serialize a response body with orjson instead of jsonify"""
+    return app.response_class(orjson.dumps(payload), status=status, mimetype='application/json')
 
 # Register blueprints (Speech Therapy)
 app.register_blueprint(fluency_bp)
@@ -95,40 +249,47 @@ app.register_blueprint(language_bp)
 app.register_blueprint(receptive_bp)
 app.register_blueprint(articulation_bp)
 
+# Health and info bodies cannot change once the worker has started (the
+# database handle is fixed at import), so they are serialised only once;
+# a fresh Response wraps them per request because CORS adds headers to it
+HEALTH_BODY = orjson.dumps({
+    'status': 'healthy',
+    'service': 'Therapy Exercises API',
+    'database': 'connected' if db is not None else 'disconnected'
+})
+
+INFO_BODY = orjson.dumps({
+    'service': 'CVACare Therapy Exercises API',
+    'version': '1.0.0',
+    'endpoints': {
+        'fluency': '/api/fluency-exercises',
+        'language_expressive': '/api/language-exercises',
+        'language_receptive': '/api/receptive-exercises',
+        'articulation': '/api/articulation-exercises',
+        'articulation_prediction': '/api/articulation/predict-mastery',
+        'stroke_exercises': '/api/exercises/*'
+    },
+    'features': [
+        'Fluency therapy exercise management',
+        'Language therapy (expressive & receptive)',
+        'Articulation therapy by sound',
+        'Articulation mastery time prediction (XGBoost ML)',
+        'Stroke rehabilitation exercise recommendations',
+        'CRUD operations with role-based access',
+        'Exercise seeding functionality',
+        'Active/inactive toggle for exercises'
+    ]
+})
+
 @app.route('/api/therapy/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
-    return jsonify({
-        'status': 'healthy',
-        'service': 'Therapy Exercises API',
-        'database': 'connected' if db is not None else 'disconnected'
-    }), 200
+    return app.response_class(HEALTH_BODY, mimetype='application/json')
 
 @app.route('/api/therapy/info', methods=['GET'])
 def info():
     """API information endpoint"""
-    return jsonify({
-        'service': 'CVACare Therapy Exercises API',
-        'version': '1.0.0',
-        'endpoints': {
-            'fluency': '/api/fluency-exercises',
-            'language_expressive': '/api/language-exercises',
-            'language_receptive': '/api/receptive-exercises',
-            'articulation': '/api/articulation-exercises',
-            'articulation_prediction': '/api/articulation/predict-mastery',
-            'stroke_exercises': '/api/exercises/*'
-        },
-        'features': [
-            'Fluency therapy exercise management',
-            'Language therapy (expressive & receptive)',
-            'Articulation therapy by sound',
-            'Articulation mastery time prediction (XGBoost ML)',
-            'Stroke rehabilitation exercise recommendations',
-            'CRUD operations with role-based access',
-            'Exercise seeding functionality',
-            'Active/inactive toggle for exercises'
-        ]
-    }), 200
+    return app.response_class(INFO_BODY, mimetype='application/json')
 
 # ============================================================
 # ARTICULATION MASTERY PREDICTION ENDPOINTS (XGBoost ML)
@@ -163,6 +324,7 @@ def predict_mastery():
     }
     """
     try:
+        mastery_predictor = get_predictor('articulation')
         if mastery_predictor is None:
             return jsonify({
                 'success': False,
@@ -170,7 +332,7 @@ def predict_mastery():
                 'message': 'ML model not initialized'
             }), 503
         
-        data = request.get_json()
+        data = _body()
         
         if not data:
             return jsonify({
@@ -195,19 +357,13 @@ def predict_mastery():
                 'message': 'sound_id must be one of: s, r, l, k, th'
             }), 400
         
-        print(f"\n{'='*60}")
-        print(f"🔮 Mastery Prediction Request")
-        print(f"{'='*60}")
-        print(f"User: {user_id}")
-        print(f"Sound: {sound_id}")
-        print(f"{'='*60}\n")
-        
         # Make prediction
         prediction = mastery_predictor.predict_days_to_mastery(user_id, sound_id)
         
-        print(f"✅ Prediction complete: {prediction['predicted_days']} days")
-        print(f"   Confidence: {prediction['confidence']:.0%}")
-        print(f"   Message: {prediction['message']}\n")
+        app.logger.debug(
+            "Mastery prediction user=%s sound=%s days=%s confidence=%.2f",
+            user_id, sound_id, prediction['predicted_days'], prediction['confidence']
+        )
         
         return jsonify({
             'success': True,
@@ -215,8 +371,7 @@ def predict_mastery():
         }), 200
         
     except Exception as e:
-        print(f"❌ Error predicting mastery: {str(e)}")
-        traceback.print_exc()
+        app.logger.error("Error predicting articulation mastery: %s", e, exc_info=True)
         return jsonify({
             'success': False,
             'error': 'Failed to predict mastery',
@@ -232,35 +387,34 @@ def train_mastery_model():
     Returns training metrics and model performance
     """
     try:
+        mastery_predictor = get_predictor('articulation')
         if mastery_predictor is None:
             return jsonify({
                 'success': False,
                 'error': 'Mastery prediction service not available'
             }), 503
         
-        print(f"\n{'='*60}")
-        print(f"🤖 Model Training Request")
-        print(f"{'='*60}\n")
+        app.logger.info("Articulation model training requested")
         
-        # Retrain model
-        result = mastery_predictor.retrain_model()
+        # Retrain a copy so predictions keep using the current model until
+        # the new one is fitted, then swap it in
+        new_predictor = copy.copy(mastery_predictor)
+        result = new_predictor.retrain_model()
         
         if result.get('success'):
-            print(f"✅ Model training complete")
-            print(f"   Samples: {result.get('samples', 0)}")
-            if 'metrics' in result:
-                metrics = result['metrics']
-                print(f"   MAE: {metrics.get('mae', 0):.2f} days")
-                print(f"   RMSE: {metrics.get('rmse', 0):.2f} days")
-                print(f"   R²: {metrics.get('r2', 0):.3f}\n")
+            set_predictor('articulation', new_predictor)
+            metrics = result.get('metrics', {})
+            app.logger.info(
+                "Articulation model trained: samples=%s mae=%.2f rmse=%.2f r2=%.3f",
+                result.get('samples', 0), metrics.get('mae', 0), metrics.get('rmse', 0), metrics.get('r2', 0)
+            )
         else:
-            print(f"⚠️  Model training skipped: {result.get('message')}\n")
+            app.logger.warning("Articulation model training skipped: %s", result.get('message'))
         
         return jsonify(result), 200 if result.get('success') else 400
         
     except Exception as e:
-        print(f"❌ Error training model: {str(e)}")
-        traceback.print_exc()
+        app.logger.error("Error training articulation model: %s", e, exc_info=True)
         return jsonify({
             'success': False,
             'error': 'Failed to train model',
@@ -274,6 +428,7 @@ def model_status():
     Returns whether model is trained and available for predictions
     """
     try:
+        mastery_predictor = get_predictor('articulation')
         if mastery_predictor is None:
             return jsonify({
                 'available': False,
@@ -327,6 +482,7 @@ def predict_fluency_mastery():
     }
     """
     try:
+        fluency_predictor = get_predictor('fluency')
         if fluency_predictor is None:
             return jsonify({
                 'success': False,
@@ -334,7 +490,7 @@ def predict_fluency_mastery():
                 'message': 'ML model not initialized'
             }), 503
         
-        data = request.get_json()
+        data = _body()
         
         if not data:
             return jsonify({
@@ -351,18 +507,13 @@ def predict_fluency_mastery():
                 'message': 'user_id is required'
             }), 400
         
-        print(f"\n{'='*60}")
-        print(f"🔮 Fluency Mastery Prediction Request")
-        print(f"{'='*60}")
-        print(f"User: {user_id}")
-        print(f"{'='*60}\n")
-        
         # Make prediction
         prediction = fluency_predictor.predict_days_to_mastery(user_id)
         
-        print(f"✅ Prediction complete: {prediction['predicted_days']} days")
-        print(f"   Confidence: {prediction['confidence']:.0%}")
-        print(f"   Message: {prediction['message']}\n")
+        app.logger.debug(
+            "Fluency mastery prediction user=%s days=%s confidence=%.2f",
+            user_id, prediction['predicted_days'], prediction['confidence']
+        )
         
         return jsonify({
             'success': True,
@@ -370,8 +521,7 @@ def predict_fluency_mastery():
         }), 200
         
     except Exception as e:
-        print(f"❌ Error predicting fluency mastery: {str(e)}")
-        traceback.print_exc()
+        app.logger.error("Error predicting fluency mastery: %s", e, exc_info=True)
         return jsonify({
             'success': False,
             'error': 'Failed to predict fluency mastery',
@@ -387,35 +537,33 @@ def train_fluency_model():
     Returns training metrics and model performance
     """
     try:
+        fluency_predictor = get_predictor('fluency')
         if fluency_predictor is None:
             return jsonify({
                 'success': False,
                 'error': 'Fluency prediction service not available'
             }), 503
         
-        print(f"\n{'='*60}")
-        print(f"🤖 Fluency Model Training Request")
-        print(f"{'='*60}\n")
+        app.logger.info("Fluency model training requested")
         
-        # Train model
-        result = fluency_predictor.train_model()
+        # Train a copy and swap it in once fitted, as for articulation
+        new_predictor = copy.copy(fluency_predictor)
+        result = new_predictor.train_model()
         
         if result.get('success'):
-            print(f"✅ Fluency model training complete")
-            if 'metrics' in result:
-                metrics = result['metrics']
-                print(f"   Samples: {metrics.get('training_samples', 0)}")
-                print(f"   MAE: {metrics.get('mae', 0):.2f} days")
-                print(f"   RMSE: {metrics.get('rmse', 0):.2f} days")
-                print(f"   R²: {metrics.get('r2', 0):.3f}\n")
+            set_predictor('fluency', new_predictor)
+            metrics = result.get('metrics', {})
+            app.logger.info(
+                "Fluency model trained: samples=%s mae=%.2f rmse=%.2f r2=%.3f",
+                metrics.get('training_samples', 0), metrics.get('mae', 0), metrics.get('rmse', 0), metrics.get('r2', 0)
+            )
         else:
-            print(f"⚠️  Fluency model training skipped: {result.get('message')}\n")
+            app.logger.warning("Fluency model training skipped: %s", result.get('message'))
         
         return jsonify(result), 200 if result.get('success') else 400
         
     except Exception as e:
-        print(f"❌ Error training fluency model: {str(e)}")
-        traceback.print_exc()
+        app.logger.error("Error training fluency model: %s", e, exc_info=True)
         return jsonify({
             'success': False,
             'error': 'Failed to train fluency model',
@@ -429,6 +577,7 @@ def fluency_model_status():
     Returns whether model is trained and available for predictions
     """
     try:
+        fluency_predictor = get_predictor('fluency')
         if fluency_predictor is None:
             return jsonify({
                 'available': False,
@@ -454,15 +603,22 @@ def fluency_model_status():
 # STROKE EXERCISE RECOMMENDATION ENDPOINTS (Physical Therapy)
 # ============================================================
 
+EXERCISE_HEALTH_BODY = orjson.dumps({
+    'status': 'healthy',
+    'service': 'Stroke Exercise Recommendation',
+    'exercise_library_loaded': exercise_library is not None,
+    'recommender_ready': exercise_recommender is not None
+})
+
 @app.route('/api/exercises/health', methods=['GET'])
 def exercise_health():
     """Health check for exercise recommendation service"""
-    return jsonify({
-        'status': 'healthy',
-        'service': 'Stroke Exercise Recommendation',
-        'exercise_library_loaded': exercise_library is not None,
-        'recommender_ready': exercise_recommender is not None
-    }), 200
+    return app.response_class(EXERCISE_HEALTH_BODY, mimetype='application/json')
+
+# Recommendation request limits, checked before the recommender runs
+MAX_PROBLEMS = 32
+MAX_EQUIPMENT = 32
+SEVERITIES = frozenset(('severe', 'moderate', 'mild'))
 
 @app.route('/api/exercises/recommend', methods=['POST'])
 def recommend_exercises():
@@ -492,7 +648,7 @@ def recommend_exercises():
     }
     """
     try:
-        data = request.get_json()
+        data = _body()
         
         if not data:
             return jsonify({
@@ -510,15 +666,26 @@ def recommend_exercises():
                 'message': 'Detected problems array is empty'
             }), 400
         
-        print(f"\n{'='*60}")
-        print("🎯 Exercise Recommendation Request")
-        print(f"{'='*60}")
-        print(f"Problems detected: {len(detected_problems)}")
-        for problem in detected_problems:
-            print(f"  - {problem.get('problem')}: {problem.get('severity')}")
-        print(f"User profile: Age {user_profile.get('age', 'N/A')}, "
-              f"Fitness: {user_profile.get('fitness_level', 'N/A')}")
-        print(f"{'='*60}\n")
+        equipment = user_profile.get('equipment_available', [])
+        if len(detected_problems) > MAX_PROBLEMS or len(equipment) > MAX_EQUIPMENT:
+            return jsonify({
+                'success': False,
+                'error': 'Too many problems or equipment items',
+                'message': f'At most {MAX_PROBLEMS} problems and {MAX_EQUIPMENT} equipment items per request'
+            }), 413
+        
+        if not all(isinstance(problem, dict) and problem.get('severity') in SEVERITIES
+                   for problem in detected_problems):
+            return jsonify({
+                'success': False,
+                'error': 'Invalid problem severity',
+                'message': f"Each problem needs a severity of {', '.join(sorted(SEVERITIES))}"
+            }), 400
+        
+        app.logger.info(
+            "Exercise recommendation request: problems=%d age=%s fitness=%s",
+            len(detected_problems), user_profile.get('age', 'N/A'), user_profile.get('fitness_level', 'N/A')
+        )
         
         # Generate recommendations
         recommendations = exercise_recommender.recommend_exercises(
@@ -526,10 +693,12 @@ def recommend_exercises():
             user_profile=user_profile
         )
         
-        print(f"✅ Recommendations generated:")
-        print(f"   Total exercises: {recommendations['total_exercises']}")
-        print(f"   Estimated timeline: {recommendations['estimated_timeline']['estimated_weeks']} weeks")
-        print(f"   Daily time: {recommendations['daily_time_commitment']['average_minutes_per_day']} minutes\n")
+        app.logger.info(
+            "Recommendations generated: exercises=%s weeks=%s minutes_per_day=%s",
+            recommendations['total_exercises'],
+            recommendations['estimated_timeline']['estimated_weeks'],
+            recommendations['daily_time_commitment']['average_minutes_per_day']
+        )
         
         return jsonify({
             'success': True,
@@ -537,91 +706,111 @@ def recommend_exercises():
         }), 200
         
     except Exception as e:
-        print(f"❌ Error generating recommendations: {str(e)}")
-        traceback.print_exc()
+        app.logger.error("Error generating recommendations: %s", e, exc_info=True)
         return jsonify({
             'success': False,
             'error': 'Failed to generate recommendations',
             'details': str(e)
         }), 500
 
+# The exercise library is static, so each library response body is
+# serialised once per worker and repeat requests can be answered with 304
+def _json_body(payload):
+    body = orjson.dumps(payload)
+    return body, hashlib.blake2b(body, digest_size=8).hexdigest()
+
+@functools.lru_cache(maxsize=1)
+def _problem_types_body():
+    return _json_body({
+        'success': True,
+        'problem_types': exercise_library.get_all_problem_types()
+    })
+
+@functools.lru_cache(maxsize=256)
+def _problem_exercises_body(problem_type, severity):
+    return _json_body({
+        'success': True,
+        'problem_type': problem_type,
+        'severity': severity,
+        'exercises': exercise_library.get_exercises_for_problem(problem_type, severity)
+    })
+
+@functools.lru_cache(maxsize=256)
+def _exercise_body(exercise_id):
+    exercise = exercise_library.get_exercise_by_id(exercise_id)
+    if not exercise:
+        return None
+    return _json_body({
+        'success': True,
+        'exercise': exercise
+    })
+
+# Cached library bodies are compressed once per encoding, at the highest
+# level, instead of by Flask-Compress on every request
+LIBRARY_COMPRESSORS = {
+    'br': functools.partial(brotli.compress, quality=11),
+    'gzip': functools.partial(gzip.compress, compresslevel=9)
+}
+
+@functools.lru_cache(maxsize=512)
+def _encoded_body(cached_body, encoding):
+    return LIBRARY_COMPRESSORS[encoding](cached_body[0])
+
+def _cached_json_response(cached_body):
+    body, etag = cached_body
+    response = app.response_class(body, mimetype='application/json')
+    
+    encoding = request.accept_encodings.best_match(LIBRARY_COMPRESSORS)
+    if encoding and len(body) >= app.config['COMPRESS_MIN_SIZE']:
+        response.set_data(_encoded_body(cached_body, encoding))
+        response.headers['Content-Encoding'] = encoding
+        # Same per-encoding ETag suffix Flask-Compress uses
+        etag = f'{etag}:{encoding}'
+    
+    response.set_etag(etag)
+    return response.make_conditional(request)
+
+def library_errors(view):
+    """Turn an unexpected error in a library view into the usual 500 JSON reply"""
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        try:
+            return view(*args, **kwargs)
+        except Exception as e:
+            return json_response({
+                'success': False,
+                'error': str(e)
+            }, 500)
+    return wrapper
+
 @app.route('/api/exercises/library/problems', methods=['GET'])
+@library_errors
 def get_problem_types():
     """Get all available problem types and their exercises"""
-    try:
-        problem_types = exercise_library.get_all_problem_types()
-        return jsonify({
-            'success': True,
-            'problem_types': problem_types
-        }), 200
-    except Exception as e:
-        return jsonify({
-            'success': False,
-            'error': str(e)
-        }), 500
+    return _cached_json_response(_problem_types_body())
 
 @app.route('/api/exercises/library/<problem_type>/<severity>', methods=['GET'])
+@library_errors
 def get_exercises_for_problem(problem_type, severity):
     """Get exercises for a specific problem type and severity"""
-    try:
-        exercises = exercise_library.get_exercises_for_problem(problem_type, severity)
-        return jsonify({
-            'success': True,
-            'problem_type': problem_type,
-            'severity': severity,
-            'exercises': exercises
-        }), 200
-    except Exception as e:
-        return jsonify({
-            'success': False,
-            'error': str(e)
-        }), 500
+    return _cached_json_response(_problem_exercises_body(problem_type, severity))
 
 @app.route('/api/exercises/library/exercise/<exercise_id>', methods=['GET'])
+@library_errors
 def get_exercise_by_id(exercise_id):
     """Get a specific exercise by ID"""
-    try:
-        exercise = exercise_library.get_exercise_by_id(exercise_id)
-        if exercise:
-            return jsonify({
-                'success': True,
-                'exercise': exercise
-            }), 200
-        else:
-            return jsonify({
-                'success': False,
-                'error': 'Exercise not found'
-            }), 404
-    except Exception as e:
-        return jsonify({
+    cached_body = _exercise_body(exercise_id)
+    if cached_body is None:
+        return json_response({
             'success': False,
-            'error': str(e)
-        }), 500
+            'error': 'Exercise not found'
+        }, 404)
+    return _cached_json_response(cached_body)
 
 # ============================================================================
 # LANGUAGE MASTERY PREDICTION ENDPOINTS (Receptive & Expressive)
 # ============================================================================
 
-# Initialize language predictors
-language_receptive_predictor = None
-language_expressive_predictor = None
-
-try:
-    language_receptive_predictor = LanguageMasteryPredictor(mode='receptive')
-    language_expressive_predictor = LanguageMasteryPredictor(mode='expressive')
-    print("✅ Language mastery predictors initialized")
-except Exception as e:
-    print(f"⚠️  Could not initialize language predictors: {e}")
-
-# Initialize overall speech improvement predictor
-overall_speech_predictor = None
-
-try:
-    overall_speech_predictor = OverallSpeechPredictor()
-    print("✅ Overall speech improvement predictor initialized")
-except Exception as e:
-    print(f"⚠️  Could not initialize overall speech predictor: {e}")
-
 @app.route('/api/language/predict-mastery', methods=['POST'])
 def predict_language_mastery():
     """
@@ -629,7 +818,7 @@ def predict_language_mastery():
     Request body: { user_id, mode } where mode is 'receptive' or 'expressive'
     """
     try:
-        data = request.get_json()
+        data = _body()
         user_id = data.get('user_id')
         mode = data.get('mode', 'receptive')  # Default to receptive
         
@@ -646,7 +835,7 @@ def predict_language_mastery():
             }), 400
         
         # Select appropriate predictor
-        predictor = language_receptive_predictor if mode == 'receptive' else language_expressive_predictor
+        predictor = get_predictor(f'language_{mode}')
         
         if predictor is None or predictor.model is None:
             return jsonify({
@@ -655,12 +844,7 @@ def predict_language_mastery():
                 'available': False
             }), 503
         
-        print(f"\n{'='*60}")
-        print(f"🔮 {mode.capitalize()} Language Mastery Prediction Request")
-        print(f"{'='*60}")
-        print(f"User: {user_id}")
-        print(f"Mode: {mode}")
-        print(f"{'='*60}\n")
+        app.logger.info("Language mastery prediction request: user=%s mode=%s", user_id, mode)
         
         # Get prediction
         prediction = predictor.predict_days_to_mastery(user_id)
@@ -672,56 +856,110 @@ def predict_language_mastery():
         }), 200
         
     except Exception as e:
-        print(f"❌ Error in language prediction: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        app.logger.error("Error in language prediction: %s", e, exc_info=True)
         
         return jsonify({
             'success': False,
             'error': str(e)
         }), 500
 
-@app.route('/api/language/train-model', methods=['POST'])
-def train_language_model():
+# Upper bound on users per batch prediction request
+MAX_BATCH_USERS = 1000
+
+@app.route('/api/language/predict-mastery-batch', methods=['POST'])
+def predict_language_mastery_batch():
     """
-    Train/retrain both receptive and expressive language mastery prediction models
+    Predict days until language therapy mastery for several users at once
+    Request body: { user_ids: [...], mode } where mode is 'receptive' or 'expressive'
+    Response predictions map each user_id to its prediction
     """
     try:
-        data = request.get_json() or {}
-        mode = data.get('mode', 'both')  # 'receptive', 'expressive', or 'both'
+        data = _body()
+        user_ids = data.get('user_ids')
+        mode = data.get('mode', 'receptive')  # Default to receptive
         
-        print(f"\n{'='*60}")
-        print(f"🤖 Language Model Training Request")
-        print(f"{'='*60}")
-        print(f"Mode: {mode}")
-        print(f"{'='*60}\n")
+        if (not isinstance(user_ids, list) or not user_ids or len(user_ids) > MAX_BATCH_USERS
+                or not all(isinstance(user_id, str) and user_id for user_id in user_ids)):
+            return jsonify({
+                'success': False,
+                'error': f'user_ids must be a non-empty list of at most {MAX_BATCH_USERS} ids'
+            }), 400
         
-        results = {}
+        if mode not in ['receptive', 'expressive']:
+            return jsonify({
+                'success': False,
+                'error': 'mode must be either "receptive" or "expressive"'
+            }), 400
         
-        # Train receptive model
-        if mode in ['receptive', 'both']:
-            global language_receptive_predictor
-            language_receptive_predictor = LanguageMasteryPredictor(mode='receptive')
-            receptive_metrics = language_receptive_predictor.train_model()
-            results['receptive'] = receptive_metrics
+        # Select appropriate predictor
+        predictor = get_predictor(f'language_{mode}')
         
-        # Train expressive model  
-        if mode in ['expressive', 'both']:
-            global language_expressive_predictor
-            language_expressive_predictor = LanguageMasteryPredictor(mode='expressive')
-            expressive_metrics = language_expressive_predictor.train_model()
-            results['expressive'] = expressive_metrics
+        if predictor is None or predictor.model is None:
+            return jsonify({
+                'success': False,
+                'error': f'{mode.capitalize()} language prediction model is not available. Please train the model first.',
+                'available': False
+            }), 503
+        
+        app.logger.info("Language mastery batch prediction request: users=%d mode=%s", len(user_ids), mode)
+        
+        predictions = predictor.predict_days_to_mastery_batch(user_ids)
         
         return jsonify({
             'success': True,
-            'message': f'{mode.capitalize()} language model(s) trained successfully',
-            'metrics': results
+            'predictions': predictions,
+            'mode': mode
         }), 200
         
     except Exception as e:
-        print(f"❌ Error training language model: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        app.logger.error("Error in language batch prediction: %s", e, exc_info=True)
+        
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+def _train_language_models(mode):
+    """Train the requested language models, swapping each in once it is ready"""
+    results = {}
+    
+    # Train receptive model
+    if mode in ['receptive', 'both']:
+        language_receptive_predictor = LanguageMasteryPredictor(mode='receptive')
+        results['receptive'] = language_receptive_predictor.train_model()
+        set_predictor('language_receptive', language_receptive_predictor)
+    
+    # Train expressive model
+    if mode in ['expressive', 'both']:
+        language_expressive_predictor = LanguageMasteryPredictor(mode='expressive')
+        results['expressive'] = language_expressive_predictor.train_model()
+        set_predictor('language_expressive', language_expressive_predictor)
+    
+    app.logger.info("Language model training complete: mode=%s", mode)
+    return results
+
+@app.route('/api/language/train-model', methods=['POST'])
+def train_language_model():
+    """
+    Train/retrain both receptive and expressive language mastery prediction models
+    Training runs in the background; poll the returned status_url for metrics
+    """
+    try:
+        data = _body()
+        mode = data.get('mode', 'both')  # 'receptive', 'expressive', or 'both'
+        
+        if mode not in ['receptive', 'expressive', 'both']:
+            return jsonify({
+                'success': False,
+                'error': 'mode must be "receptive", "expressive" or "both"'
+            }), 400
+        
+        app.logger.info("Language model training requested: mode=%s", mode)
+        
+        return submit_training(f'language_{mode}', _train_language_models, mode)
+        
+    except Exception as e:
+        app.logger.error("Error training language model: %s", e, exc_info=True)
         
         return jsonify({
             'success': False,
@@ -732,6 +970,8 @@ def train_language_model():
 def language_model_status():
     """Get status of language mastery prediction models"""
     try:
+        language_receptive_predictor = get_predictor('language_receptive')
+        language_expressive_predictor = get_predictor('language_expressive')
         receptive_available = language_receptive_predictor is not None and language_receptive_predictor.model is not None
         expressive_available = language_expressive_predictor is not None and language_expressive_predictor.model is not None
         
@@ -768,7 +1008,7 @@ def predict_overall_improvement():
     Returns weekly improvement rate and weeks to full recovery
     """
     try:
-        data = request.get_json()
+        data = _body()
         user_id = data.get('user_id')
         
         if not user_id:
@@ -777,6 +1017,7 @@ def predict_overall_improvement():
                 'error': 'user_id is required'
             }), 400
         
+        overall_speech_predictor = get_predictor('overall_speech')
         if overall_speech_predictor is None or overall_speech_predictor.model is None:
             return jsonify({
                 'success': False,
@@ -784,11 +1025,7 @@ def predict_overall_improvement():
                 'available': False
             }), 503
         
-        print(f"\n{'='*60}")
-        print(f"🎯 Overall Speech Improvement Prediction Request")
-        print(f"{'='*60}")
-        print(f"User: {user_id}")
-        print(f"{'='*60}\n")
+        app.logger.info("Overall speech improvement prediction request: user=%s", user_id)
         
         # Get prediction
         prediction = overall_speech_predictor.predict_improvement(user_id)
@@ -799,45 +1036,47 @@ def predict_overall_improvement():
         }), 200
         
     except Exception as e:
-        print(f"❌ Error in overall speech prediction: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        app.logger.error("Error in overall speech prediction: %s", e, exc_info=True)
         
         return jsonify({
             'success': False,
             'error': str(e)
         }), 500
 
+def _train_overall_model(current_predictor):
+    """
+    Train a copy of the overall speech predictor and swap it in when done
+    
+    The copy shares the Mongo client, while predictions keep using the
+    current model until the new one is fitted.
+    """
+    predictor = copy.copy(current_predictor)
+    predictor.train_model()
+    set_predictor('overall_speech', predictor)
+    
+    app.logger.info("Overall speech model training complete")
+    return {'model_path': predictor.model_path}
+
 @app.route('/api/speech/train-overall-model', methods=['POST'])
 def train_overall_model():
     """
     Train/retrain the overall speech improvement prediction model
-    (Admin only)
+    (Admin only; runs in the background, poll the returned status_url)
     """
     try:
-        print(f"\n{'='*60}")
-        print(f"🤖 Overall Speech Model Training Request")
-        print(f"{'='*60}\n")
+        app.logger.info("Overall speech model training requested")
         
+        overall_speech_predictor = get_predictor('overall_speech')
         if overall_speech_predictor is None:
             return jsonify({
                 'success': False,
                 'error': 'Overall speech predictor not initialized'
             }), 500
         
-        # Train model
-        overall_speech_predictor.train_model()
-        
-        return jsonify({
-            'success': True,
-            'message': 'Overall speech improvement model trained successfully',
-            'model_path': overall_speech_predictor.model_path
-        }), 200
+        return submit_training('overall_speech', _train_overall_model, overall_speech_predictor)
         
     except Exception as e:
-        print(f"❌ Error training overall speech model: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        app.logger.error("Error training overall speech model: %s", e, exc_info=True)
         
         return jsonify({
             'success': False,
@@ -848,6 +1087,7 @@ def train_overall_model():
 def overall_model_status():
     """Get status of the overall speech improvement prediction model"""
     try:
+        overall_speech_predictor = get_predictor('overall_speech')
         available = overall_speech_predictor is not None and overall_speech_predictor.model is not None
         
         return jsonify({
@@ -865,6 +1105,42 @@ def overall_model_status():
         }), 500
 
 
+@app.route('/api/speech/train-status/<job_id>', methods=['GET'])
+def train_status(job_id):
+    """
+    Status of a background training job: running, completed (with metrics) or failed
+    (Same path through the Node API, which proxies it)
+    """
+    try:
+        if train_jobs_collection is None:
+            return jsonify({
+                'success': False,
+                'error': 'Training job store not available'
+            }), 503
+        
+        job = train_jobs_collection.find_one({'_id': job_id})
+        if job is None:
+            return jsonify({
+                'success': False,
+                'error': 'Training job not found'
+            }), 404
+        
+        response = {'success': True, 'job_id': job_id, 'model': job['model'], 'status': job['status']}
+        if job['status'] == 'failed':
+            response['error'] = job.get('error')
+        elif job['status'] == 'completed':
+            response['metrics'] = job.get('metrics')
+        
+        return jsonify(response), 200
+        
+    except Exception as e:
+        app.logger.error("Error reading training job %s: %s", job_id, e, exc_info=True)
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
 # ============================================================================
 # PRESCRIPTIVE ANALYSIS ENDPOINTS
 # Intelligent Therapy Prioritization & Sequencing (Decision Rules + Graph-Based)
@@ -885,17 +1161,10 @@ def get_therapy_prioritization(user_id):
     - Optimal therapy sequence
     """
     try:
-        print(f"\n{'='*60}")
-        print(f"🎯 Prescriptive Analysis Request Received")
-        print(f"{'='*60}")
-        print(f"User ID: {user_id}")
-        print(f"Timestamp: {datetime.now()}")
-        print(f"{'='*60}\n")
-        
-        # Generate prescriptive analysis
-        print("📊 Generating therapy prioritization...")
+        app.logger.info("Prescriptive analysis request: user=%s", user_id)
+        
         result = generate_therapy_prioritization(user_id)
-        print("✅ Prescriptive analysis generated successfully\n")
+        app.logger.debug("Prescriptive analysis generated: user=%s", user_id)
         
         return jsonify({
             'success': True,
@@ -904,11 +1173,7 @@ def get_therapy_prioritization(user_id):
         }), 200
         
     except Exception as e:
-        print(f"\n{'='*60}")
-        print(f"❌ Error in prescriptive analysis: {e}")
-        print(f"{'='*60}")
-        traceback.print_exc()
-        print(f"{'='*60}\n")
+        app.logger.error("Error in prescriptive analysis: %s", e, exc_info=True)
         return jsonify({
             'success': False,
             'error': str(e),
@@ -997,7 +1262,8 @@ def get_therapy_bottlenecks(user_id):
 
 if __name__ == '__main__':
     port = int(os.getenv('THERAPY_PORT', 5002))
-    debug = os.getenv('FLASK_ENV', 'development') == 'development'
+    # Debug is opt-in with FLASK_DEBUG=1; FLASK_ENV no longer turns it on
+    debug = os.getenv('FLASK_DEBUG') == '1'
     
     print("=" * 60)
     print("🎯 Therapy Exercises API Server")
@@ -1012,5 +1278,8 @@ if __name__ == '__main__':
     print("   ├─ Prescriptive Analysis (Decision Rules + Graph-Based)")
     print("   └─ Stroke Exercise Recommendations (Physical Therapy)")
     print("=" * 60)
+    if debug:
+        print("⚠️  Debug mode is for local development only; serve with: gunicorn -c gunicorn.conf.py app:app")
     
-    app.run(host='0.0.0.0', port=port, debug=debug)
+    # No reloader: it would run a second copy of the app and load every model twice
+    app.run(host='0.0.0.0', port=port, debug=debug, use_reloader=False)
@@ -3,16 +3,88 @@ Articulation Exercise CRUD Operations
 Manages articulation therapy exercises by sound (s, r, l, k, th) and level (Sound, Syllable, Word, Phrase, Sentence)
 """
 
-from flask import Blueprint, request, jsonify
-from functools import wraps
+from flask import Blueprint, current_app, request, jsonify
+from functools import lru_cache, wraps
 from bson import ObjectId
+from pymongo import ReturnDocument
+from pymongo.errors import BulkWriteError
 import datetime
-import jwt
-import os
+import orjson
+
+import auth_cache
 
 # Create Blueprint
 articulation_bp = Blueprint('articulation_crud', __name__)
 
+# Names generated from an exercise's sound_id and level
+SOUND_NAMES = {
+    's': 'S Sound',
+    'r': 'R Sound',
+    'l': 'L Sound',
+    'k': 'K Sound',
+    'th': 'TH Sound'
+}
+
+LEVEL_NAMES = {
+    1: 'Sound',
+    2: 'Syllable',
+    3: 'Word',
+    4: 'Phrase',
+    5: 'Sentence'
+}
+
+# Accepted values for exercise fields, checked before any database call
+VALID_SOUND_IDS = frozenset(SOUND_NAMES)
+VALID_LEVELS = frozenset(LEVEL_NAMES)
+MAX_ORDER = 1000
+MAX_TARGET_LENGTH = 256
+
+def _as_int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+def invalid_field(data):
+    """Message for the first invalid sound_id, level, order or target in data, or None"""
+    if 'sound_id' in data and not (isinstance(data['sound_id'], str) and data['sound_id'] in VALID_SOUND_IDS):
+        return f"sound_id must be one of: {', '.join(SOUND_NAMES)}"
+    if 'level' in data and _as_int(data['level']) not in VALID_LEVELS:
+        return f"level must be one of: {', '.join(map(str, LEVEL_NAMES))}"
+    if 'order' in data and not 1 <= (_as_int(data['order']) or 0) <= MAX_ORDER:
+        return f'order must be a number from 1 to {MAX_ORDER}'
+    if 'target' in data and not (isinstance(data['target'], str) and len(data['target']) <= MAX_TARGET_LENGTH):
+        return f'target must be text of at most {MAX_TARGET_LENGTH} characters'
+    return None
+
+# Update pipeline stages that regenerate sound_name, level_name and
+# exercise_id from an exercise's stored sound_id, level and order, matching
+# create_exercise (level and order default to 1 when missing)
+GENERATED_FIELD_STAGES = [
+    {'$set': {
+        'sound_name': {'$switch': {
+            'branches': [
+                {'case': {'$eq': ['$sound_id', sound_id]}, 'then': name}
+                for sound_id, name in SOUND_NAMES.items()
+            ],
+            'default': {'$concat': [{'$toUpper': '$sound_id'}, ' Sound']}
+        }},
+        'level_name': {'$switch': {
+            'branches': [
+                {'case': {'$eq': [{'$toInt': {'$ifNull': ['$level', 1]}}, level]}, 'then': name}
+                for level, name in LEVEL_NAMES.items()
+            ],
+            'default': 'Unknown'
+        }}
+    }},
+    {'$set': {
+        'exercise_id': {'$concat': [
+            '$sound_id', '-', {'$toLower': '$level_name'}, '-',
+            {'$toString': {'$toInt': {'$ifNull': ['$order', 1]}}}
+        ]}
+    }}
+]
+
 # Database collections
 db = None
 users_collection = None
@@ -26,6 +98,26 @@ def init_articulation_crud(database):
     articulation_exercises_collection = db['articulation_exercises']
     print("✅ Articulation CRUD initialized")
 
+# Exercise lists are sorted by sound, level and order; a matching index lets
+# MongoDB return them already sorted instead of sorting in memory
+EXERCISE_INDEX = [('sound_id', 1), ('level', 1), ('order', 1)]
+
+@lru_cache(maxsize=1)
+def ensure_exercise_index():
+    """Create the list index once per process (retried if it fails)"""
+    articulation_exercises_collection.create_index(EXERCISE_INDEX, name='sound_level_order_idx')
+
+# List responses go straight through orjson, which writes datetimes in
+# isoformat itself; ObjectIds fall back to str()
+LIST_JSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SORT_KEYS
+
+def list_response(payload):
+    """JSON response for a list endpoint, without converting each document first"""
+    return current_app.response_class(
+        orjson.dumps(payload, default=str, option=LIST_JSON_OPTIONS),
+        mimetype='application/json'
+    )
+
 # Token required decorator
 def token_required(f):
     @wraps(f)
@@ -36,12 +128,12 @@ def token_required(f):
         try:
             if token.startswith('Bearer '):
                 token = token[7:]
-            data = jwt.decode(token, os.getenv('SECRET_KEY', 'your-secret-key-here'), algorithms=["HS256"])
+            data = auth_cache.decode_token(token)
             # Node.js backend uses 'id' field, not 'user_id'
             user_id = data.get('id') or data.get('user_id')
             if not user_id:
                 return jsonify({'message': 'Invalid token format!'}), 401
-            current_user = users_collection.find_one({'_id': ObjectId(user_id)})
+            current_user = auth_cache.find_user(users_collection, user_id)
             if not current_user:
                 return jsonify({'message': 'User not found!'}), 401
         except Exception as e:
@@ -73,195 +165,200 @@ def seed_default_exercises(current_user):
                 'existing_count': existing
             }), 400
         
+        # Every seeded exercise shares one timestamp
+        now = datetime.datetime.utcnow()
+        
         # Default exercises for all sounds (5 levels each) - using simple words for Level 1
         default_exercises = [
             # ==================== S SOUND ====================
             # S Sound - Level 1: Sound (using simple word instead of isolated sound)
             {'exercise_id': 's-sound-1', 'sound_id': 's', 'sound_name': 'S Sound', 'level': 1, 'level_name': 'Sound',
              'target': 'sea', 'order': 1, 'is_active': True,
-             'created_at': datetime.datetime.utcnow(), 'updated_at': datetime.datetime.utcnow()},
+             'created_at': now, 'updated_at': now},
             # S Sound - Level 2: Syllable
             {'exercise_id': 's-syllable-1', 'sound_id': 's', 'sound_name': 'S Sound', 'level': 2, 'level_name': 'Syllable',
              'target': 'sa', 'order': 1, 'is_active': True,
-             'created_at': datetime.datetime.utcnow(), 'updated_at': datetime.datetime.utcnow()},
+             'created_at': now, 'updated_at': now},
             {'exercise_id': 's-syllable-2', 'sound_id': 's', 'sound_name': 'S Sound', 'level': 2, 'level_name': 'Syllable',
              'target': 'so', 'order': 2, 'is_active': True,
-             'created_at': datetime.datetime.utcnow(), 'updated_at': datetime.datetime.utcnow()},
+             'created_at': now, 'updated_at': now},
             {'exercise_id': 's-syllable-3', 'sound_id': 's', 'sound_name': 'S Sound', 'level': 2, 'level_name': 'Syllable',
              'target': 'su', 'order': 3, 'is_active': True,
-             'created_at': datetime.datetime.utcnow(), 'updated_at': datetime.datetime.utcnow()},
+             'created_at': now, 'updated_at': now},
             # S Sound - Level 3: Word
             {'exercise_id': 's-word-1', 'sound_id': 's', 'sound_name': 'S Sound', 'level': 3, 'level_name': 'Word',
              'target': 'sun', 'order': 1, 'is_active': True,
-             'created_at': datetime.datetime.utcnow(), 'updated_at': datetime.datetime.utcnow()},
+             'created_at': now, 'updated_at': now},
             {'exercise_id': 's-word-2', 'sound_id': 's', 'sound_name': 'S Sound', 'level': 3, 'level_name': 'Word',
              'target': 'sat', 'order': 2, 'is_active': True,
-             'created_at': datetime.datetime.utcnow(), 'updated_at': datetime.datetime.utcnow()},
+             'created_at': now, 'updated_at': now},
             {'exercise_id': 's-word-3', 'sound_id': 's', 'sound_name': 'S Sound', 'level': 3, 'level_name': 'Word',
              'target': 'sip', 'order': 3, 'is_active': True,
-             'created_at': datetime.datetime.utcnow(), 'updated_at': datetime.datetime.utcnow()},
+             'created_at': now, 'updated_at': now},
             # S Sound - Level 4: Phrase
             {'exercise_id': 's-phrase-1', 'sound_id': 's', 'sound_name': 'S Sound', 'level': 4, 'level_name': 'Phrase',
              'target': 'See the sun.', 'order': 1, 'is_active': True,
-             'created_at': datetime.datetime.utcnow(), 'updated_at': datetime.datetime.utcnow()},
+             'created_at': now, 'updated_at': now},
             {'exercise_id': 's-phrase-2', 'sound_id': 's', 'sound_name': 'S Sound', 'level': 4, 'level_name': 'Phrase',
              'target': 'Sit down.', 'order': 2, 'is_active': True,
-             'created_at': datetime.datetime.utcnow(), 'updated_at': datetime.datetime.utcnow()},
+             'created_at': now, 'updated_at': now},
             # S Sound - Level 5: Sentence
             {'exercise_id': 's-sentence-1', 'sound_id': 's', 'sound_name': 'S Sound', 'level': 5, 'level_name': 'Sentence',
              'target': 'The sun is very hot.', 'order': 1, 'is_active': True,
-             'created_at': datetime.datetime.utcnow(), 'updated_at': datetime.datetime.utcnow()},
+             'created_at': now, 'updated_at': now},
             
             # ==================== R SOUND ====================
             # R Sound - Level 1: Sound (using simple word)
             {'exercise_id': 'r-sound-1', 'sound_id': 'r', 'sound_name': 'R Sound', 'level': 1, 'level_name': 'Sound',
              'target': 'ray', 'order': 1, 'is_active': True,
-             'created_at': datetime.datetime.utcnow(), 'updated_at': datetime.datetime.utcnow()},
+             'created_at': now, 'updated_at': now},
             # R Sound - Level 2: Syllable
             {'exercise_id': 'r-syllable-1', 'sound_id': 'r', 'sound_name': 'R Sound', 'level': 2, 'level_name': 'Syllable',
              'target': 'ra', 'order': 1, 'is_active': True,
-             'created_at': datetime.datetime.utcnow(), 'updated_at': datetime.datetime.utcnow()},
+             'created_at': now, 'updated_at': now},
             {'exercise_id': 'r-syllable-2', 'sound_id': 'r', 'sound_name': 'R Sound', 'level': 2, 'level_name': 'Syllable',
              'target': 'ro', 'order': 2, 'is_active': True,
-             'created_at': datetime.datetime.utcnow(), 'updated_at': datetime.datetime.utcnow()},
+             'created_at': now, 'updated_at': now},
             {'exercise_id': 'r-syllable-3', 'sound_id': 'r', 'sound_name': 'R Sound', 'level': 2, 'level_name': 'Syllable',
              'target': 'ru', 'order': 3, 'is_active': True,
-             'created_at': datetime.datetime.utcnow(), 'updated_at': datetime.datetime.utcnow()},
+             'created_at': now, 'updated_at': now},
             # R Sound - Level 3: Word
             {'exercise_id': 'r-word-1', 'sound_id': 'r', 'sound_name': 'R Sound', 'level': 3, 'level_name': 'Word',
              'target': 'red', 'order': 1, 'is_active': True,
-             'created_at': datetime.datetime.utcnow(), 'updated_at': datetime.datetime.utcnow()},
+             'created_at': now, 'updated_at': now},
             {'exercise_id': 'r-word-2', 'sound_id': 'r', 'sound_name': 'R Sound', 'level': 3, 'level_name': 'Word',
              'target': 'run', 'order': 2, 'is_active': True,
-             'created_at': datetime.datetime.utcnow(), 'updated_at': datetime.datetime.utcnow()},
+             'created_at': now, 'updated_at': now},
             {'exercise_id': 'r-word-3', 'sound_id': 'r', 'sound_name': 'R Sound', 'level': 3, 'level_name': 'Word',
              'target': 'rat', 'order': 3, 'is_active': True,
-             'created_at': datetime.datetime.utcnow(), 'updated_at': datetime.datetime.utcnow()},
+             'created_at': now, 'updated_at': now},
             # R Sound - Level 4: Phrase
             {'exercise_id': 'r-phrase-1', 'sound_id': 'r', 'sound_name': 'R Sound', 'level': 4, 'level_name': 'Phrase',
              'target': 'Run fast.', 'order': 1, 'is_active': True,
-             'created_at': datetime.datetime.utcnow(), 'updated_at': datetime.datetime.utcnow()},
+             'created_at': now, 'updated_at': now},
             {'exercise_id': 'r-phrase-2', 'sound_id': 'r', 'sound_name': 'R Sound', 'level': 4, 'level_name': 'Phrase',
              'target': 'Red rose.', 'order': 2, 'is_active': True,
-             'created_at': datetime.datetime.utcnow(), 'updated_at': datetime.datetime.utcnow()},
+             'created_at': now, 'updated_at': now},
             # R Sound - Level 5: Sentence
             {'exercise_id': 'r-sentence-1', 'sound_id': 'r', 'sound_name': 'R Sound', 'level': 5, 'level_name': 'Sentence',
              'target': 'The rabbit runs really fast.', 'order': 1, 'is_active': True,
-             'created_at': datetime.datetime.utcnow(), 'updated_at': datetime.datetime.utcnow()},
+             'created_at': now, 'updated_at': now},
             
             # ==================== L SOUND ====================
             # L Sound - Level 1: Sound (using simple word)
             {'exercise_id': 'l-sound-1', 'sound_id': 'l', 'sound_name': 'L Sound', 'level': 1, 'level_name': 'Sound',
              'target': 'lay', 'order': 1, 'is_active': True,
-             'created_at': datetime.datetime.utcnow(), 'updated_at': datetime.datetime.utcnow()},
+             'created_at': now, 'updated_at': now},
             # L Sound - Level 2: Syllable
             {'exercise_id': 'l-syllable-1', 'sound_id': 'l', 'sound_name': 'L Sound', 'level': 2, 'level_name': 'Syllable',
              'target': 'la', 'order': 1, 'is_active': True,
-             'created_at': datetime.datetime.utcnow(), 'updated_at': datetime.datetime.utcnow()},
+             'created_at': now, 'updated_at': now},
             {'exercise_id': 'l-syllable-2', 'sound_id': 'l', 'sound_name': 'L Sound', 'level': 2, 'level_name': 'Syllable',
              'target': 'lo', 'order': 2, 'is_active': True,
-             'created_at': datetime.datetime.utcnow(), 'updated_at': datetime.datetime.utcnow()},
+             'created_at': now, 'updated_at': now},
             {'exercise_id': 'l-syllable-3', 'sound_id': 'l', 'sound_name': 'L Sound', 'level': 2, 'level_name': 'Syllable',
              'target': 'lu', 'order': 3, 'is_active': True,
-             'created_at': datetime.datetime.utcnow(), 'updated_at': datetime.datetime.utcnow()},
+             'created_at': now, 'updated_at': now},
             # L Sound - Level 3: Word
             {'exercise_id': 'l-word-1', 'sound_id': 'l', 'sound_name': 'L Sound', 'level': 3, 'level_name': 'Word',
              'target': 'look', 'order': 1, 'is_active': True,
-             'created_at': datetime.datetime.utcnow(), 'updated_at': datetime.datetime.utcnow()},
+             'created_at': now, 'updated_at': now},
             {'exercise_id': 'l-word-2', 'sound_id': 'l', 'sound_name': 'L Sound', 'level': 3, 'level_name': 'Word',
              'target': 'like', 'order': 2, 'is_active': True,
-             'created_at': datetime.datetime.utcnow(), 'updated_at': datetime.datetime.utcnow()},
+             'created_at': now, 'updated_at': now},
             {'exercise_id': 'l-word-3', 'sound_id': 'l', 'sound_name': 'L Sound', 'level': 3, 'level_name': 'Word',
              'target': 'lamp', 'order': 3, 'is_active': True,
-             'created_at': datetime.datetime.utcnow(), 'updated_at': datetime.datetime.utcnow()},
+             'created_at': now, 'updated_at': now},
             # L Sound - Level 4: Phrase
             {'exercise_id': 'l-phrase-1', 'sound_id': 'l', 'sound_name': 'L Sound', 'level': 4, 'level_name': 'Phrase',
              'target': 'Look at me.', 'order': 1, 'is_active': True,
-             'created_at': datetime.datetime.utcnow(), 'updated_at': datetime.datetime.utcnow()},
+             'created_at': now, 'updated_at': now},
             {'exercise_id': 'l-phrase-2', 'sound_id': 'l', 'sound_name': 'L Sound', 'level': 4, 'level_name': 'Phrase',
              'target': 'Like this.', 'order': 2, 'is_active': True,
-             'created_at': datetime.datetime.utcnow(), 'updated_at': datetime.datetime.utcnow()},
+             'created_at': now, 'updated_at': now},
             # L Sound - Level 5: Sentence
             {'exercise_id': 'l-sentence-1', 'sound_id': 'l', 'sound_name': 'L Sound', 'level': 5, 'level_name': 'Sentence',
              'target': 'I like to play with my little lamb.', 'order': 1, 'is_active': True,
-             'created_at': datetime.datetime.utcnow(), 'updated_at': datetime.datetime.utcnow()},
+             'created_at': now, 'updated_at': now},
             
             # ==================== K SOUND ====================
             # K Sound - Level 1: Sound (using simple word)
             {'exercise_id': 'k-sound-1', 'sound_id': 'k', 'sound_name': 'K Sound', 'level': 1, 'level_name': 'Sound',
              'target': 'key', 'order': 1, 'is_active': True,
-             'created_at': datetime.datetime.utcnow(), 'updated_at': datetime.datetime.utcnow()},
+             'created_at': now, 'updated_at': now},
             # K Sound - Level 2: Syllable
             {'exercise_id': 'k-syllable-1', 'sound_id': 'k', 'sound_name': 'K Sound', 'level': 2, 'level_name': 'Syllable',
              'target': 'ka', 'order': 1, 'is_active': True,
-             'created_at': datetime.datetime.utcnow(), 'updated_at': datetime.datetime.utcnow()},
+             'created_at': now, 'updated_at': now},
             {'exercise_id': 'k-syllable-2', 'sound_id': 'k', 'sound_name': 'K Sound', 'level': 2, 'level_name': 'Syllable',
              'target': 'ko', 'order': 2, 'is_active': True,
-             'created_at': datetime.datetime.utcnow(), 'updated_at': datetime.datetime.utcnow()},
+             'created_at': now, 'updated_at': now},
             {'exercise_id': 'k-syllable-3', 'sound_id': 'k', 'sound_name': 'K Sound', 'level': 2, 'level_name': 'Syllable',
              'target': 'ku', 'order': 3, 'is_active': True,
-             'created_at': datetime.datetime.utcnow(), 'updated_at': datetime.datetime.utcnow()},
+             'created_at': now, 'updated_at': now},
             # K Sound - Level 3: Word
             {'exercise_id': 'k-word-1', 'sound_id': 'k', 'sound_name': 'K Sound', 'level': 3, 'level_name': 'Word',
              'target': 'cat', 'order': 1, 'is_active': True,
-             'created_at': datetime.datetime.utcnow(), 'updated_at': datetime.datetime.utcnow()},
+             'created_at': now, 'updated_at': now},
             {'exercise_id': 'k-word-2', 'sound_id': 'k', 'sound_name': 'K Sound', 'level': 3, 'level_name': 'Word',
              'target': 'come', 'order': 2, 'is_active': True,
-             'created_at': datetime.datetime.utcnow(), 'updated_at': datetime.datetime.utcnow()},
+             'created_at': now, 'updated_at': now},
             {'exercise_id': 'k-word-3', 'sound_id': 'k', 'sound_name': 'K Sound', 'level': 3, 'level_name': 'Word',
              'target': 'cup', 'order': 3, 'is_active': True,
-             'created_at': datetime.datetime.utcnow(), 'updated_at': datetime.datetime.utcnow()},
+             'created_at': now, 'updated_at': now},
             # K Sound - Level 4: Phrase
             {'exercise_id': 'k-phrase-1', 'sound_id': 'k', 'sound_name': 'K Sound', 'level': 4, 'level_name': 'Phrase',
              'target': 'Come here.', 'order': 1, 'is_active': True,
-             'created_at': datetime.datetime.utcnow(), 'updated_at': datetime.datetime.utcnow()},
+             'created_at': now, 'updated_at': now},
             {'exercise_id': 'k-phrase-2', 'sound_id': 'k', 'sound_name': 'K Sound', 'level': 4, 'level_name': 'Phrase',
              'target': 'Cute cat.', 'order': 2, 'is_active': True,
-             'created_at': datetime.datetime.utcnow(), 'updated_at': datetime.datetime.utcnow()},
+             'created_at': now, 'updated_at': now},
             # K Sound - Level 5: Sentence
             {'exercise_id': 'k-sentence-1', 'sound_id': 'k', 'sound_name': 'K Sound', 'level': 5, 'level_name': 'Sentence',
              'target': 'The cat can climb the tree.', 'order': 1, 'is_active': True,
-             'created_at': datetime.datetime.utcnow(), 'updated_at': datetime.datetime.utcnow()},
+             'created_at': now, 'updated_at': now},
             
             # ==================== TH SOUND ====================
             # TH Sound - Level 1: Sound (using simple word)
             {'exercise_id': 'th-sound-1', 'sound_id': 'th', 'sound_name': 'TH Sound', 'level': 1, 'level_name': 'Sound',
              'target': 'they', 'order': 1, 'is_active': True,
-             'created_at': datetime.datetime.utcnow(), 'updated_at': datetime.datetime.utcnow()},
+             'created_at': now, 'updated_at': now},
             # TH Sound - Level 2: Syllable
             {'exercise_id': 'th-syllable-1', 'sound_id': 'th', 'sound_name': 'TH Sound', 'level': 2, 'level_name': 'Syllable',
              'target': 'tha', 'order': 1, 'is_active': True,
-             'created_at': datetime.datetime.utcnow(), 'updated_at': datetime.datetime.utcnow()},
+             'created_at': now, 'updated_at': now},
             {'exercise_id': 'th-syllable-2', 'sound_id': 'th', 'sound_name': 'TH Sound', 'level': 2, 'level_name': 'Syllable',
              'target': 'tho', 'order': 2, 'is_active': True,
-             'created_at': datetime.datetime.utcnow(), 'updated_at': datetime.datetime.utcnow()},
+             'created_at': now, 'updated_at': now},
             {'exercise_id': 'th-syllable-3', 'sound_id': 'th', 'sound_name': 'TH Sound', 'level': 2, 'level_name': 'Syllable',
              'target': 'thu', 'order': 3, 'is_active': True,
-             'created_at': datetime.datetime.utcnow(), 'updated_at': datetime.datetime.utcnow()},
+             'created_at': now, 'updated_at': now},
             # TH Sound - Level 3: Word
             {'exercise_id': 'th-word-1', 'sound_id': 'th', 'sound_name': 'TH Sound', 'level': 3, 'level_name': 'Word',
              'target': 'think', 'order': 1, 'is_active': True,
-             'created_at': datetime.datetime.utcnow(), 'updated_at': datetime.datetime.utcnow()},
+             'created_at': now, 'updated_at': now},
             {'exercise_id': 'th-word-2', 'sound_id': 'th', 'sound_name': 'TH Sound', 'level': 3, 'level_name': 'Word',
              'target': 'thank', 'order': 2, 'is_active': True,
-             'created_at': datetime.datetime.utcnow(), 'updated_at': datetime.datetime.utcnow()},
+             'created_at': now, 'updated_at': now},
             {'exercise_id': 'th-word-3', 'sound_id': 'th', 'sound_name': 'TH Sound', 'level': 3, 'level_name': 'Word',
              'target': 'thin', 'order': 3, 'is_active': True,
-             'created_at': datetime.datetime.utcnow(), 'updated_at': datetime.datetime.utcnow()},
+             'created_at': now, 'updated_at': now},
             # TH Sound - Level 4: Phrase
             {'exercise_id': 'th-phrase-1', 'sound_id': 'th', 'sound_name': 'TH Sound', 'level': 4, 'level_name': 'Phrase',
              'target': 'Think about it.', 'order': 1, 'is_active': True,
-             'created_at': datetime.datetime.utcnow(), 'updated_at': datetime.datetime.utcnow()},
+             'created_at': now, 'updated_at': now},
             {'exercise_id': 'th-phrase-2', 'sound_id': 'th', 'sound_name': 'TH Sound', 'level': 4, 'level_name': 'Phrase',
              'target': 'Thank you.', 'order': 2, 'is_active': True,
-             'created_at': datetime.datetime.utcnow(), 'updated_at': datetime.datetime.utcnow()},
+             'created_at': now, 'updated_at': now},
             # TH Sound - Level 5: Sentence
             {'exercise_id': 'th-sentence-1', 'sound_id': 'th', 'sound_name': 'TH Sound', 'level': 5, 'level_name': 'Sentence',
              'target': 'I think the weather is nice.', 'order': 1, 'is_active': True,
-             'created_at': datetime.datetime.utcnow(), 'updated_at': datetime.datetime.utcnow()}
+             'created_at': now, 'updated_at': now}
         ]
         
-        result = articulation_exercises_collection.insert_many(default_exercises)
+        # The seed documents are independent, so an unordered insert lets the
+        # server write them without stopping at the first failure
+        result = articulation_exercises_collection.insert_many(default_exercises, ordered=False)
         
         return jsonify({
             'success': True,
@@ -269,6 +366,13 @@ def seed_default_exercises(current_user):
             'count': len(result.inserted_ids)
         }), 201
         
+    except BulkWriteError as e:
+        inserted = e.details.get('nInserted', 0)
+        return jsonify({
+            'success': False,
+            'message': f'Seeded {inserted} of {len(default_exercises)} exercises: {e}',
+            'count': inserted
+        }), 500
     except Exception as e:
         return jsonify({'success': False, 'message': str(e)}), 500
 
@@ -278,44 +382,48 @@ def seed_default_exercises(current_user):
 def get_all_exercises(current_user):
     """Get all articulation exercises grouped by sound and level"""
     try:
-        exercises = list(articulation_exercises_collection.find().sort([('sound_id', 1), ('level', 1), ('order', 1)]))
+        ensure_exercise_index()
+        # MongoDB groups the sorted exercises by sound and level, so Python only
+        # has to key the levels
+        sounds = articulation_exercises_collection.aggregate([
+            {'$sort': {'sound_id': 1, 'level': 1, 'order': 1}},
+            {'$group': {
+                '_id': {'sound_id': '$sound_id', 'level': '$level'},
+                'sound_name': {'$first': '$sound_name'},
+                'level_name': {'$first': '$level_name'},
+                'exercises': {'$push': '$$ROOT'}
+            }},
+            {'$group': {
+                '_id': '$_id.sound_id',
+                'sound_name': {'$first': '$sound_name'},
+                'levels': {'$push': {
+                    'level': '$_id.level',
+                    'level_name': '$level_name',
+                    'exercises': '$exercises'
+                }}
+            }}
+        ])
         
-        # Group exercises by sound and level
         exercises_by_sound = {}
-        for ex in exercises:
-            ex['_id'] = str(ex['_id'])
-            # Handle datetime conversion safely
-            if 'created_at' in ex:
-                if isinstance(ex['created_at'], datetime.datetime):
-                    ex['created_at'] = ex['created_at'].isoformat()
-                # If it's already a string, keep it as is
-            if 'updated_at' in ex:
-                if isinstance(ex['updated_at'], datetime.datetime):
-                    ex['updated_at'] = ex['updated_at'].isoformat()
-                # If it's already a string, keep it as is
-            
-            sound_id = ex['sound_id']
-            level = ex['level']
-            
-            if sound_id not in exercises_by_sound:
-                exercises_by_sound[sound_id] = {
-                    'sound_name': ex['sound_name'],
-                    'levels': {}
+        total_count = 0
+        for sound in sounds:
+            levels = {}
+            for level in sound['levels']:
+                total_count += len(level['exercises'])
+                levels[level['level']] = {
+                    'level_name': level['level_name'],
+                    'exercises': level['exercises']
                 }
-            
-            if level not in exercises_by_sound[sound_id]['levels']:
-                exercises_by_sound[sound_id]['levels'][level] = {
-                    'level_name': ex['level_name'],
-                    'exercises': []
-                }
-            
-            exercises_by_sound[sound_id]['levels'][level]['exercises'].append(ex)
+            exercises_by_sound[sound['_id']] = {
+                'sound_name': sound['sound_name'],
+                'levels': levels
+            }
         
-        return jsonify({
+        return list_response({
             'success': True,
             'exercises_by_sound': exercises_by_sound,
-            'total_count': len(exercises)
-        }), 200
+            'total_count': total_count
+        })
         
     except Exception as e:
         return jsonify({'success': False, 'message': str(e)}), 500
@@ -335,37 +443,23 @@ def create_exercise(current_user):
             if field not in data:
                 return jsonify({'success': False, 'message': f'Missing required field: {field}'}), 400
         
+        error = invalid_field(data)
+        if error:
+            return jsonify({'success': False, 'message': error}), 400
+        
         sound_id = data['sound_id']
         level = int(data['level'])
         order = int(data['order'])
         
-        # Auto-generate sound_name based on sound_id
-        sound_names = {
-            's': 'S Sound',
-            'r': 'R Sound',
-            'l': 'L Sound',
-            'k': 'K Sound',
-            'th': 'TH Sound'
-        }
-        
-        # Auto-generate level_name based on level number
-        level_names = {
-            1: 'Sound',
-            2: 'Syllable',
-            3: 'Word',
-            4: 'Phrase',
-            5: 'Sentence'
-        }
-        
         # Auto-generate exercise_id: {sound_id}-{level_name_lowercase}-{order}
-        level_name = level_names.get(level, 'Unknown')
+        level_name = LEVEL_NAMES[level]
         exercise_id = f"{sound_id}-{level_name.lower()}-{order}"
         
         # Create exercise with auto-generated fields
         exercise = {
             'exercise_id': exercise_id,
             'sound_id': sound_id,
-            'sound_name': sound_names.get(sound_id, f'{sound_id.upper()} Sound'),
+            'sound_name': SOUND_NAMES[sound_id],
             'level': level,
             'level_name': level_name,
             'target': data['target'],
@@ -398,48 +492,26 @@ def update_exercise(current_user, exercise_id):
         if '_id' in data:
             del data['_id']
         
-        # Regenerate auto-generated fields if sound_id or level changed
-        if 'sound_id' in data or 'level' in data or 'order' in data:
-            # Get current exercise to get missing fields
-            current_exercise = articulation_exercises_collection.find_one({'_id': ObjectId(exercise_id)})
-            if not current_exercise:
-                return jsonify({'success': False, 'message': 'Exercise not found'}), 404
-            
-            sound_id = data.get('sound_id', current_exercise.get('sound_id'))
-            level = int(data.get('level', current_exercise.get('level', 1)))
-            order = int(data.get('order', current_exercise.get('order', 1)))
-            
-            # Auto-generate sound_name
-            sound_names = {
-                's': 'S Sound',
-                'r': 'R Sound',
-                'l': 'L Sound',
-                'k': 'K Sound',
-                'th': 'TH Sound'
-            }
-            data['sound_name'] = sound_names.get(sound_id, f'{sound_id.upper()} Sound')
-            
-            # Auto-generate level_name
-            level_names = {
-                1: 'Sound',
-                2: 'Syllable',
-                3: 'Word',
-                4: 'Phrase',
-                5: 'Sentence'
-            }
-            data['level_name'] = level_names.get(level, 'Unknown')
-            
-            # Auto-generate exercise_id
-            data['exercise_id'] = f"{sound_id}-{data['level_name'].lower()}-{order}"
+        error = invalid_field(data)
+        if error:
+            return jsonify({'success': False, 'message': error}), 400
         
         data['updated_at'] = datetime.datetime.utcnow()
         
-        result = articulation_exercises_collection.update_one(
+        # One round-trip: the request's values are set as literals (so a string
+        # starting with '$' is stored, not evaluated), then the generated fields
+        # are recomputed from the stored values if sound_id, level or order changed
+        pipeline = [{'$set': {field: {'$literal': value} for field, value in data.items()}}]
+        if 'sound_id' in data or 'level' in data or 'order' in data:
+            pipeline += GENERATED_FIELD_STAGES
+        
+        exercise = articulation_exercises_collection.find_one_and_update(
             {'_id': ObjectId(exercise_id)},
-            {'$set': data}
+            pipeline,
+            projection={'_id': True}
         )
         
-        if result.matched_count == 0:
+        if exercise is None:
             return jsonify({'success': False, 'message': 'Exercise not found'}), 404
         
         return jsonify({'success': True, 'message': 'Exercise updated successfully'}), 200
@@ -471,16 +543,18 @@ def delete_exercise(current_user, exercise_id):
 def toggle_active(current_user, exercise_id):
     """Toggle is_active status"""
     try:
-        exercise = articulation_exercises_collection.find_one({'_id': ObjectId(exercise_id)})
+        # One atomic round-trip: the pipeline update flips the stored value
+        # (a missing is_active counts as inactive) and returns the result
+        exercise = articulation_exercises_collection.find_one_and_update(
+            {'_id': ObjectId(exercise_id)},
+            [{'$set': {'is_active': {'$not': ['$is_active']}, 'updated_at': datetime.datetime.utcnow()}}],
+            projection={'is_active': True},
+            return_document=ReturnDocument.AFTER
+        )
         if not exercise:
             return jsonify({'success': False, 'message': 'Exercise not found'}), 404
         
-        new_status = not exercise.get('is_active', False)
-        
-        articulation_exercises_collection.update_one(
-            {'_id': ObjectId(exercise_id)},
-            {'$set': {'is_active': new_status, 'updated_at': datetime.datetime.utcnow()}}
-        )
+        new_status = exercise['is_active']
         
         return jsonify({
             'success': True,
@@ -10,10 +10,11 @@ from typing import Dict, List, Tuple, Optional
 import xgboost as xgb
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
-import pickle
 import os
 from bson import ObjectId
 
+import model_store
+
 class ArticulationMasteryPredictor:
     """
     Predicts days until articulation mastery using XGBoost Gradient Boosted Regression Trees
@@ -334,29 +335,18 @@ class ArticulationMasteryPredictor:
         self.is_baseline = True
     
     def _save_model(self):
-        """Save trained model to disk"""
-        os.makedirs(os.path.dirname(self.model_path), exist_ok=True)
-        
-        model_data = {
-            'model': self.model,
-            'feature_columns': self.feature_columns,
-            'trained_at': datetime.now().isoformat()
-        }
+        """Save trained model to disk in XGBoost's native format"""
+        booster_path = model_store.save_model(self.model, self.feature_columns, self.model_path)
         
-        with open(self.model_path, 'wb') as f:
-            pickle.dump(model_data, f)
-        
-        print(f"💾 Model saved to {self.model_path}")
+        print(f"💾 Model saved to {booster_path}")
     
     def load_model(self) -> bool:
         """Load trained model from disk"""
-        if not os.path.exists(self.model_path):
-            print("⚠️  No saved model found")
-            return False
-        
         try:
-            with open(self.model_path, 'rb') as f:
-                model_data = pickle.load(f)
+            model_data = model_store.load_model(self.model_path)
+            if model_data is None:
+                print("⚠️  No saved model found")
+                return False
             
             self.model = model_data['model']
             self.feature_columns = model_data['feature_columns']
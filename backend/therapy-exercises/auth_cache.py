@@ -0,0 +1,69 @@
+"""
+Auth Cache - Short-lived cache for the CRUD blueprints' token checks
+Verified token payloads and user documents are kept for up to a minute, so
+repeat requests skip the HS256 verification and the users lookup. A token is
+never served from the cache past its exp claim; role changes and deleted
+users take effect within CACHE_TTL seconds.
+"""
+
+import functools
+import os
+import threading
+import time
+
+import jwt
+from bson import ObjectId
+from cachetools import TTLCache
+
+CACHE_TTL = 60
+CACHE_SIZE = 4096
+JWT_ALGORITHMS = ('HS256',)
+
+# cachetools caches are not thread-safe; one lock guards both
+_lock = threading.Lock()
+_payloads = TTLCache(maxsize=CACHE_SIZE, ttl=CACHE_TTL)
+_users = TTLCache(maxsize=CACHE_SIZE, ttl=CACHE_TTL)
+
+
+@functools.lru_cache(maxsize=1)
+def secret_key():
+    """
+    The token signing secret, read once on first use
+
+    Not at import time: app.py loads .env after importing the CRUD modules
+    """
+    return os.getenv('SECRET_KEY', 'your-secret-key-here')
+
+
+def decode_token(token):
+    """
+    Payload of a verified token, from the cache when possible
+
+    Raises the jwt exceptions for invalid or expired tokens, like jwt.decode
+    """
+    with _lock:
+        payload = _payloads.get(token)
+
+    if payload is not None:
+        exp = payload.get('exp')
+        if exp is None or exp > time.time():
+            return payload
+
+    payload = jwt.decode(token, secret_key(), algorithms=JWT_ALGORITHMS)
+    with _lock:
+        _payloads[token] = payload
+    return payload
+
+
+def find_user(users_collection, user_id):
+    """User document for user_id, or None; missing users are not cached"""
+    with _lock:
+        user = _users.get(user_id)
+    if user is not None:
+        return user
+
+    user = users_collection.find_one({'_id': ObjectId(user_id)})
+    if user is not None:
+        with _lock:
+            _users[user_id] = user
+    return user
@@ -3,9 +3,23 @@ Rule-Based Exercise Recommender for Stroke Patients
 Maps detected gait problems to appropriate rehabilitation exercises
 """
 
-from stroke_exercise_library import StrokeExerciseLibrary
+import functools
 from datetime import datetime
 
+from stroke_exercise_library import StrokeExerciseLibrary
+
+
+@functools.lru_cache(maxsize=512)
+def _digits(text):
+    """
+    All digits in text read as one integer ('5 times per week' -> 5)
+
+    The library's duration/frequency/improvement strings are static, so each
+    distinct string is parsed once per process.
+    """
+    return int(''.join(filter(str.isdigit, text)))
+
+
 class ExerciseRecommender:
     """
     Recommends exercises based on detected gait problems
@@ -181,7 +195,7 @@ class ExerciseRecommender:
             # Prefer exercises with higher expected improvement
             improvement = exercise.get('expected_improvement', '')
             if 'weeks' in improvement:
-                weeks = int(''.join(filter(str.isdigit, improvement.split('weeks')[0])))
+                weeks = _digits(improvement.split('weeks')[0])
                 score += max(0, 10 - weeks)  # Faster improvement = higher score
             
             # Prefer exercises requiring no equipment
@@ -249,7 +263,7 @@ class ExerciseRecommender:
             for exercise in rec['exercises']:
                 # Parse frequency (e.g., "5 times per week" -> 5)
                 frequency_str = exercise.get('frequency', '3 times per week')
-                frequency = int(''.join(filter(str.isdigit, frequency_str)))
+                frequency = _digits(frequency_str)
                 
                 # Assign to specific days
                 assigned_days = []
@@ -326,7 +340,7 @@ class ExerciseRecommender:
             for exercise in rec['exercises']:
                 duration = self._parse_duration(exercise.get('duration', '10 minutes'))
                 frequency_str = exercise.get('frequency', '5 times per week')
-                frequency = int(''.join(filter(str.isdigit, frequency_str)))
+                frequency = _digits(frequency_str)
                 
                 # Average time per day
                 total_minutes += (duration * frequency) / 7
@@ -341,7 +355,7 @@ class ExerciseRecommender:
     def _parse_duration(self, duration_str):
         """Parse duration string to minutes"""
         try:
-            return int(''.join(filter(str.isdigit, duration_str)))
+            return _digits(duration_str)
         except:
             return 10  # Default
     
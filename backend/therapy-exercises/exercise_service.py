@@ -178,10 +178,10 @@ def get_exercise_by_id(exercise_id):
 
 if __name__ == '__main__':
     port = int(os.getenv('EXERCISE_SERVICE_PORT', 5002))
-    debug = os.getenv('FLASK_ENV', 'development') == 'development'
+    debug = os.getenv('FLASK_DEBUG') == '1'
     
     print(f"\n🚀 Starting server on port {port}...")
     print(f"🔧 Debug mode: {debug}")
     print("\nPress Ctrl+C to stop\n")
     
-    app.run(host='0.0.0.0', port=port, debug=debug)
+    app.run(host='0.0.0.0', port=port, debug=debug, use_reloader=False)
@@ -3,16 +3,36 @@ Fluency Exercise CRUD Operations
 Manages fluency therapy exercises (5 levels: Breathing, Phrases, Sentences, Reading, Spontaneous)
 """
 
-from flask import Blueprint, request, jsonify
-from functools import wraps
+from flask import Blueprint, current_app, request, jsonify
+from functools import lru_cache, wraps
 from bson import ObjectId
+from pymongo import ReturnDocument
+from pymongo.errors import BulkWriteError
 import datetime
-import jwt
-import os
+import orjson
+
+import auth_cache
 
 # Create Blueprint
 fluency_bp = Blueprint('fluency_crud', __name__)
 
+# Metadata and exercise_id prefixes generated for new exercises
+LEVEL_METADATA = {
+    1: {'name': 'Breathing & Single Words', 'color': '#e8b04e'},
+    2: {'name': 'Short Phrases', 'color': '#479ac3'},
+    3: {'name': 'Complete Sentences', 'color': '#ce3630'},
+    4: {'name': 'Reading Passages', 'color': '#8e44ad'},
+    5: {'name': 'Spontaneous Speech', 'color': '#27ae60'}
+}
+
+TYPE_PREFIXES = {
+    'controlled-breathing': 'breath',
+    'short-phrase': 'phrase',
+    'sentence': 'sentence',
+    'passage': 'passage',
+    'spontaneous': 'spontaneous'
+}
+
 # Database collections (will be set by app.py)
 db = None
 users_collection = None
@@ -26,6 +46,26 @@ def init_fluency_crud(database):
     fluency_exercises_collection = db['fluency_exercises']
     print("✅ Fluency CRUD initialized")
 
+# Exercise lists are sorted by level and order; a matching index lets
+# MongoDB return them already sorted instead of sorting in memory
+EXERCISE_INDEX = [('level', 1), ('order', 1)]
+
+@lru_cache(maxsize=1)
+def ensure_exercise_index():
+    """Create the list index once per process (retried if it fails)"""
+    fluency_exercises_collection.create_index(EXERCISE_INDEX, name='level_order_idx')
+
+# List responses go straight through orjson, which writes datetimes in
+# isoformat itself; ObjectIds fall back to str()
+LIST_JSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SORT_KEYS
+
+def list_response(payload):
+    """JSON response for a list endpoint, without converting each document first"""
+    return current_app.response_class(
+        orjson.dumps(payload, default=str, option=LIST_JSON_OPTIONS),
+        mimetype='application/json'
+    )
+
 # Token required decorator
 def token_required(f):
     @wraps(f)
@@ -38,12 +78,12 @@ def token_required(f):
         try:
             if token.startswith('Bearer '):
                 token = token[7:]
-            data = jwt.decode(token, os.getenv('SECRET_KEY', 'your-secret-key-here'), algorithms=["HS256"])
+            data = auth_cache.decode_token(token)
             # Node.js backend uses 'id' field, not 'user_id'
             user_id = data.get('id') or data.get('user_id')
             if not user_id:
                 return jsonify({'message': 'Invalid token format!'}), 401
-            current_user = users_collection.find_one({'_id': ObjectId(user_id)})
+            current_user = auth_cache.find_user(users_collection, user_id)
             if not current_user:
                 return jsonify({'message': 'User not found!'}), 401
         except Exception as e:
@@ -78,6 +118,9 @@ def seed_default_exercises(current_user):
                 'existing_count': existing
             }), 400
         
+        # Every seeded exercise shares one timestamp
+        now = datetime.datetime.utcnow()
+        
         # Default exercises for all 5 levels
         default_exercises = [
             # Level 1: Breathing & Single Words
@@ -86,21 +129,21 @@ def seed_default_exercises(current_user):
                 'exercise_id': 'breath-1', 'type': 'controlled-breathing',
                 'instruction': 'Take a deep breath, hold for 2 seconds, then say this word slowly',
                 'target': 'Hello', 'expected_duration': 3, 'breathing': True, 'is_active': True,
-                'created_at': datetime.datetime.utcnow(), 'updated_at': datetime.datetime.utcnow()
+                'created_at': now, 'updated_at': now
             },
             {
                 'level': 1, 'level_name': 'Breathing & Single Words', 'level_color': '#e8b04e', 'order': 2,
                 'exercise_id': 'breath-2', 'type': 'controlled-breathing',
                 'instruction': 'Breathe in deeply, pause, then say this word',
                 'target': 'Thank you', 'expected_duration': 3, 'breathing': True, 'is_active': True,
-                'created_at': datetime.datetime.utcnow(), 'updated_at': datetime.datetime.utcnow()
+                'created_at': now, 'updated_at': now
             },
             {
                 'level': 1, 'level_name': 'Breathing & Single Words', 'level_color': '#e8b04e', 'order': 3,
                 'exercise_id': 'breath-3', 'type': 'controlled-breathing',
                 'instruction': 'Take a slow breath, then say this word smoothly',
                 'target': 'Water', 'expected_duration': 3, 'breathing': True, 'is_active': True,
-                'created_at': datetime.datetime.utcnow(), 'updated_at': datetime.datetime.utcnow()
+                'created_at': now, 'updated_at': now
             },
             # Level 2: Short Phrases
             {
@@ -108,21 +151,21 @@ def seed_default_exercises(current_user):
                 'exercise_id': 'phrase-1', 'type': 'short-phrase',
                 'instruction': 'Read this short phrase slowly and smoothly',
                 'target': 'Good morning', 'expected_duration': 4, 'breathing': False, 'is_active': True,
-                'created_at': datetime.datetime.utcnow(), 'updated_at': datetime.datetime.utcnow()
+                'created_at': now, 'updated_at': now
             },
             {
                 'level': 2, 'level_name': 'Short Phrases', 'level_color': '#479ac3', 'order': 2,
                 'exercise_id': 'phrase-2', 'type': 'short-phrase',
                 'instruction': 'Say this phrase at a comfortable pace',
                 'target': 'How are you', 'expected_duration': 4, 'breathing': False, 'is_active': True,
-                'created_at': datetime.datetime.utcnow(), 'updated_at': datetime.datetime.utcnow()
+                'created_at': now, 'updated_at': now
             },
             {
                 'level': 2, 'level_name': 'Short Phrases', 'level_color': '#479ac3', 'order': 3,
                 'exercise_id': 'phrase-3', 'type': 'short-phrase',
                 'instruction': 'Speak this phrase clearly and slowly',
                 'target': 'Nice to meet you', 'expected_duration': 5, 'breathing': False, 'is_active': True,
-                'created_at': datetime.datetime.utcnow(), 'updated_at': datetime.datetime.utcnow()
+                'created_at': now, 'updated_at': now
             },
             # Level 3: Complete Sentences
             {
@@ -130,14 +173,14 @@ def seed_default_exercises(current_user):
                 'exercise_id': 'sentence-1', 'type': 'complete-sentence',
                 'instruction': 'Read this sentence at a slow, steady pace',
                 'target': 'The cat is sleeping on the couch.', 'expected_duration': 6, 'breathing': False, 'is_active': True,
-                'created_at': datetime.datetime.utcnow(), 'updated_at': datetime.datetime.utcnow()
+                'created_at': now, 'updated_at': now
             },
             {
                 'level': 3, 'level_name': 'Complete Sentences', 'level_color': '#ce3630', 'order': 2,
                 'exercise_id': 'sentence-2', 'type': 'complete-sentence',
                 'instruction': 'Say this sentence smoothly without rushing',
                 'target': 'I like to play basketball with my friends.', 'expected_duration': 7, 'breathing': False, 'is_active': True,
-                'created_at': datetime.datetime.utcnow(), 'updated_at': datetime.datetime.utcnow()
+                'created_at': now, 'updated_at': now
             },
             # Level 4: Reading Passages
             {
@@ -146,7 +189,7 @@ def seed_default_exercises(current_user):
                 'instruction': 'Read this short passage slowly and clearly',
                 'target': 'The sun rises in the east. It brings light and warmth to the world. Birds sing in the morning.', 
                 'expected_duration': 15, 'breathing': False, 'is_active': True,
-                'created_at': datetime.datetime.utcnow(), 'updated_at': datetime.datetime.utcnow()
+                'created_at': now, 'updated_at': now
             },
             {
                 'level': 4, 'level_name': 'Reading Passages', 'level_color': '#8e44ad', 'order': 2,
@@ -154,7 +197,7 @@ def seed_default_exercises(current_user):
                 'instruction': 'Read at your own pace, focusing on smooth speech',
                 'target': 'A small dog ran across the park. The children laughed and played. It was a beautiful day.', 
                 'expected_duration': 15, 'breathing': False, 'is_active': True,
-                'created_at': datetime.datetime.utcnow(), 'updated_at': datetime.datetime.utcnow()
+                'created_at': now, 'updated_at': now
             },
             # Level 5: Spontaneous Speech
             {
@@ -162,19 +205,21 @@ def seed_default_exercises(current_user):
                 'exercise_id': 'spontaneous-1', 'type': 'spontaneous-speech',
                 'instruction': 'Talk about your favorite food for 30 seconds',
                 'target': 'Describe your favorite food and why you like it', 'expected_duration': 30, 'breathing': False, 'is_active': True,
-                'created_at': datetime.datetime.utcnow(), 'updated_at': datetime.datetime.utcnow()
+                'created_at': now, 'updated_at': now
             },
             {
                 'level': 5, 'level_name': 'Spontaneous Speech', 'level_color': '#27ae60', 'order': 2,
                 'exercise_id': 'spontaneous-2', 'type': 'spontaneous-speech',
                 'instruction': 'Tell a story about your day',
                 'target': 'Describe what you did today', 'expected_duration': 30, 'breathing': False, 'is_active': True,
-                'created_at': datetime.datetime.utcnow(), 'updated_at': datetime.datetime.utcnow()
+                'created_at': now, 'updated_at': now
             }
         ]
         
         # Insert all exercises
-        result = fluency_exercises_collection.insert_many(default_exercises)
+        # The seed documents are independent, so an unordered insert lets the
+        # server write them without stopping at the first failure
+        result = fluency_exercises_collection.insert_many(default_exercises, ordered=False)
         
         return jsonify({
             'success': True,
@@ -182,6 +227,13 @@ def seed_default_exercises(current_user):
             'count': len(result.inserted_ids)
         }), 201
         
+    except BulkWriteError as e:
+        inserted = e.details.get('nInserted', 0)
+        return jsonify({
+            'success': False,
+            'message': f'Seeded {inserted} of {len(default_exercises)} exercises: {e}',
+            'count': inserted
+        }), 500
     except Exception as e:
         return jsonify({'success': False, 'message': str(e)}), 500
 
@@ -191,21 +243,14 @@ def seed_default_exercises(current_user):
 def get_all_exercises(current_user):
     """Get all fluency exercises grouped by level"""
     try:
+        ensure_exercise_index()
         exercises = list(fluency_exercises_collection.find().sort([('level', 1), ('order', 1)]))
         
-        # Convert ObjectId to string
-        for ex in exercises:
-            ex['_id'] = str(ex['_id'])
-            if 'created_at' in ex:
-                ex['created_at'] = ex['created_at'].isoformat()
-            if 'updated_at' in ex:
-                ex['updated_at'] = ex['updated_at'].isoformat()
-        
-        return jsonify({
+        return list_response({
             'success': True,
             'exercises': exercises,
             'count': len(exercises)
-        }), 200
+        })
         
     except Exception as e:
         return jsonify({'success': False, 'message': str(e)}), 500
@@ -269,32 +314,15 @@ def create_exercise(current_user):
                 'message': f'An active exercise with order {order} already exists in level {level}. Please use a different order or deactivate the existing exercise first.'
             }), 400
         
-        # Auto-generate level metadata based on level number
-        level_metadata = {
-            1: {'name': 'Breathing & Single Words', 'color': '#e8b04e'},
-            2: {'name': 'Short Phrases', 'color': '#479ac3'},
-            3: {'name': 'Complete Sentences', 'color': '#ce3630'},
-            4: {'name': 'Reading Passages', 'color': '#8e44ad'},
-            5: {'name': 'Spontaneous Speech', 'color': '#27ae60'}
-        }
-        
         # Auto-generate exercise_id based on type and order
         # Format: {type-prefix}-{order}
-        type_prefixes = {
-            'controlled-breathing': 'breath',
-            'short-phrase': 'phrase',
-            'sentence': 'sentence',
-            'passage': 'passage',
-            'spontaneous': 'spontaneous'
-        }
-        
-        exercise_id = f"{type_prefixes.get(exercise_type, 'exercise')}-{order}"
+        exercise_id = f"{TYPE_PREFIXES.get(exercise_type, 'exercise')}-{order}"
         
         # Create exercise document with auto-generated fields
         exercise = {
             'level': level,
-            'level_name': level_metadata.get(level, {}).get('name', 'Unknown Level'),
-            'level_color': level_metadata.get(level, {}).get('color', '#999999'),
+            'level_name': LEVEL_METADATA.get(level, {}).get('name', 'Unknown Level'),
+            'level_color': LEVEL_METADATA.get(level, {}).get('color', '#999999'),
             'order': order,
             'exercise_id': exercise_id,
             'type': exercise_type,
@@ -409,18 +437,18 @@ def delete_exercise(current_user, exercise_id):
 def toggle_active(current_user, exercise_id):
     """Toggle is_active status of a fluency exercise"""
     try:
-        # Get current exercise
-        exercise = fluency_exercises_collection.find_one({'_id': ObjectId(exercise_id)})
+        # One atomic round-trip: the pipeline update flips the stored value
+        # (a missing is_active counts as inactive) and returns the result
+        exercise = fluency_exercises_collection.find_one_and_update(
+            {'_id': ObjectId(exercise_id)},
+            [{'$set': {'is_active': {'$not': ['$is_active']}, 'updated_at': datetime.datetime.utcnow()}}],
+            projection={'is_active': True},
+            return_document=ReturnDocument.AFTER
+        )
         if not exercise:
             return jsonify({'success': False, 'message': 'Exercise not found'}), 404
         
-        # Toggle is_active
-        new_status = not exercise.get('is_active', False)
-        
-        result = fluency_exercises_collection.update_one(
-            {'_id': ObjectId(exercise_id)},
-            {'$set': {'is_active': new_status, 'updated_at': datetime.datetime.utcnow()}}
-        )
+        new_status = exercise['is_active']
         
         return jsonify({
             'success': True,
@@ -439,6 +467,7 @@ def validate_exercises(current_user):
     """Validate the integrity of fluency exercises database"""
     try:
         # Get all active exercises
+        ensure_exercise_index()
         exercises = list(fluency_exercises_collection.find({'is_active': True}).sort([('level', 1), ('order', 1)]))
         
         issues = []
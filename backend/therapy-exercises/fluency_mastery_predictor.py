@@ -4,7 +4,6 @@ Predicts days until fluency mastery based on user's trial history
 """
 
 import os
-import pickle
 from datetime import datetime, timedelta
 from typing import Dict, List
 import numpy as np
@@ -14,6 +13,8 @@ from xgboost import XGBRegressor
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
 
+import model_store
+
 class FluencyMasteryPredictor:
     def __init__(self, mongodb_uri: str, db_name: str = 'CVACare'):
         """Initialize predictor with MongoDB connection"""
@@ -260,29 +261,18 @@ class FluencyMasteryPredictor:
         }
     
     def _save_model(self):
-        """Save trained model to disk"""
-        os.makedirs(os.path.dirname(self.model_path), exist_ok=True)
-        
-        model_data = {
-            'model': self.model,
-            'feature_columns': self.feature_columns,
-            'trained_at': datetime.now().isoformat()
-        }
+        """Save trained model to disk in XGBoost's native format"""
+        booster_path = model_store.save_model(self.model, self.feature_columns, self.model_path)
         
-        with open(self.model_path, 'wb') as f:
-            pickle.dump(model_data, f)
-        
-        print(f"💾 Model saved to {self.model_path}")
+        print(f"💾 Model saved to {booster_path}")
     
     def load_model(self) -> bool:
         """Load trained model from disk"""
-        if not os.path.exists(self.model_path):
-            print("⚠️  No saved fluency model found")
-            return False
-        
         try:
-            with open(self.model_path, 'rb') as f:
-                model_data = pickle.load(f)
+            model_data = model_store.load_model(self.model_path)
+            if model_data is None:
+                print("⚠️  No saved fluency model found")
+                return False
             
             self.model = model_data['model']
             self.feature_columns = model_data['feature_columns']
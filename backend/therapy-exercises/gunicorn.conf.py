@@ -0,0 +1,26 @@
+"""
+Gunicorn configuration for the Therapy Exercises service
+Usage: gunicorn -c gunicorn.conf.py app:app
+"""
+
+import multiprocessing
+import os
+
+bind = f"0.0.0.0:{os.getenv('THERAPY_PORT', '5002')}"
+
+# Requests mostly wait on MongoDB, so a few threads per worker keep the
+# connection pool busy while XGBoost predictions use the cores. The views
+# stay synchronous: under WSGI an async view still holds its thread until
+# the event loop finishes, so raise THERAPY_THREADS for more concurrent
+# predictions instead.
+#
+# WEB_CONCURRENCY is what most hosting platforms set for the worker count
+workers = int(os.getenv('THERAPY_WORKERS') or os.getenv('WEB_CONCURRENCY') or multiprocessing.cpu_count())
+worker_class = 'gthread'
+threads = int(os.getenv('THERAPY_THREADS', 4))
+
+# MongoClient is not fork-safe, so every worker imports the app (and opens
+# its own connection pool) after forking
+preload_app = False
+
+timeout = 120
@@ -3,16 +3,26 @@ Language Exercise CRUD Operations (Expressive)
 Manages expressive language therapy exercises (3 levels: Description, Sentence, Retell)
 """
 
-from flask import Blueprint, request, jsonify
-from functools import wraps
+from flask import Blueprint, current_app, request, jsonify
+from functools import lru_cache, wraps
 from bson import ObjectId
+from pymongo import ReturnDocument
+from pymongo.errors import BulkWriteError
 import datetime
-import jwt
-import os
+import orjson
+
+import auth_cache
 
 # Create Blueprint
 language_bp = Blueprint('language_crud', __name__)
 
+# Level names and colours generated for expressive exercises
+LEVEL_METADATA = {
+    1: {'name': 'Picture Description', 'color': '#8b5cf6'},
+    2: {'name': 'Sentence Formation', 'color': '#a78bfa'},
+    3: {'name': 'Story Retell', 'color': '#c4b5fd'}
+}
+
 # Database collections
 db = None
 users_collection = None
@@ -26,6 +36,26 @@ def init_language_crud(database):
     language_exercises_collection = db['language_exercises']
     print("✅ Language (Expressive) CRUD initialized")
 
+# Expressive exercises are listed in level and order sequence; an index on
+# (mode, level, order) lets MongoDB return them sorted instead of sorting in memory
+EXERCISE_INDEX = [('mode', 1), ('level', 1), ('order', 1)]
+
+@lru_cache(maxsize=1)
+def ensure_exercise_index():
+    """Create the list index once per process (retried if it fails)"""
+    language_exercises_collection.create_index(EXERCISE_INDEX, name='mode_level_order_idx')
+
+# List responses go straight through orjson, which writes datetimes in
+# isoformat itself; ObjectIds fall back to str()
+LIST_JSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SORT_KEYS
+
+def list_response(payload):
+    """JSON response for a list endpoint, without converting each document first"""
+    return current_app.response_class(
+        orjson.dumps(payload, default=str, option=LIST_JSON_OPTIONS),
+        mimetype='application/json'
+    )
+
 # Token required decorator
 def token_required(f):
     @wraps(f)
@@ -36,12 +66,12 @@ def token_required(f):
         try:
             if token.startswith('Bearer '):
                 token = token[7:]
-            data = jwt.decode(token, os.getenv('SECRET_KEY', 'your-secret-key-here'), algorithms=["HS256"])
+            data = auth_cache.decode_token(token)
             # Node.js backend uses 'id' field, not 'user_id'
             user_id = data.get('id') or data.get('user_id')
             if not user_id:
                 return jsonify({'message': 'Invalid token format!'}), 401
-            current_user = users_collection.find_one({'_id': ObjectId(user_id)})
+            current_user = auth_cache.find_user(users_collection, user_id)
             if not current_user:
                 return jsonify({'message': 'User not found!'}), 401
         except Exception as e:
@@ -73,6 +103,8 @@ def seed_default_exercises(current_user):
                 'existing_count': existing
             }), 400
         
+        # Every seeded exercise shares one timestamp
+        now = datetime.datetime.utcnow()
         default_exercises = [
             # Level 1: Picture Description
             {
@@ -81,7 +113,7 @@ def seed_default_exercises(current_user):
                 'instruction': 'Look at the emojis and describe what you see in 5-10 words',
                 'prompt': '🏠🌳👨‍👩‍👧', 'expected_keywords': ['house', 'tree', 'family'],
                 'min_words': 5, 'story': '', 'is_active': True,
-                'created_at': datetime.datetime.utcnow(), 'updated_at': datetime.datetime.utcnow()
+                'created_at': now, 'updated_at': now
             },
             {
                 'mode': 'expressive', 'level': 1, 'level_name': 'Picture Description', 'level_color': '#8b5cf6',
@@ -89,7 +121,7 @@ def seed_default_exercises(current_user):
                 'instruction': 'Describe this scene using complete sentences',
                 'prompt': '☀️🏖️🌊', 'expected_keywords': ['sun', 'beach', 'ocean', 'water'],
                 'min_words': 5, 'story': '', 'is_active': True,
-                'created_at': datetime.datetime.utcnow(), 'updated_at': datetime.datetime.utcnow()
+                'created_at': now, 'updated_at': now
             },
             {
                 'mode': 'expressive', 'level': 1, 'level_name': 'Picture Description', 'level_color': '#8b5cf6',
@@ -97,7 +129,7 @@ def seed_default_exercises(current_user):
                 'instruction': 'Tell me what you see in this picture',
                 'prompt': '🐕⚽👦', 'expected_keywords': ['dog', 'ball', 'boy', 'playing'],
                 'min_words': 5, 'story': '', 'is_active': True,
-                'created_at': datetime.datetime.utcnow(), 'updated_at': datetime.datetime.utcnow()
+                'created_at': now, 'updated_at': now
             },
             # Level 2: Sentence Formation
             {
@@ -106,7 +138,7 @@ def seed_default_exercises(current_user):
                 'instruction': 'Make a sentence using these words: cat, sleeping, chair',
                 'prompt': 'Words: cat, sleeping, chair', 'expected_keywords': ['cat', 'sleeping', 'chair'],
                 'min_words': 5, 'story': '', 'is_active': True,
-                'created_at': datetime.datetime.utcnow(), 'updated_at': datetime.datetime.utcnow()
+                'created_at': now, 'updated_at': now
             },
             {
                 'mode': 'expressive', 'level': 2, 'level_name': 'Sentence Formation', 'level_color': '#ec4899',
@@ -114,7 +146,7 @@ def seed_default_exercises(current_user):
                 'instruction': 'Create a sentence with: bird, flying, sky',
                 'prompt': 'Words: bird, flying, sky', 'expected_keywords': ['bird', 'flying', 'sky'],
                 'min_words': 5, 'story': '', 'is_active': True,
-                'created_at': datetime.datetime.utcnow(), 'updated_at': datetime.datetime.utcnow()
+                'created_at': now, 'updated_at': now
             },
             {
                 'mode': 'expressive', 'level': 2, 'level_name': 'Sentence Formation', 'level_color': '#ec4899',
@@ -122,7 +154,7 @@ def seed_default_exercises(current_user):
                 'instruction': 'Form a sentence using: book, reading, library',
                 'prompt': 'Words: book, reading, library', 'expected_keywords': ['book', 'reading', 'library'],
                 'min_words': 5, 'story': '', 'is_active': True,
-                'created_at': datetime.datetime.utcnow(), 'updated_at': datetime.datetime.utcnow()
+                'created_at': now, 'updated_at': now
             },
             # Level 3: Story Retell
             {
@@ -134,7 +166,7 @@ def seed_default_exercises(current_user):
                 'min_words': 15,
                 'story': 'One sunny day, children went to the park. They played on the swings and slides. Everyone had fun together.',
                 'is_active': True,
-                'created_at': datetime.datetime.utcnow(), 'updated_at': datetime.datetime.utcnow()
+                'created_at': now, 'updated_at': now
             },
             {
                 'mode': 'expressive', 'level': 3, 'level_name': 'Story Retell', 'level_color': '#f59e0b',
@@ -145,11 +177,13 @@ def seed_default_exercises(current_user):
                 'min_words': 15,
                 'story': 'A friendly dog helped its family find their way home. The dog was very smart and knew the way. The family was happy and grateful.',
                 'is_active': True,
-                'created_at': datetime.datetime.utcnow(), 'updated_at': datetime.datetime.utcnow()
+                'created_at': now, 'updated_at': now
             }
         ]
         
-        result = language_exercises_collection.insert_many(default_exercises)
+        # The seed documents are independent, so an unordered insert lets the
+        # server write them without stopping at the first failure
+        result = language_exercises_collection.insert_many(default_exercises, ordered=False)
         
         return jsonify({
             'success': True,
@@ -157,6 +191,13 @@ def seed_default_exercises(current_user):
             'count': len(result.inserted_ids)
         }), 201
         
+    except BulkWriteError as e:
+        inserted = e.details.get('nInserted', 0)
+        return jsonify({
+            'success': False,
+            'message': f'Seeded {inserted} of {len(default_exercises)} exercises: {e}',
+            'count': inserted
+        }), 500
     except Exception as e:
         return jsonify({'success': False, 'message': str(e)}), 500
 
@@ -166,20 +207,14 @@ def seed_default_exercises(current_user):
 def get_all_exercises(current_user):
     """Get all expressive language exercises"""
     try:
+        ensure_exercise_index()
         exercises = list(language_exercises_collection.find({'mode': 'expressive'}).sort([('level', 1), ('order', 1)]))
         
-        for ex in exercises:
-            ex['_id'] = str(ex['_id'])
-            if 'created_at' in ex and hasattr(ex['created_at'], 'isoformat'):
-                ex['created_at'] = ex['created_at'].isoformat()
-            if 'updated_at' in ex and hasattr(ex['updated_at'], 'isoformat'):
-                ex['updated_at'] = ex['updated_at'].isoformat()
-        
-        return jsonify({
+        return list_response({
             'success': True,
             'exercises': exercises,
             'count': len(exercises)
-        }), 200
+        })
         
     except Exception as e:
         return jsonify({'success': False, 'message': str(e)}), 500
@@ -193,13 +228,6 @@ def create_exercise(current_user):
     try:
         data = request.get_json()
         
-        # Define level metadata
-        level_metadata = {
-            1: {'name': 'Picture Description', 'color': '#8b5cf6'},
-            2: {'name': 'Sentence Formation', 'color': '#a78bfa'},
-            3: {'name': 'Story Retell', 'color': '#c4b5fd'}
-        }
-        
         # Validate required fields
         required_fields = ['level', 'type', 'instruction', 'prompt', 'min_words']
         for field in required_fields:
@@ -207,7 +235,7 @@ def create_exercise(current_user):
                 return jsonify({'success': False, 'message': f'Missing required field: {field}'}), 400
         
         level = int(data['level'])
-        level_info = level_metadata.get(level, {'name': 'Unknown', 'color': '#6b7280'})
+        level_info = LEVEL_METADATA.get(level, {'name': 'Unknown', 'color': '#6b7280'})
         
         # Get order from request
         order = int(data.get('order', 1))
@@ -257,17 +285,10 @@ def update_exercise(current_user, exercise_id):
         if '_id' in data:
             del data['_id']
         
-        # Define level metadata
-        level_metadata = {
-            1: {'name': 'Picture Description', 'color': '#8b5cf6'},
-            2: {'name': 'Sentence Formation', 'color': '#a78bfa'},
-            3: {'name': 'Story Retell', 'color': '#c4b5fd'}
-        }
-        
         # If level is being updated, regenerate level_name and level_color
         if 'level' in data:
             level = int(data['level'])
-            level_info = level_metadata.get(level, {'name': 'Unknown', 'color': '#6b7280'})
+            level_info = LEVEL_METADATA.get(level, {'name': 'Unknown', 'color': '#6b7280'})
             data['level_name'] = level_info['name']
             data['level_color'] = level_info['color']
         
@@ -321,16 +342,18 @@ def delete_exercise(current_user, exercise_id):
 def toggle_active(current_user, exercise_id):
     """Toggle is_active status"""
     try:
-        exercise = language_exercises_collection.find_one({'_id': ObjectId(exercise_id)})
+        # One atomic round-trip: the pipeline update flips the stored value
+        # (a missing is_active counts as inactive) and returns the result
+        exercise = language_exercises_collection.find_one_and_update(
+            {'_id': ObjectId(exercise_id)},
+            [{'$set': {'is_active': {'$not': ['$is_active']}, 'updated_at': datetime.datetime.utcnow()}}],
+            projection={'is_active': True},
+            return_document=ReturnDocument.AFTER
+        )
         if not exercise:
             return jsonify({'success': False, 'message': 'Exercise not found'}), 404
         
-        new_status = not exercise.get('is_active', False)
-        
-        language_exercises_collection.update_one(
-            {'_id': ObjectId(exercise_id)},
-            {'$set': {'is_active': new_status, 'updated_at': datetime.datetime.utcnow()}}
-        )
+        new_status = exercise['is_active']
         
         return jsonify({
             'success': True,
@@ -18,6 +18,7 @@ Features:
 - Exercise difficulty progression
 """
 
+import functools
 import os
 import sys
 from datetime import datetime, timedelta
@@ -32,6 +33,16 @@ from dotenv import load_dotenv
 # Load environment
 load_dotenv(os.path.join(os.path.dirname(__file__), '..', '.env'))
 
+@functools.lru_cache(maxsize=None)
+def _mongo_client(mongodb_uri):
+    """
+    One MongoClient per URI for the whole process
+    
+    The receptive and expressive predictors, and the fresh ones built on
+    every retrain, share its connection pool instead of opening their own.
+    """
+    return MongoClient(mongodb_uri)
+
 class LanguageMasteryPredictor:
     def __init__(self, mode='receptive'):
         """
@@ -44,7 +55,7 @@ class LanguageMasteryPredictor:
         
         # MongoDB connection
         mongodb_uri = os.getenv('MONGODB_URI', 'mongodb://localhost:27017/CVACare')
-        self.client = MongoClient(mongodb_uri)
+        self.client = _mongo_client(mongodb_uri)
         
         # Extract database name
         if 'mongodb+srv' in mongodb_uri or 'mongodb://' in mongodb_uri:
@@ -59,13 +70,20 @@ class LanguageMasteryPredictor:
         self.progress_collection = self.db['language_progress']
         
         # Load model if exists
-        if os.path.exists(self.model_path):
-            try:
-                with open(self.model_path, 'rb') as f:
-                    self.model = pickle.load(f)
-                print(f"✅ Loaded {mode} language mastery model from {self.model_path}")
-            except Exception as e:
-                print(f"⚠️  Could not load model: {e}")
+        self.load_model()
+    
+    def load_model(self):
+        """Load the saved model from disk; returns whether one was loaded"""
+        if not os.path.exists(self.model_path):
+            return False
+        try:
+            with open(self.model_path, 'rb') as f:
+                self.model = pickle.load(f)
+            print(f"✅ Loaded {self.mode} language mastery model from {self.model_path}")
+            return True
+        except Exception as e:
+            print(f"⚠️  Could not load model: {e}")
+            return False
     
     def extract_training_data(self):
         """
@@ -275,68 +293,81 @@ class LanguageMasteryPredictor:
         Predict days until mastery for a user
         Returns: (predicted_days, confidence, current_progress)
         """
-        print(f"\n🔮 Predicting {self.mode} language mastery for user {user_id}")
+        return self.predict_days_to_mastery_batch([user_id])[user_id]
+    
+    def predict_days_to_mastery_batch(self, user_ids):
+        """
+        Predict days until mastery for several users at once
+        Trials and progress are fetched with one query each and the model
+        runs once over every user with enough trials
+        Returns: {user_id: prediction} with the same prediction fields as
+        predict_days_to_mastery
+        """
+        user_ids = list(dict.fromkeys(user_ids))
+        print(f"\n🔮 Predicting {self.mode} language mastery for {len(user_ids)} user(s)")
         
-        # Get user trials
-        trials = list(self.trials_collection.find({
-            'user_id': user_id,
+        # Get user trials, grouped per user in timestamp order
+        trials_by_user = {user_id: [] for user_id in user_ids}
+        for trial in self.trials_collection.find({
+            'user_id': {'$in': user_ids},
             'mode': self.mode
-        }).sort('timestamp', 1))
+        }).sort('timestamp', 1):
+            trials_by_user[trial['user_id']].append(trial)
         
-        # Get user progress
-        progress = self.progress_collection.find_one({
-            'user_id': user_id,
+        # Get user progress (first record per user, as find_one would)
+        progress_by_user = {}
+        for progress in self.progress_collection.find({
+            'user_id': {'$in': user_ids},
             'mode': self.mode
-        })
-        
-        if not progress:
-            progress = {
+        }):
+            progress_by_user.setdefault(progress['user_id'], progress)
+        
+        predictions = {}
+        to_model = []
+        for user_id in user_ids:
+            trials = trials_by_user[user_id]
+            progress = progress_by_user.get(user_id) or {
                 'completed_exercises': 0,
                 'total_exercises': 15,
                 'accuracy': 0,
                 'correct_exercises': 0
             }
-        
-        # If no trials, return baseline prediction
-        if len(trials) < 3:
-            baseline_days = 90  # 3 months baseline
-            confidence = 0.50   # Low confidence for baseline
             
-            return {
-                'predicted_days': baseline_days,
-                'confidence': confidence,
-                'current_exercises_completed': progress.get('completed_exercises', 0),
-                'total_exercises': progress.get('total_exercises', 15),
-                'current_accuracy': progress.get('accuracy', 0),
-                'message': f'Estimated time to master {self.mode} language therapy: {baseline_days} days (baseline estimate).'
-            }
-        
-        # Extract features
-        features = self._extract_features(trials, progress)
-        features_array = np.array([features])
-        
-        # Predict
-        if self.model is None:
-            raise ValueError(f"Model not loaded. Please train the model first for {self.mode} mode.")
-        
-        predicted_days = int(self.model.predict(features_array)[0])
-        
-        # Ensure reasonable bounds
-        predicted_days = max(7, min(predicted_days, 365))
-        
-        # Calculate confidence based on data quality
-        confidence = self._calculate_confidence(trials, progress)
+            # If no trials, return baseline prediction (3 months, low confidence)
+            if len(trials) < 3:
+                predictions[user_id] = self._prediction(progress, 90, 0.50, ' (baseline estimate)')
+            else:
+                to_model.append((user_id, trials, progress))
         
-        print(f"✅ Prediction: {predicted_days} days")
-        print(f"   Confidence: {int(confidence * 100)}%")
+        if to_model:
+            if self.model is None:
+                raise ValueError(f"Model not loaded. Please train the model first for {self.mode} mode.")
+            
+            # Extract features and predict every user in one call
+            features_array = np.array([
+                self._extract_features(trials, progress) for _, trials, progress in to_model
+            ])
+            for (user_id, trials, progress), raw_days in zip(to_model, self.model.predict(features_array)):
+                # Ensure reasonable bounds
+                predicted_days = max(7, min(int(raw_days), 365))
+                
+                # Calculate confidence based on data quality
+                confidence = self._calculate_confidence(trials, progress)
+                predictions[user_id] = self._prediction(progress, predicted_days, confidence)
+            
+            print(f"✅ Model predictions for {len(to_model)} user(s)")
         
+        return {user_id: predictions[user_id] for user_id in user_ids}
+    
+    def _prediction(self, progress, predicted_days, confidence, note=''):
+        """Prediction response for one user"""
         return {
             'predicted_days': predicted_days,
             'confidence': confidence,
             'current_exercises_completed': progress.get('completed_exercises', 0),
             'total_exercises': progress.get('total_exercises', 15),
             'current_accuracy': progress.get('accuracy', 0),
-            'message': f'Estimated time to master {self.mode} language therapy: {predicted_days} days.'
+            'message': f'Estimated time to master {self.mode} language therapy: {predicted_days} days{note}.'
         }
     
     def _calculate_confidence(self, trials, progress):
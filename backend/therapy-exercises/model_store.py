@@ -0,0 +1,94 @@
+"""
+Model Store - Save and load the XGBoost mastery models
+Boosters are written in XGBoost's native UBJSON format (.ubj) with a small
+JSON sidecar for the feature columns; older .pkl models are still read
+"""
+
+import functools
+import json
+import os
+import pickle
+from datetime import datetime
+
+from xgboost import XGBRegressor
+
+
+def native_paths(model_path):
+    """(.ubj booster, .json metadata) paths next to a predictor's .pkl model_path"""
+    base = os.path.splitext(model_path)[0]
+    return base + '.ubj', base + '.json'
+
+
+def save_model(model, feature_columns, model_path):
+    """Write the booster and its feature columns; returns the booster path"""
+    booster_path, meta_path = native_paths(model_path)
+    os.makedirs(os.path.dirname(booster_path), exist_ok=True)
+
+    model.save_model(booster_path)
+    with open(meta_path, 'w') as f:
+        json.dump({
+            'feature_columns': list(feature_columns),
+            'trained_at': datetime.now().isoformat()
+        }, f)
+
+    return booster_path
+
+
+def load_model(model_path):
+    """
+    Load a saved model as {'model', 'feature_columns', 'trained_at'}
+
+    Prefers the native .ubj/.json pair and falls back to the legacy pickle.
+    Results are cached per file modification time, so repeated loads in a
+    worker are free and a retrained model is picked up on the next call.
+
+    Returns:
+        The model data dict, or None when no saved model exists
+    """
+    booster_path, meta_path = native_paths(model_path)
+    if os.path.exists(booster_path) and os.path.exists(meta_path):
+        return _load_native(booster_path, meta_path,
+                            os.stat(booster_path).st_mtime_ns, os.stat(meta_path).st_mtime_ns)
+    if os.path.exists(model_path):
+        return _load_pickle(model_path, os.stat(model_path).st_mtime_ns)
+    return None
+
+
+def model_mtime(model_path):
+    """
+    Modification time (ns) of the saved model load_model would read
+
+    Lets each worker notice a model retrained by another worker.
+
+    Returns:
+        The newer of the .ubj/.json pair's mtimes, else the .pkl's, or None
+        when no saved model exists
+    """
+    booster_path, meta_path = native_paths(model_path)
+    try:
+        return max(os.stat(booster_path).st_mtime_ns, os.stat(meta_path).st_mtime_ns)
+    except FileNotFoundError:
+        pass
+    try:
+        return os.stat(model_path).st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+
+@functools.lru_cache(maxsize=8)
+def _load_native(booster_path, meta_path, booster_mtime_ns, meta_mtime_ns):
+    model = XGBRegressor()
+    model.load_model(booster_path)
+    with open(meta_path, 'r') as f:
+        meta = json.load(f)
+    return {
+        'model': model,
+        'feature_columns': meta['feature_columns'],
+        'trained_at': meta['trained_at']
+    }
+
+
+@functools.lru_cache(maxsize=8)
+def _load_pickle(model_path, mtime_ns):
+    with open(model_path, 'rb') as f:
+        return pickle.load(f)
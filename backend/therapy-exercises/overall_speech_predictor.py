@@ -39,13 +39,20 @@ class OverallSpeechPredictor:
         self.model_path = os.path.join(os.path.dirname(__file__), 'models', 'overall_speech_improvement_xgboost.pkl')
         
         # Load existing model if available
-        if os.path.exists(self.model_path):
-            try:
-                with open(self.model_path, 'rb') as f:
-                    self.model = pickle.load(f)
-                print(f"✅ Loaded existing overall speech improvement model from {self.model_path}")
-            except Exception as e:
-                print(f"⚠️ Could not load model: {e}")
+        self.load_model()
+    
+    def load_model(self):
+        """Load the saved model from disk; returns whether one was loaded"""
+        if not os.path.exists(self.model_path):
+            return False
+        try:
+            with open(self.model_path, 'rb') as f:
+                self.model = pickle.load(f)
+            print(f"✅ Loaded existing overall speech improvement model from {self.model_path}")
+            return True
+        except Exception as e:
+            print(f"⚠️ Could not load model: {e}")
+            return False
     
     def _get_user_data(self, user_id):
         """Get all therapy data for a user"""
@@ -4,16 +4,26 @@ Manages receptive language therapy exercises (3 levels: Vocabulary, Directions,
 Receptive exercises use multiple choice format with 4 options
 """
 
-from flask import Blueprint, request, jsonify
-from functools import wraps
+from flask import Blueprint, current_app, request, jsonify
+from functools import lru_cache, wraps
 from bson import ObjectId
+from pymongo import ReturnDocument
+from pymongo.errors import BulkWriteError
 import datetime
-import jwt
-import os
+import orjson
+
+import auth_cache
 
 # Create Blueprint
 receptive_bp = Blueprint('receptive_crud', __name__)
 
+# Level names and colours generated for receptive exercises
+LEVEL_METADATA = {
+    1: {'name': 'Vocabulary', 'color': '#e8b04e'},
+    2: {'name': 'Directions', 'color': '#479ac3'},
+    3: {'name': 'Comprehension', 'color': '#3b82f6'}
+}
+
 # Database collections
 db = None
 users_collection = None
@@ -27,6 +37,26 @@ def init_receptive_crud(database):
     receptive_exercises_collection = db['receptive_exercises']
     print("✅ Receptive Language CRUD initialized")
 
+# Exercise lists are sorted by level and order; a matching index lets
+# MongoDB return them already sorted instead of sorting in memory
+EXERCISE_INDEX = [('level', 1), ('order', 1)]
+
+@lru_cache(maxsize=1)
+def ensure_exercise_index():
+    """Create the list index once per process (retried if it fails)"""
+    receptive_exercises_collection.create_index(EXERCISE_INDEX, name='level_order_idx')
+
+# List responses go straight through orjson, which writes datetimes in
+# isoformat itself; ObjectIds fall back to str()
+LIST_JSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SORT_KEYS
+
+def list_response(payload):
+    """JSON response for a list endpoint, without converting each document first"""
+    return current_app.response_class(
+        orjson.dumps(payload, default=str, option=LIST_JSON_OPTIONS),
+        mimetype='application/json'
+    )
+
 # Token required decorator
 def token_required(f):
     @wraps(f)
@@ -37,12 +67,12 @@ def token_required(f):
         try:
             if token.startswith('Bearer '):
                 token = token[7:]
-            data = jwt.decode(token, os.getenv('SECRET_KEY', 'your-secret-key-here'), algorithms=["HS256"])
+            data = auth_cache.decode_token(token)
             # Node.js backend uses 'id' field, not 'user_id'
             user_id = data.get('id') or data.get('user_id')
             if not user_id:
                 return jsonify({'message': 'Invalid token format!'}), 401
-            current_user = users_collection.find_one({'_id': ObjectId(user_id)})
+            current_user = auth_cache.find_user(users_collection, user_id)
             if not current_user:
                 return jsonify({'message': 'User not found!'}), 401
         except Exception as e:
@@ -74,6 +104,8 @@ def seed_default_exercises(current_user):
                 'existing_count': existing
             }), 400
         
+        # Every seeded exercise shares one timestamp
+        now = datetime.datetime.utcnow()
         default_exercises = [
             # Level 1: Vocabulary
             {
@@ -88,7 +120,7 @@ def seed_default_exercises(current_user):
                     {'id': 4, 'text': 'House', 'image': '🏠', 'correct': False}
                 ],
                 'order': 1, 'is_active': True,
-                'created_at': datetime.datetime.utcnow(), 'updated_at': datetime.datetime.utcnow()
+                'created_at': now, 'updated_at': now
             },
             {
                 'mode': 'receptive', 'level': 1, 'level_name': 'Vocabulary', 'level_color': '#3b82f6',
@@ -102,7 +134,7 @@ def seed_default_exercises(current_user):
                     {'id': 4, 'text': 'Fish', 'image': '🐠', 'correct': False}
                 ],
                 'order': 2, 'is_active': True,
-                'created_at': datetime.datetime.utcnow(), 'updated_at': datetime.datetime.utcnow()
+                'created_at': now, 'updated_at': now
             },
             {
                 'mode': 'receptive', 'level': 1, 'level_name': 'Vocabulary', 'level_color': '#3b82f6',
@@ -116,7 +148,7 @@ def seed_default_exercises(current_user):
                     {'id': 4, 'text': 'Cup', 'image': '☕', 'correct': False}
                 ],
                 'order': 3, 'is_active': True,
-                'created_at': datetime.datetime.utcnow(), 'updated_at': datetime.datetime.utcnow()
+                'created_at': now, 'updated_at': now
             },
             # Level 2: Directions
             {
@@ -131,7 +163,7 @@ def seed_default_exercises(current_user):
                     {'id': 4, 'text': 'Go Down', 'image': '⬇️', 'correct': False}
                 ],
                 'order': 1, 'is_active': True,
-                'created_at': datetime.datetime.utcnow(), 'updated_at': datetime.datetime.utcnow()
+                'created_at': now, 'updated_at': now
             },
             {
                 'mode': 'receptive', 'level': 2, 'level_name': 'Directions', 'level_color': '#3b82f6',
@@ -145,7 +177,7 @@ def seed_default_exercises(current_user):
                     {'id': 4, 'text': 'Cup on floor', 'image': '☕⬇️', 'correct': False}
                 ],
                 'order': 2, 'is_active': True,
-                'created_at': datetime.datetime.utcnow(), 'updated_at': datetime.datetime.utcnow()
+                'created_at': now, 'updated_at': now
             },
             {
                 'mode': 'receptive', 'level': 2, 'level_name': 'Directions', 'level_color': '#3b82f6',
@@ -159,7 +191,7 @@ def seed_default_exercises(current_user):
                     {'id': 4, 'text': 'Lock', 'image': '🔒', 'correct': False}
                 ],
                 'order': 3, 'is_active': True,
-                'created_at': datetime.datetime.utcnow(), 'updated_at': datetime.datetime.utcnow()
+                'created_at': now, 'updated_at': now
             },
             # Level 3: Comprehension
             {
@@ -174,7 +206,7 @@ def seed_default_exercises(current_user):
                     {'id': 4, 'text': 'Playing', 'image': '🐱⚽', 'correct': False}
                 ],
                 'order': 1, 'is_active': True,
-                'created_at': datetime.datetime.utcnow(), 'updated_at': datetime.datetime.utcnow()
+                'created_at': now, 'updated_at': now
             },
             {
                 'mode': 'receptive', 'level': 3, 'level_name': 'Comprehension', 'level_color': '#3b82f6',
@@ -188,11 +220,13 @@ def seed_default_exercises(current_user):
                     {'id': 4, 'text': 'Eating', 'image': '👦🍽️', 'correct': False}
                 ],
                 'order': 2, 'is_active': True,
-                'created_at': datetime.datetime.utcnow(), 'updated_at': datetime.datetime.utcnow()
+                'created_at': now, 'updated_at': now
             }
         ]
         
-        result = receptive_exercises_collection.insert_many(default_exercises)
+        # The seed documents are independent, so an unordered insert lets the
+        # server write them without stopping at the first failure
+        result = receptive_exercises_collection.insert_many(default_exercises, ordered=False)
         
         return jsonify({
             'success': True,
@@ -200,6 +234,13 @@ def seed_default_exercises(current_user):
             'count': len(result.inserted_ids)
         }), 201
         
+    except BulkWriteError as e:
+        inserted = e.details.get('nInserted', 0)
+        return jsonify({
+            'success': False,
+            'message': f'Seeded {inserted} of {len(default_exercises)} exercises: {e}',
+            'count': inserted
+        }), 500
     except Exception as e:
         return jsonify({'success': False, 'message': str(e)}), 500
 
@@ -209,20 +250,14 @@ def seed_default_exercises(current_user):
 def get_all_exercises(current_user):
     """Get all receptive language exercises"""
     try:
+        ensure_exercise_index()
         exercises = list(receptive_exercises_collection.find().sort([('level', 1), ('order', 1)]))
         
-        for ex in exercises:
-            ex['_id'] = str(ex['_id'])
-            if 'created_at' in ex and hasattr(ex['created_at'], 'isoformat'):
-                ex['created_at'] = ex['created_at'].isoformat()
-            if 'updated_at' in ex and hasattr(ex['updated_at'], 'isoformat'):
-                ex['updated_at'] = ex['updated_at'].isoformat()
-        
-        return jsonify({
+        return list_response({
             'success': True,
             'exercises': exercises,
             'count': len(exercises)
-        }), 200
+        })
         
     except Exception as e:
         return jsonify({'success': False, 'message': str(e)}), 500
@@ -260,15 +295,8 @@ def create_exercise(current_user):
         # Get options_emojis if provided
         options_emojis = data.get('options_emojis', ['', '', '', ''])
         
-        # Auto-generate level_name and level_color based on level
-        level_metadata = {
-            1: {'name': 'Vocabulary', 'color': '#e8b04e'},
-            2: {'name': 'Directions', 'color': '#479ac3'},
-            3: {'name': 'Comprehension', 'color': '#3b82f6'}
-        }
-        
-        level_name = level_metadata.get(level, {}).get('name', 'Unknown Level')
-        level_color = level_metadata.get(level, {}).get('color', '#999999')
+        level_name = LEVEL_METADATA.get(level, {}).get('name', 'Unknown Level')
+        level_color = LEVEL_METADATA.get(level, {}).get('color', '#999999')
         
         # Transform options from array of strings to array of option objects
         # For vocabulary: use 'image' field
@@ -333,13 +361,8 @@ def update_exercise(current_user, exercise_id):
         # Regenerate level_name and level_color if level changed
         if 'level' in data:
             level = int(data['level'])
-            level_metadata = {
-                1: {'name': 'Vocabulary', 'color': '#e8b04e'},
-                2: {'name': 'Directions', 'color': '#479ac3'},
-                3: {'name': 'Comprehension', 'color': '#3b82f6'}
-            }
-            data['level_name'] = level_metadata.get(level, {}).get('name', 'Unknown Level')
-            data['level_color'] = level_metadata.get(level, {}).get('color', '#999999')
+            data['level_name'] = LEVEL_METADATA.get(level, {}).get('name', 'Unknown Level')
+            data['level_color'] = LEVEL_METADATA.get(level, {}).get('color', '#999999')
         
         # Regenerate exercise_id if type or order changed
         if 'type' in data or 'order' in data:
@@ -431,16 +454,18 @@ def delete_exercise(current_user, exercise_id):
 def toggle_active(current_user, exercise_id):
     """Toggle is_active status"""
     try:
-        exercise = receptive_exercises_collection.find_one({'_id': ObjectId(exercise_id)})
+        # One atomic round-trip: the pipeline update flips the stored value
+        # (a missing is_active counts as inactive) and returns the result
+        exercise = receptive_exercises_collection.find_one_and_update(
+            {'_id': ObjectId(exercise_id)},
+            [{'$set': {'is_active': {'$not': ['$is_active']}, 'updated_at': datetime.datetime.utcnow()}}],
+            projection={'is_active': True},
+            return_document=ReturnDocument.AFTER
+        )
         if not exercise:
             return jsonify({'success': False, 'message': 'Exercise not found'}), 404
         
-        new_status = not exercise.get('is_active', False)
-        
-        receptive_exercises_collection.update_one(
-            {'_id': ObjectId(exercise_id)},
-            {'$set': {'is_active': new_status, 'updated_at': datetime.datetime.utcnow()}}
-        )
+        new_status = exercise['is_active']
         
         return jsonify({
             'success': True,